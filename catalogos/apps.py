@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CatalogosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalogos'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,158 @@
+"""
+Catálogos (grados, unidades, estados, tipos de sanción y de felicitación) en
+la memoria de cada proceso.
+
+Son tablas de pocas filas que casi todas las vistas vuelven a consultar: los
+filtros de las listas, los desplegables de cada formulario y las etiquetas de
+los reportes. Cada proceso guarda una copia de cada catálogo junto con el sello
+de versión con que la cargó. El sello vive en el caché compartido, así que
+renovarlo invalida la copia de todos los workers a la vez. Mientras no cambie,
+leer un catálogo es una lectura del caché y ninguna consulta a la base de datos.
+
+catalogos/signals.py renueva el sello al guardar o eliminar una fila. Lo hace
+de inmediato, para que el propio proceso vea el cambio, y otra vez al confirmar
+la transacción, porque un worker que recargó entretanto pudo leer los datos
+anteriores al commit.
+
+Las instancias son compartidas entre requests: solo se leen.
+
+Uso:
+    from catalogos import cache_catalogos
+    cache_catalogos.lista(Grado, activo=True)          # instancias, orden del modelo
+    cache_catalogos.por_id(Unidad)[pk]
+    cache_catalogos.opciones(TipoEstado)              # [(pk, str(obj)), ...]
+    cache_catalogos.etiquetas(Grado, 'abreviatura')   # {pk: abreviatura}
+
+    class MiVista(CatalogosEnCacheMixin, CreateView): ...   # desplegables sin consultas
+"""
+
+import uuid
+
+from django import forms
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator, modelform_factory
+
+from .models import Grado, TipoEstado, TipoFelicitacion, TipoSancion, Unidad
+
+
+CATALOGOS = (Grado, Unidad, TipoEstado, TipoSancion, TipoFelicitacion)
+
+_copias = {}       # label del modelo → (sello, filas, por_id)
+
+
+def _clave(modelo):
+    return f'catalogos:version:{modelo._meta.label_lower}'
+
+
+def _version(modelo):
+    clave   = _clave(modelo)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, uuid.uuid4().hex, timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+def invalidar(modelo):
+    """Nuevo sello de versión: todos los procesos recargan el catálogo."""
+    cache.set(_clave(modelo), uuid.uuid4().hex, timeout=None)
+
+
+def _copia(modelo):
+    # El sello se lee antes de consultar: si cambia mientras se carga, la
+    # copia queda con el sello viejo y la próxima lectura la vuelve a cargar
+    version = _version(modelo)
+    copia   = _copias.get(modelo._meta.label_lower)
+    if copia is None or copia[0] != version:
+        queryset = modelo.objects.all()
+        if not modelo._meta.ordering:
+            queryset = queryset.order_by('pk')
+        filas = tuple(queryset)
+        copia = (version, filas, {obj.pk: obj for obj in filas})
+        _copias[modelo._meta.label_lower] = copia
+    return copia
+
+
+def lista(modelo, orden=None, **filtros):
+    """Instancias del catálogo que cumplen `filtros` (igualdad por atributo)."""
+    filas = [
+        obj for obj in _copia(modelo)[1]
+        if all(getattr(obj, campo) == valor for campo, valor in filtros.items())
+    ]
+    if orden:
+        filas.sort(key=lambda obj: getattr(obj, orden))
+    return filas
+
+
+def por_id(modelo):
+    """{pk: instancia} de todo el catálogo."""
+    return _copia(modelo)[2]
+
+
+def etiquetas(modelo, campo):
+    """{pk: valor de `campo`} de todo el catálogo."""
+    return {pk: getattr(obj, campo) for pk, obj in _copia(modelo)[2].items()}
+
+
+def opciones(modelo, orden=None, **filtros):
+    """[(pk, str(obj))] listo para un ChoiceField o un <select>."""
+    return [(obj.pk, str(obj)) for obj in lista(modelo, orden, **filtros)]
+
+
+# ── Formularios ───────────────────────────────────────────────────
+
+class _IteradorCatalogo(ModelChoiceIterator):
+
+    def _filas(self):
+        return _copia(self.queryset.model)[1]
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self._filas():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self._filas()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self._filas())
+
+
+class CampoCatalogo(forms.ModelChoiceField):
+    """
+    ModelChoiceField que arma las opciones y valida el valor enviado con la
+    copia en memoria del catálogo, sin consultas. No aplica limit_choices_to.
+    Al enviar un ModelForm, la validación del modelo (full_clean) sigue
+    comprobando en la base de datos que la FK exista.
+    """
+    iterator = _IteradorCatalogo
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            return value
+        try:
+            return por_id(self.queryset.model)[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+            )
+
+
+def campo_formulario(db_field, **kwargs):
+    """formfield_callback: las FK a catálogos usan CampoCatalogo."""
+    if db_field.is_relation and db_field.many_to_one and db_field.related_model in CATALOGOS:
+        return db_field.formfield(form_class=CampoCatalogo, **kwargs)
+    return db_field.formfield(**kwargs)
+
+
+class CatalogosEnCacheMixin:
+    """Para CreateView/UpdateView con `fields`: desplegables de catálogos desde la memoria."""
+
+    def get_form_class(self):
+        if self.fields is None or self.form_class is not None:
+            return super().get_form_class()
+        return modelform_factory(self.model, fields=self.fields, formfield_callback=campo_formulario)
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import cache_catalogos
+
+
+# ── Caché de catálogos ────────────────────────────────────────────
+# Sello nuevo al instante (este proceso) y al confirmar (el resto de workers,
+# que pudieron recargar con los datos previos al commit).
+
+def invalidar_cache_catalogo(sender, **kwargs):
+    cache_catalogos.invalidar(sender)
+    transaction.on_commit(lambda: cache_catalogos.invalidar(sender))
+
+
+for _modelo in cache_catalogos.CATALOGOS:
+    post_save.connect(invalidar_cache_catalogo, sender=_modelo,
+                      dispatch_uid=f'cache_catalogos_save_{_modelo.__name__}')
+    post_delete.connect(invalidar_cache_catalogo, sender=_modelo,
+                        dispatch_uid=f'cache_catalogos_delete_{_modelo.__name__}')
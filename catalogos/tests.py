@@ -1,3 +1,45 @@
-from django.test import TestCase
+from django.forms.models import modelform_factory
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from personal.models import PersonalPolicial
+from . import cache_catalogos
+from .models import Grado, TipoEstado, Unidad
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheCatalogosTests(TestCase):
+
+    def setUp(self):
+        self.grados   = [Grado.objects.create(nombre=f'Grado {i}', abreviatura=f'G{i}', orden=3 - i) for i in range(3)]
+        self.unidades = [Unidad.objects.create(codigo=f'U{i}', nombre=f'Unidad {i}') for i in range(2)]
+        self.estado   = TipoEstado.objects.create(nombre='Activo')
+
+    def test_lecturas_sin_consultas_hasta_que_cambia_el_catalogo(self):
+        cache_catalogos.lista(Grado)
+        with self.assertNumQueries(0):
+            self.assertEqual([g.abreviatura for g in cache_catalogos.lista(Grado)], ['G2', 'G1', 'G0'])
+            self.assertEqual(cache_catalogos.por_id(Grado)[self.grados[0].pk].nombre, 'Grado 0')
+            self.assertEqual(cache_catalogos.etiquetas(Grado, 'abreviatura')[self.grados[1].pk], 'G1')
+
+        self.grados[2].activo = False
+        self.grados[2].save()
+        with self.assertNumQueries(1):
+            self.assertEqual(cache_catalogos.opciones(Grado, activo=True), [
+                (self.grados[1].pk, 'Grado 1 (G1)'), (self.grados[0].pk, 'Grado 0 (G0)'),
+            ])
+
+    def test_formulario_arma_desplegables_desde_la_memoria(self):
+        Formulario = modelform_factory(
+            PersonalPolicial, fields=['grado', 'unidad', 'estado_actual'],
+            formfield_callback=cache_catalogos.campo_formulario,
+        )
+        Formulario().as_p()
+        with self.assertNumQueries(0):
+            html = Formulario().as_p()
+            self.assertIn('Unidad 1', html)
+        formulario = Formulario({
+            'grado': self.grados[0].pk, 'unidad': self.unidades[1].pk, 'estado_actual': 999,
+        })
+        self.assertFalse(formulario.is_valid())
+        self.assertEqual(formulario.cleaned_data['unidad'], self.unidades[1])
+        self.assertIn('estado_actual', formulario.errors)
@@ -3,7 +3,7 @@ from .models import SistemaConfig
 
 @admin.register(SistemaConfig)
 class SistemaConfigAdmin(admin.ModelAdmin):
-    list_display = ['nombre_institucion', 'mantenimiento', 'tiempo_sesion']
+    list_display = ['nombre_institucion', 'mantenimiento', 'tiempo_sesion', 'retencion_bitacora_meses']
     list_editable = ['mantenimiento']
     
     def has_add_permission(self, request):
@@ -0,0 +1,99 @@
+"""
+Datos del dashboard calculados una vez y guardados en el caché compartido.
+
+Todos los conteos de personal (total, activos, en licencia, por unidad y por
+grado) salen de una sola consulta a personal.conteos, agrupada por (unidad,
+grado, estado); el resto se suma en Python sobre unas pocas decenas de filas.
+Junto con los nombres de unidades y grados y los últimos registros de kardex,
+el resultado se guarda en el caché bajo un sello de versión.
+
+Las señales de core/signals.py renuevan el sello al guardar o eliminar
+personal, kardex, grados, unidades o estados, así el dashboard nunca muestra
+datos viejos; las cargas siguientes salen del caché sin tocar la base de
+datos. DASHBOARD_CACHE_SEGUNDOS limita la vigencia para los cambios que no
+pasan por señales (update() o bulk_create masivos); los conteos en sí siempre
+son exactos.
+
+Uso:
+    from core import cache_dashboard
+    contexto = cache_dashboard.obtener()
+"""
+
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from catalogos.models import Grado, Unidad
+from personal.conteos import conteos
+from personal.models import KardexDigital
+
+
+CLAVE_VERSION = 'dashboard:version_datos'
+ULTIMOS_KARDEX = 10
+
+
+def _version():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def invalidar():
+    """Nuevo sello de versión: el próximo dashboard se vuelve a calcular."""
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+
+
+def calcular():
+    """Contexto del dashboard desde la base de datos (4 consultas)."""
+    grupos = conteos('unidad_id', 'grado_id', 'estado_actual__nombre')
+    por_unidad, por_grado, totales = Counter(), Counter(), Counter()
+    for (unidad_id, grado_id, estado), total in grupos.items():
+        por_unidad[unidad_id] += total
+        por_grado[grado_id]   += total
+        totales.update(total=total, activo=total if estado == 'Activo' else 0,
+                       licencia=total if estado == 'Licencia' else 0)
+
+    ultimos = (
+        KardexDigital.objects
+        .select_related('personal')
+        .only('fecha_registro', 'tipo_registro', 'descripcion',
+              'personal__nombres', 'personal__apellido_paterno', 'personal__apellido_materno')
+        .order_by('-fecha_creacion')[:ULTIMOS_KARDEX]
+    )
+    return {
+        'total_personal'     : totales['total'],
+        'personal_activo'    : totales['activo'],
+        'personal_licencia'  : totales['licencia'],
+        'personal_por_unidad': [
+            {'nombre': nombre, 'total': por_unidad[pk]}
+            for pk, nombre in Unidad.objects.values_list('pk', 'nombre')
+        ],
+        'personal_por_grado' : [
+            {'nombre': nombre, 'abreviatura': abreviatura, 'total': por_grado[pk]}
+            for pk, nombre, abreviatura in Grado.objects.values_list('pk', 'nombre', 'abreviatura')
+        ],
+        'ultimos_registros'  : [
+            {
+                'fecha_registro': k.fecha_registro,
+                'personal_id'   : k.personal_id,
+                'persona'       : k.personal.nombre_completo(),
+                'tipo'          : k.get_tipo_registro_display(),
+                'descripcion'   : k.descripcion,
+            }
+            for k in ultimos
+        ],
+    }
+
+
+def obtener():
+    """Contexto del dashboard desde el caché, calculándolo si hace falta."""
+    clave    = f'dashboard:{_version()}'
+    contexto = cache.get(clave)
+    if contexto is None:
+        contexto = calcular()
+        cache.set(clave, contexto, timeout=settings.DASHBOARD_CACHE_SEGUNDOS)
+    return contexto
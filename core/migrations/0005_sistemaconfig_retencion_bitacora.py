@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_usuario_personal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sistemaconfig',
+            name='retencion_bitacora_meses',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Meses de bitácora que se conservan en la base de datos además del actual (0 = todos). Lo anterior se archiva y se elimina con depurar_bitacora.'),
+        ),
+    ]
@@ -103,6 +103,11 @@ class SistemaConfig(models.Model):
         default=False, 
         help_text='Activar modo mantenimiento'
     )
+    retencion_bitacora_meses = models.PositiveSmallIntegerField(
+        default=0,
+        help_text='Meses de bitácora que se conservan en la base de datos además del actual (0 = todos). '
+                  'Lo anterior se archiva y se elimina con depurar_bitacora.'
+    )
     
     class Meta:
         verbose_name = 'Configuración del Sistema'
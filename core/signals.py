@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from catalogos.models import Grado, TipoEstado, Unidad
 from personal.models import PersonalPolicial, KardexDigital
+from . import cache_dashboard
 from .models import Usuario
 
 
@@ -67,3 +69,17 @@ def crear_kardex_ingreso(sender, instance, created, **kwargs):
         )
     except Exception as e:
         print(f"Error creando kardex de ingreso: {e}")
+
+
+# ── Caché del dashboard ───────────────────────────────────────────
+# Cualquier cambio en lo que muestra el dashboard renueva su sello de versión.
+
+def invalidar_cache_dashboard(sender, **kwargs):
+    cache_dashboard.invalidar()
+
+
+for _modelo in (PersonalPolicial, KardexDigital, Grado, Unidad, TipoEstado):
+    post_save.connect(invalidar_cache_dashboard, sender=_modelo,
+                      dispatch_uid=f'cache_dashboard_save_{_modelo.__name__}')
+    post_delete.connect(invalidar_cache_dashboard, sender=_modelo,
+                        dispatch_uid=f'cache_dashboard_delete_{_modelo.__name__}')
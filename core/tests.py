@@ -1,3 +1,44 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from catalogos.models import Grado, TipoEstado, Unidad
+from personal.models import PersonalPolicial
+from . import cache_dashboard
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheDashboardTests(TestCase):
+
+    def setUp(self):
+        self.grados   = [Grado.objects.create(nombre=f'Grado {i}', abreviatura=f'G{i}', orden=i) for i in range(2)]
+        self.unidades = [Unidad.objects.create(codigo=f'U{i}', nombre=f'Unidad {i}') for i in range(3)]
+        self.estados  = {n: TipoEstado.objects.create(nombre=n) for n in ('Activo', 'Licencia', 'Baja')}
+        for i, estado in enumerate(['Activo', 'Activo', 'Licencia', 'Baja', 'Activo']):
+            self._persona(i, estado)
+
+    def _persona(self, i, estado):
+        return PersonalPolicial.objects.create(
+            codigo_identificacion=f'C{i}', ci=f'{1000 + i}', nombres='Ana', apellido_paterno=f'P{i}',
+            apellido_materno='M', fecha_nacimiento=date(1990, 1, 1), genero='F',
+            grado=self.grados[i % 2], unidad=self.unidades[i % 2], estado_actual=self.estados[estado],
+            fecha_ingreso=date(2010, 1, 1),
+        )
+
+    def test_conteos_de_una_consulta_en_cache_y_se_renuevan_con_senales(self):
+        with self.assertNumQueries(4):
+            contexto = cache_dashboard.obtener()
+        self.assertEqual(
+            (contexto['total_personal'], contexto['personal_activo'], contexto['personal_licencia']), (5, 3, 1),
+        )
+        self.assertEqual([u['total'] for u in contexto['personal_por_unidad']], [3, 2, 0])
+        self.assertEqual([g['total'] for g in contexto['personal_por_grado']], [3, 2])
+        self.assertEqual(len(contexto['ultimos_registros']), 5)     # kardex de ingreso
+        self.assertEqual(contexto['ultimos_registros'][0]['persona'], 'Ana P4 M')
+
+        with self.assertNumQueries(0):
+            cache_dashboard.obtener()
+
+        self._persona(9, 'Licencia')
+        contexto = cache_dashboard.obtener()
+        self.assertEqual((contexto['total_personal'], contexto['personal_licencia']), (6, 2))
@@ -1,11 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
-from catalogos.models import Unidad, Grado
-from personal.models import PersonalPolicial, KardexDigital, DestinoPolicial
+from django.db.models import Q
+from personal.models import PersonalPolicial, DestinoPolicial
+from personal.utils import resolver_destinos
 
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView
@@ -13,7 +13,10 @@ from django.contrib.auth.forms import UserCreationForm
 from django import forms
 from .models import Usuario
 from .mixins import AdminRequiredMixin
+from . import cache_dashboard
 
+from reportes import limite_login
+from reportes.lecturas import registrar_lectura
 from reportes.utils import registrar_log
 
 
@@ -32,11 +35,18 @@ def custom_login(request):
             return redirect('dashboard')
 
     if request.method == 'POST':
+        # Con demasiados fallos recientes se rechaza sin calcular el hash de la contraseña
+        ip = limite_login.ip_cliente(request)
+        if limite_login.bloqueado(ip, request.POST.get('username')):
+            limite_login.registrar_rechazo(ip, request.POST.get('username'))
+            messages.error(request, '⛔ Demasiados intentos fallidos. Espere unos minutos e intente de nuevo.')
+            return render(request, 'login.html', {'form': AuthenticationForm()}, status=429)
+
         form = AuthenticationForm(request, data=request.POST)
         if form.is_valid():
             username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
+            # is_valid() ya autenticó: no se vuelve a calcular el hash
+            user = form.get_user()
 
             if user is not None:
                 login(request, user)
@@ -74,28 +84,8 @@ def dashboard(request):
     if request.user.es_usuario_autorizado():
         return redirect('mi_perfil')
 
-    total_personal    = PersonalPolicial.objects.count()
-    personal_activo   = PersonalPolicial.objects.filter(estado_actual__nombre='Activo').count()
-    personal_licencia = PersonalPolicial.objects.filter(estado_actual__nombre='Licencia').count()
-
-    personal_por_unidad = Unidad.objects.annotate(
-        total=Count('personalpolicial')
-    ).values('nombre', 'total')
-
-    personal_por_grado = Grado.objects.annotate(
-        total=Count('personalpolicial')
-    ).values('nombre', 'abreviatura', 'total')
-
-    ultimos_registros = KardexDigital.objects.select_related('personal').order_by('-fecha_creacion')[:10]
-
-    context = {
-        'total_personal'    : total_personal,
-        'personal_activo'   : personal_activo,
-        'personal_licencia' : personal_licencia,
-        'personal_por_unidad': personal_por_unidad,
-        'personal_por_grado': personal_por_grado,
-        'ultimos_registros' : ultimos_registros,
-    }
+    # Conteos y últimos registros desde el caché (ver core/cache_dashboard.py)
+    context = cache_dashboard.obtener()
     return render(request, 'dashboard.html', context)
 
 
@@ -119,8 +109,8 @@ def mi_perfil(request):
     permisos       = personal.permisos.all()[:10]
     sanciones      = personal.sanciones_aplicadas.all()[:10]
     felicitaciones = personal.felicitaciones_aplicadas.all()[:10]
-    destinos       = personal.destinos.all()
-    destino_activo = personal.destinos.filter(activo=True).first()
+    destinos       = personal.destinos.select_related('unidad_destino')
+    destino_activo = resolver_destinos([personal])[0].destino_activo
 
     context = {
         'personal'      : personal,
@@ -131,6 +121,7 @@ def mi_perfil(request):
         'destinos'      : destinos,
         'destino_activo': destino_activo,
     }
+    registrar_lectura(request, 'personal', personal)
     return render(request, 'core/mi_perfil.html', context)
 
 
@@ -3,6 +3,17 @@ ASGI config for gestion_policial project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+La bitácora en vivo (/reportes/bitacora/en-vivo/, server-sent events) es una
+vista async que mantiene la conexión abierta y solo funciona con este
+`application` desde un servidor ASGI. Con WSGI (runserver, wsgi.py) la
+vista responde 501 y el botón "En vivo" no aparece.
+Ver reportes/bitacora_en_vivo.py.
+
+Uso:
+    uvicorn gestion_policial.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+Los estáticos los sigue sirviendo whitenoise (middleware), igual que con WSGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
@@ -41,6 +41,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'reportes.middleware.BitacoraMiddleware',               # ← bitácora: un INSERT por request
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.CheckActiveUserMiddleware',
@@ -117,6 +118,57 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# ── Archivos subidos / generados ──────────────────────────────────
+MEDIA_URL  = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# ── Caché ─────────────────────────────────────────────────────────
+# En disco para que todos los workers compartan sellos de versión y contadores
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', BASE_DIR / 'cache'))
+
+CACHES = {
+    'default': {
+        'BACKEND' : 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'django',
+    }
+}
+
+# Exportaciones ya generadas (ver reportes/cache_exportaciones.py)
+EXPORT_CACHE_DIR       = CACHE_DIR / 'exportaciones'
+EXPORT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_MB', '500')) * 1024 * 1024
+
+# Vigencia máxima del dashboard en caché; las señales lo renuevan antes (ver core/cache_dashboard.py)
+DASHBOARD_CACHE_SEGUNDOS = int(os.environ.get('DASHBOARD_CACHE_SEGUNDOS', '3600'))
+
+# Archivo histórico de la bitácora (ver reportes/archivo_bitacora.py)
+BITACORA_ARCHIVO_DIR = Path(os.environ.get('BITACORA_ARCHIVO_DIR', BASE_DIR / 'archivo' / 'bitacora'))
+
+# Procesos por descarga web de hojas de vida en lote; el comando generar_hojas_vida
+# usa todos los núcleos (ver reportes/hojas_vida.py)
+HOJAS_VIDA_PROCESOS = int(os.environ.get('HOJAS_VIDA_PROCESOS', '2'))
+
+# Escritura diferida de la bitácora (ver reportes/escritor_bitacora.py)
+BITACORA_ASINCRONA = os.environ.get('BITACORA_ASINCRONA', 'False') == 'True'
+BITACORA_LOTE      = int(os.environ.get('BITACORA_LOTE', '200'))
+BITACORA_INTERVALO = float(os.environ.get('BITACORA_INTERVALO', '1.0'))
+BITACORA_COLA_MAX  = int(os.environ.get('BITACORA_COLA_MAX', '10000'))
+
+# Consultas (VER) agregadas por usuario, registro y hora (ver reportes/lecturas.py);
+# los módulos listados en BITACORA_LECTURAS_COMPLETAS registran cada consulta
+BITACORA_LECTURAS_INTERVALO = float(os.environ.get('BITACORA_LECTURAS_INTERVALO', '60'))
+BITACORA_LECTURAS_COMPLETAS = tuple(
+    modulo for modulo in os.environ.get('BITACORA_LECTURAS_COMPLETAS', '').split(',') if modulo
+)
+
+# Límite de logins fallidos por IP y por par IP + usuario (ver reportes/limite_login.py)
+LOGIN_VENTANA            = int(os.environ.get('LOGIN_VENTANA', '300'))
+LOGIN_MAX_FALLOS_IP      = int(os.environ.get('LOGIN_MAX_FALLOS_IP', '20'))
+LOGIN_MAX_FALLOS_USUARIO = int(os.environ.get('LOGIN_MAX_FALLOS_USUARIO', '5'))
+# IPs de los proxies propios (nginx, balanceador) cuyo X-Forwarded-For se acepta
+PROXIES_CONFIABLES       = tuple(
+    ip.strip() for ip in os.environ.get('PROXIES_CONFIABLES', '').split(',') if ip.strip()
+)
+
 # ── Otros ─────────────────────────────────────────────────────────
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -17,6 +17,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth.views import LogoutView
 
+from reportes import limite_login
+
+# El login del admin también pasa por el límite de intentos fallidos
+admin.site.login = limite_login.limitar_login(admin.site.login)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls')),
@@ -0,0 +1,91 @@
+"""
+Conteos de personal por unidad, grado, estado, género y activo.
+
+ConteoPersonal guarda cuántas personas hay en cada combinación. Lo mantienen
+triggers de la base de datos (migración 0006), así que cualquier escritura
+sobre el personal queda contada: save(), queryset.update(), bulk_create,
+cargas masivas o SQL directo. Leer un conteo son unas pocas filas, sin
+recorrer la tabla de personal.
+
+En motores sin triggers (no PostgreSQL ni SQLite), conteos() agrupa
+PersonalPolicial directamente y da el mismo resultado.
+
+`verificar_conteos` compara la tabla con el personal real y la rehace si hay
+diferencias, por ejemplo después de restaurar un respaldo parcial o de
+desactivar los triggers.
+
+Uso:
+    from personal.conteos import conteos
+    conteos('unidad_id', activo=True)     # {(unidad_id,): total}
+    conteos()                             # {(): total}
+
+    python manage.py verificar_conteos
+    python manage.py verificar_conteos --reparar
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from .models import ConteoPersonal, PersonalPolicial
+
+
+CAMPOS = ('unidad_id', 'grado_id', 'estado_actual_id', 'genero', 'activo')
+
+
+def disponible():
+    """True si la base de datos tiene los triggers de ConteoPersonal."""
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def conteos(*campos, **filtros):
+    """
+    Total de personal agrupado por `campos`, con filtros sobre CAMPOS
+    (p. ej. activo=True, estado_actual__nombre='Activo').
+    """
+    if disponible():
+        queryset, suma = ConteoPersonal.objects.filter(**filtros), Sum('total')
+    else:
+        queryset, suma = PersonalPolicial.objects.filter(**filtros), Count('pk')
+    if not campos:
+        total = queryset.aggregate(n=suma)['n']
+        return {(): total} if total else {}
+    filas = queryset.order_by().values_list(*campos).annotate(n=suma)
+    return {tuple(fila[:-1]): fila[-1] for fila in filas if fila[-1]}
+
+
+def _reales():
+    filas = PersonalPolicial.objects.order_by().values_list(*CAMPOS).annotate(n=Count('pk'))
+    return {tuple(fila[:-1]): fila[-1] for fila in filas}
+
+
+def _guardados():
+    filas = ConteoPersonal.objects.exclude(total=0).values_list(*CAMPOS, 'total')
+    return {tuple(fila[:-1]): fila[-1] for fila in filas}
+
+
+def diferencias():
+    """{clave: (guardado, real)} de las combinaciones que no coinciden."""
+    reales, guardados = _reales(), _guardados()
+    return {
+        clave: (guardados.get(clave, 0), reales.get(clave, 0))
+        for clave in reales.keys() | guardados.keys()
+        if guardados.get(clave, 0) != reales.get(clave, 0)
+    }
+
+
+def reparar():
+    """Rehace ConteoPersonal desde el personal; devuelve cuántas filas escribió."""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Sin escrituras concurrentes sobre el personal mientras se recuenta
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE {connection.ops.quote_name(PersonalPolicial._meta.db_table)} IN SHARE MODE'
+                )
+        ConteoPersonal.objects.all().delete()
+        nuevos = [
+            ConteoPersonal(**dict(zip(CAMPOS, clave)), total=total)
+            for clave, total in _reales().items()
+        ]
+        ConteoPersonal.objects.bulk_create(nuevos, batch_size=500)
+    return len(nuevos)
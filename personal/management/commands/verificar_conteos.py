@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from personal.conteos import diferencias, disponible, reparar
+
+
+class Command(BaseCommand):
+    help = 'Compara los conteos de personal (ConteoPersonal) con el personal registrado y, si se pide, los rehace.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reparar', action='store_true',
+            help='Rehace la tabla de conteos cuando hay diferencias.',
+        )
+
+    def handle(self, *args, **options):
+        if not disponible():
+            raise CommandError('Este motor de base de datos no tiene triggers de conteo; los conteos se calculan en cada consulta')
+
+        distintas = diferencias()
+        if not distintas:
+            self.stdout.write(self.style.SUCCESS('✅ Los conteos de personal coinciden'))
+            return
+
+        for clave, (guardado, real) in sorted(distintas.items(), key=lambda item: tuple(map(str, item[0]))):
+            unidad, grado, estado, genero, activo = clave
+            self.stdout.write(
+                f'   ⚠️ unidad {unidad}, grado {grado}, estado {estado}, {genero}, '
+                f'{"activo" if activo else "inactivo"}: guardado {guardado}, real {real}'
+            )
+
+        if not options['reparar']:
+            raise CommandError(f'{len(distintas)} conteo(s) con diferencias; ejecute con --reparar')
+
+        filas = reparar()
+        self.stdout.write(self.style.SUCCESS(f'✅ Conteos rehechos ({filas} filas)'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogos', '0001_initial'),
+        ('personal', '0004_alter_destinopolicial_descripcion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteoPersonal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genero', models.CharField(choices=[('M', 'Masculino'), ('F', 'Femenino')], max_length=1)),
+                ('activo', models.BooleanField()),
+                ('total', models.IntegerField(default=0)),
+                ('estado_actual', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalogos.tipoestado')),
+                ('grado', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalogos.grado')),
+                ('unidad', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalogos.unidad')),
+            ],
+            options={
+                'verbose_name': 'Conteo de personal',
+                'verbose_name_plural': 'Conteos de personal',
+                'constraints': [models.UniqueConstraint(fields=('unidad', 'grado', 'estado_actual', 'genero', 'activo'), name='conteo_personal_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,119 @@
+"""
+Triggers que mantienen personal_conteopersonal al día y carga inicial.
+
+PostgreSQL: triggers por sentencia con tablas de transición. Cada INSERT,
+UPDATE o DELETE sobre el personal, incluidos los masivos, agrupa sus filas
+por (unidad, grado, estado, género, activo) y suma la diferencia neta con un
+solo INSERT ... ON CONFLICT DO UPDATE. Un UPDATE que no cambia esas columnas
+no escribe nada.
+
+SQLite (desarrollo y pruebas): triggers por fila con el mismo efecto.
+
+En otros motores no crea nada y personal/conteos.py agrupa el personal
+directamente.
+"""
+
+from django.db import migrations
+
+
+PERSONAL = 'personal_personalpolicial'
+CONTEO   = 'personal_conteopersonal'
+CLAVE    = 'unidad_id, grado_id, estado_actual_id, genero, activo'
+
+
+def _funcion(nombre, filas):
+    # filas: SELECT de (CLAVE, n) con +1 por fila nueva y -1 por fila anterior
+    return f"""
+    CREATE OR REPLACE FUNCTION {nombre}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO {CONTEO} ({CLAVE}, total)
+        SELECT {CLAVE}, sum(n) FROM ({filas}) AS cambios
+        GROUP BY {CLAVE}
+        HAVING sum(n) <> 0
+        ORDER BY {CLAVE}
+        ON CONFLICT ({CLAVE}) DO UPDATE SET total = {CONTEO}.total + EXCLUDED.total;
+        RETURN NULL;
+    END $$
+    """
+
+
+_NUEVAS = f'SELECT {CLAVE}, 1 AS n FROM nuevas'
+_VIEJAS = f'SELECT {CLAVE}, -1 AS n FROM viejas'
+
+POSTGRESQL = [
+    _funcion('conteo_personal_insert', _NUEVAS),
+    _funcion('conteo_personal_update', f'{_NUEVAS} UNION ALL {_VIEJAS}'),
+    _funcion('conteo_personal_delete', _VIEJAS),
+    f"""CREATE TRIGGER conteo_personal_insert AFTER INSERT ON {PERSONAL}
+        REFERENCING NEW TABLE AS nuevas
+        FOR EACH STATEMENT EXECUTE FUNCTION conteo_personal_insert()""",
+    f"""CREATE TRIGGER conteo_personal_update AFTER UPDATE ON {PERSONAL}
+        REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+        FOR EACH STATEMENT EXECUTE FUNCTION conteo_personal_update()""",
+    f"""CREATE TRIGGER conteo_personal_delete AFTER DELETE ON {PERSONAL}
+        REFERENCING OLD TABLE AS viejas
+        FOR EACH STATEMENT EXECUTE FUNCTION conteo_personal_delete()""",
+]
+
+POSTGRESQL_REVERSO = [
+    f'DROP TRIGGER IF EXISTS conteo_personal_{op} ON {PERSONAL}' for op in ('insert', 'update', 'delete')
+] + [
+    f'DROP FUNCTION IF EXISTS conteo_personal_{op}()' for op in ('insert', 'update', 'delete')
+]
+
+
+def _sumar(fila):
+    return f"""
+        INSERT INTO {CONTEO} ({CLAVE}, total)
+        VALUES ({fila}.unidad_id, {fila}.grado_id, {fila}.estado_actual_id, {fila}.genero, {fila}.activo, 1)
+        ON CONFLICT ({CLAVE}) DO UPDATE SET total = total + 1;"""
+
+
+def _restar(fila):
+    return f"""
+        UPDATE {CONTEO} SET total = total - 1
+        WHERE unidad_id = {fila}.unidad_id AND grado_id = {fila}.grado_id
+          AND estado_actual_id = {fila}.estado_actual_id AND genero = {fila}.genero AND activo = {fila}.activo;"""
+
+
+SQLITE = [
+    f'CREATE TRIGGER conteo_personal_insert AFTER INSERT ON {PERSONAL} BEGIN {_sumar("NEW")} END',
+    f"""CREATE TRIGGER conteo_personal_update AFTER UPDATE OF {CLAVE} ON {PERSONAL}
+        WHEN OLD.unidad_id IS NOT NEW.unidad_id OR OLD.grado_id IS NOT NEW.grado_id
+          OR OLD.estado_actual_id IS NOT NEW.estado_actual_id OR OLD.genero IS NOT NEW.genero
+          OR OLD.activo IS NOT NEW.activo
+        BEGIN {_restar("OLD")} {_sumar("NEW")} END""",
+    f'CREATE TRIGGER conteo_personal_delete AFTER DELETE ON {PERSONAL} BEGIN {_restar("OLD")} END',
+]
+
+SQLITE_REVERSO = [f'DROP TRIGGER IF EXISTS conteo_personal_{op}' for op in ('insert', 'update', 'delete')]
+
+CARGA_INICIAL = [
+    f'DELETE FROM {CONTEO}',
+    f'INSERT INTO {CONTEO} ({CLAVE}, total) SELECT {CLAVE}, count(*) FROM {PERSONAL} GROUP BY {CLAVE}',
+]
+
+
+def crear(apps, schema_editor):
+    sentencias = {'postgresql': POSTGRESQL, 'sqlite': SQLITE}.get(schema_editor.connection.vendor)
+    if sentencias is None:
+        return
+    for sql in sentencias + CARGA_INICIAL:
+        schema_editor.execute(sql)
+
+
+def quitar(apps, schema_editor):
+    sentencias = {'postgresql': POSTGRESQL_REVERSO, 'sqlite': SQLITE_REVERSO}.get(schema_editor.connection.vendor)
+    for sql in sentencias or []:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personal', '0005_conteopersonal'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, quitar),
+    ]
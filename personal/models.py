@@ -62,6 +62,35 @@ class PersonalPolicial(models.Model):
     def nombre_completo(self):
         return f"{self.nombres} {self.apellido_paterno} {self.apellido_materno}"
 
+
+class ConteoPersonal(models.Model):
+    """
+    Cantidad de personal por unidad, grado, estado, género y activo.
+
+    La mantienen triggers de la base de datos sobre personal_personalpolicial
+    (migración 0006), así que también cuenta los update() y bulk_create. Se
+    lee con personal/conteos.py y se verifica con `verificar_conteos`.
+    """
+    unidad        = models.ForeignKey('catalogos.Unidad', on_delete=models.CASCADE, db_index=False, related_name='+')
+    grado         = models.ForeignKey('catalogos.Grado', on_delete=models.CASCADE, db_index=False, related_name='+')
+    estado_actual = models.ForeignKey('catalogos.TipoEstado', on_delete=models.CASCADE, db_index=False, related_name='+')
+    genero        = models.CharField(max_length=1, choices=PersonalPolicial.GENERO_CHOICES)
+    activo        = models.BooleanField()
+    total         = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name        = 'Conteo de personal'
+        verbose_name_plural = 'Conteos de personal'
+        constraints         = [
+            models.UniqueConstraint(
+                fields=['unidad', 'grado', 'estado_actual', 'genero', 'activo'],
+                name='conteo_personal_unico',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.unidad_id}/{self.grado_id}/{self.estado_actual_id}/{self.genero}/{self.activo}: {self.total}"
+
 class KardexDigital(models.Model):
     TIPO_REGISTRO_CHOICES = [
         ('ingreso', 'Ingreso a la Institución'),
@@ -1,3 +1,252 @@
+import io
+import secrets
+import zipfile
+from datetime import date
+
+import openpyxl
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalogos.models import Grado, Unidad, TipoEstado
+from core.models import Usuario
+from reportes.csv_export import respuesta_delimitada
+from reportes.excel import libro_hojas, libro_reporte, libros_por_grupo, xlsx_streaming
+from reportes.hojas_vida import zip_hojas_vida
+from reportes.informes import (
+    ORDEN_PERSONAL, REPORTE_PERSONAL, REPORTE_PERSONAL_PANTALLA, REPORTE_PERSONAL_TEXTO, hojas_expediente,
+    queryset_personal,
+)
+from reportes.pdf_tabla import dibujar_pdf
+from reportes.proyeccion import Columna, Reporte
+from .conteos import conteos, diferencias
+from .models import ConteoPersonal, PersonalPolicial, DestinoPolicial
+from .utils import resolver_destinos
+
+
+class ResolverDestinosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grado  = Grado.objects.create(nombre='Capitán', abreviatura='CAP', orden=5)
+        cls.unidad = Unidad.objects.create(codigo='UTEPPI', nombre='UTEPPI')
+        cls.estado = TipoEstado.objects.create(nombre='Activo')
+
+    def _crear_personal(self, cantidad):
+        inicio = PersonalPolicial.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            p = PersonalPolicial.objects.create(
+                codigo_identificacion=f'COD{i}', ci=f'{1000 + i}',
+                nombres='Juan Carlos', apellido_paterno=f'Pérez{i}', apellido_materno='López',
+                fecha_nacimiento=date(1990, 1, 1), genero='M',
+                grado=self.grado, unidad=self.unidad, estado_actual=self.estado,
+                fecha_ingreso=date(2010, 1, 1),
+            )
+            for anio, activo in ((2012, False), (2016, False), (2020, True)):
+                DestinoPolicial.objects.create(
+                    personal=p, tipo_destino='asignacion', unidad_destino=self.unidad,
+                    lugar_destino=f'Destino {anio}', fecha_inicio=date(anio, 1, 1),
+                    activo=activo, descripcion='Asignación',
+                )
+
+    def _consultas(self):
+        with CaptureQueriesContext(connection) as ctx:
+            libro_reporte(REPORTE_PERSONAL, queryset_personal({}), 'Personal').save(io.BytesIO())
+        return len(ctx.captured_queries)
+
+    def test_resuelve_destino_activo_y_anterior(self):
+        self._crear_personal(2)
+        personas = list(PersonalPolicial.objects.all())
+        with self.assertNumQueries(1):
+            resolver_destinos(personas)
+        for p in personas:
+            self.assertEqual(p.destino_activo.lugar_destino, 'Destino 2020')
+            self.assertEqual(p.destino_anterior.lugar_destino, 'Destino 2016')
+
+    def test_resuelve_todos_los_destinos_activos(self):
+        self._crear_personal(1)
+        persona = PersonalPolicial.objects.get()
+        DestinoPolicial.objects.create(
+            personal=persona, tipo_destino='asignacion', lugar_destino='Comisión 2022',
+            fecha_inicio=date(2022, 1, 1), activo=True, descripcion='Comisión',
+        )
+        resolver_destinos([persona])
+        self.assertEqual([d.lugar_destino for d in persona.destinos_activos],
+                         ['Comisión 2022', 'Destino 2020'])
+        self.assertEqual(persona.destino_activo.lugar_destino, 'Comisión 2022')
+        self.assertEqual(persona.destino_anterior.lugar_destino, 'Destino 2016')
+
+    def test_listas_muestran_todos_los_destinos_activos(self):
+        self._crear_personal(3)
+        DestinoPolicial.objects.create(
+            personal=PersonalPolicial.objects.first(), tipo_destino='asignacion',
+            lugar_destino='Comisión 2022', fecha_inicio=date(2022, 1, 1),
+            activo=True, descripcion='Comisión',
+        )
+        self.client.force_login(Usuario.objects.create_user('admin', password='x', rol='admin'))
+
+        def consultas(url):
+            with CaptureQueriesContext(connection) as ctx:
+                respuesta = self.client.get(url)
+            return respuesta, len(ctx.captured_queries)
+
+        for url in ('/reportes/personal/', '/personal/reporte/'):
+            respuesta, _ = consultas(url)
+            self.assertContains(respuesta, '<span class="badge bg-success">Comisión 2022</span>', html=True)
+            self.assertContains(respuesta, '<span class="badge bg-success">Destino 2020</span>', count=3, html=True)
+        _, pocas = consultas('/reportes/personal/')
+        self._crear_personal(30)
+        _, muchas = consultas('/reportes/personal/')
+        self.assertEqual(pocas, muchas)
+
+    def test_consultas_constantes_al_crecer_filas(self):
+        self._crear_personal(3)
+        pocas = self._consultas()
+        self._crear_personal(30)
+        muchas = self._consultas()
+        self.assertEqual(pocas, muchas)
+
+    def test_cada_salida_es_una_sola_consulta(self):
+        self._crear_personal(30)
+        qs = queryset_personal({})
+        with self.assertNumQueries(1):
+            libro = b''.join(xlsx_streaming([('Personal', REPORTE_PERSONAL, qs)]))
+        with self.assertNumQueries(1):
+            dibujar_pdf(REPORTE_PERSONAL_PANTALLA, qs, io.BytesIO(), 'subtítulo')
+        with self.assertNumQueries(1):
+            texto = b''.join(respuesta_delimitada(
+                REPORTE_PERSONAL_TEXTO.encabezados, REPORTE_PERSONAL_TEXTO.filas(qs), 'reporte',
+            ).streaming_content)
+
+        hoja = openpyxl.load_workbook(io.BytesIO(libro), read_only=True)['Personal']
+        self.assertEqual(len(list(hoja.iter_rows())), 3 + 30)
+        self.assertEqual(texto.count(b'\r\n'), 1 + 30)
+
+    def test_reporte_personal_proyecta_destinos(self):
+        self._crear_personal(1)
+        fila = next(REPORTE_PERSONAL.filas(queryset_personal({})))
+        columnas = dict(zip(REPORTE_PERSONAL.encabezados, fila))
+        self.assertEqual(columnas['1ER. NOMBRE'], 'Juan')
+        self.assertEqual(columnas['2DO. NOMBRE'], 'Carlos')
+        self.assertEqual(columnas['SEXO'], 'Masculino')
+        self.assertEqual(columnas['UNIDAD DE DESTINO ACTUAL'], 'UTEPPI')
+        self.assertEqual(columnas['FECHA DESTINO ACTUAL'], '2020-01-01')
+        self.assertEqual(columnas['DESTINO ANTERIOR'], 'Destino 2016 (2016-01-01 - actualidad)')
+
+    def test_expediente_una_consulta_por_hoja(self):
+        self._crear_personal(2)
+        otra = Unidad.objects.create(codigo='OTRA', nombre='Otra unidad')
+        PersonalPolicial.objects.filter(ci='1001').update(unidad=otra)
+
+        hojas = hojas_expediente({'unidad': str(self.unidad.pk)})
+        with self.assertNumQueries(len(hojas)):
+            wb = libro_hojas(hojas)
+            wb.save(io.BytesIO())
+        self.assertEqual(wb.sheetnames, [nombre for nombre, _, _ in hojas])
+
+        destinos = dict((nombre, reporte) for nombre, reporte, _ in hojas)['Destinos']
+        filas = list(destinos.filas(hojas[-1][2]))
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[0][:2], ['CAP', '1000'])
+        self.assertEqual(dict(zip(destinos.encabezados, filas[0]))['UNIDAD'], 'UTEPPI')
+
+    def test_excel_en_streaming_entrega_bloques_antes_del_final(self):
+        self._crear_personal(6)
+        leidas  = []
+        reporte = Reporte('PRUEBA', columnas=[
+            Columna('C. I.', 'ci'),
+            # Texto poco comprimible: cada fila agrega varios KB al ZIP
+            Columna('RELLENO', 'ci', transformar=lambda ci: leidas.append(ci) or secrets.token_hex(20000)),
+        ])
+        antes_del_final = []
+        partes          = []
+        for parte in xlsx_streaming([('Prueba', reporte, queryset_personal({}))], chunk_size=1):
+            if parte:
+                antes_del_final.append(len(leidas) < 6)
+            partes.append(parte)
+        self.assertTrue(antes_del_final[0])
+
+        ws = openpyxl.load_workbook(io.BytesIO(b''.join(partes)), read_only=True)['Prueba']
+        filas = list(ws.iter_rows(values_only=True))
+        self.assertEqual(filas[0][0], 'PRUEBA')
+        self.assertEqual(filas[2], ('C. I.', 'RELLENO'))
+        self.assertEqual([f[0] for f in filas[3:]], leidas)
+
+    def test_hojas_vida_un_pdf_por_persona(self):
+        self._crear_personal(3)
+        contenido = b''.join(zip_hojas_vida(queryset_personal({}), procesos=1))
+        with zipfile.ZipFile(io.BytesIO(contenido)) as zf:
+            self.assertIsNone(zf.testzip())
+            nombres = zf.namelist()
+            self.assertEqual(len(nombres), 3)
+            self.assertEqual(nombres[0], 'cap-perez0-lopez-juan-carlos_1000.pdf')
+            self.assertTrue(zf.read(nombres[0]).startswith(b'%PDF'))
+
+    def test_libros_por_unidad_en_una_consulta(self):
+        self._crear_personal(3)
+        otra = Unidad.objects.create(codigo='OTRA', nombre='Otra unidad')
+        PersonalPolicial.objects.filter(ci='1001').update(unidad=otra)
+
+        qs = queryset_personal({}).order_by('unidad_id', *ORDEN_PERSONAL)
+        unidades = []
+        with self.assertNumQueries(1):
+            for unidad, wb in libros_por_grupo(REPORTE_PERSONAL, qs, 'unidad_id', 'Personal'):
+                wb.save(io.BytesIO())
+                unidades.append(unidad)
+        self.assertEqual(unidades, [self.unidad.pk, otra.pk])
+
+        grupos = {u: [f[5] for f in filas] for u, filas in REPORTE_PERSONAL.grupos(qs, 'unidad_id')}
+        self.assertEqual(grupos, {self.unidad.pk: ['1000', '1002'], otra.pk: ['1001']})
+
+
+class ConteoPersonalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grado   = Grado.objects.create(nombre='Sargento', abreviatura='SGT', orden=2)
+        cls.unidades = [Unidad.objects.create(codigo=f'U{i}', nombre=f'Unidad {i}') for i in range(2)]
+        cls.activo  = TipoEstado.objects.create(nombre='Activo')
+        cls.baja    = TipoEstado.objects.create(nombre='Baja')
+
+    def _persona(self, i, unidad=0, genero='M'):
+        return PersonalPolicial(
+            codigo_identificacion=f'K{i}', ci=f'{5000 + i}', nombres='Luis', apellido_paterno=f'R{i}',
+            apellido_materno='S', fecha_nacimiento=date(1985, 1, 1), genero=genero,
+            grado=self.grado, unidad=self.unidades[unidad], estado_actual=self.activo,
+            fecha_ingreso=date(2008, 1, 1),
+        )
+
+    def test_conteos_exactos_con_update_y_bulk_create(self):
+        self._persona(0).save()
+        PersonalPolicial.objects.bulk_create([self._persona(i, unidad=i % 2, genero='F') for i in range(1, 7)])
+        self.assertEqual(conteos(), {(): 7})
+        self.assertEqual(conteos('unidad_id'), {(self.unidades[0].pk,): 4, (self.unidades[1].pk,): 3})
+
+        PersonalPolicial.objects.filter(unidad=self.unidades[1]).update(estado_actual=self.baja, activo=False)
+        PersonalPolicial.objects.filter(ci='5000').delete()
+        self.assertEqual(conteos('estado_actual__nombre'), {('Activo',): 3, ('Baja',): 3})
+        self.assertEqual(conteos('genero', activo=True), {('F',): 3})
+        self.assertEqual(diferencias(), {})
+
+    def test_lista_de_personal_toma_el_total_de_los_conteos(self):
+        PersonalPolicial.objects.bulk_create([self._persona(i) for i in range(4)])
+        self.client.force_login(Usuario.objects.create_user('admin', password='x', rol='admin'))
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get('/personal/?buscar=nadie')
+        self.assertEqual(respuesta.context['total_general'], 4)
+        self.assertTrue(any('personal_conteopersonal' in c['sql'] for c in consultas.captured_queries))
+
+    def test_verificar_conteos_detecta_y_repara(self):
+        PersonalPolicial.objects.bulk_create([self._persona(i) for i in range(3)])
+        ConteoPersonal.objects.update(total=10)
+        self.assertEqual(list(diferencias().values()), [(10, 3)])
 
-# Create your tests here.
+        salida = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('verificar_conteos', stdout=salida)
+        call_command('verificar_conteos', '--reparar', stdout=salida)
+        self.assertIn('guardado 10, real 3', salida.getvalue())
+        self.assertEqual(diferencias(), {})
+        self.assertEqual(conteos(), {(): 3})
@@ -0,0 +1,71 @@
+"""
+Utilidades de personal.
+
+Resolución por lotes de los destinos activos y el anterior:
+    from personal.utils import destinos_vigentes, resolver_destinos
+
+    vigentes = destinos_vigentes(ids)                # una consulta por página
+    activos, anterior = vigentes[pk]
+
+    personas = resolver_destinos(page.object_list)   # lo mismo, sobre instancias
+    for p in personas:
+        p.destinos_activos, p.destino_activo, p.destino_anterior
+"""
+
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import DestinoPolicial
+
+
+
+def destinos_vigentes(personal_ids):
+    """
+    {personal_id: ([destinos activos], destino_anterior)} para el lote.
+
+    Los activos van del más reciente al más antiguo; el anterior es el último
+    inactivo, o None. Usa ROW_NUMBER() particionado por (personal, activo) y
+    ordenado por fecha de inicio descendente: la base devuelve todos los
+    activos y solo el primer inactivo de cada persona, en una única consulta.
+    Las personas sin destinos no aparecen en el diccionario.
+    """
+    vigentes = {}
+    if not personal_ids:
+        return vigentes
+
+    destinos = DestinoPolicial.objects.filter(
+        personal_id__in=personal_ids
+    ).annotate(
+        fila=Window(
+            RowNumber(),
+            partition_by=[F('personal_id'), F('activo')],
+            order_by=[F('fecha_inicio').desc(), F('pk').desc()],
+        )
+    ).filter(
+        Q(activo=True) | Q(fila=1)
+    ).select_related('unidad_destino').order_by('-fecha_inicio', '-pk')
+
+    for d in destinos:
+        activos, anterior = vigentes.get(d.personal_id, ([], None))
+        if d.activo:
+            activos.append(d)
+        else:
+            anterior = d
+        vigentes[d.personal_id] = (activos, anterior)
+    return vigentes
+
+
+def resolver_destinos(personas):
+    """
+    Asigna `destinos_activos`, `destino_activo` (el más reciente de ellos) y
+    `destino_anterior` a cada persona del lote, con destinos_vigentes().
+    Devuelve la lista de personas.
+    """
+    personas = list(personas)
+    vigentes = destinos_vigentes([p.pk for p in personas])
+    for p in personas:
+        activos, anterior  = vigentes.get(p.pk, ([], None))
+        p.destinos_activos = activos
+        p.destino_activo   = activos[0] if activos else None
+        p.destino_anterior = anterior
+    return personas
@@ -1,9 +1,3 @@
-import io
-from django.http import HttpResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.utils import timezone
@@ -19,7 +13,9 @@ from .models import (
     FelicitacionAplicada,
     KardexDigital
 )
-from catalogos.models import TipoFelicitacion
+from catalogos import cache_catalogos
+from catalogos.cache_catalogos import CatalogosEnCacheMixin
+from catalogos.models import Grado, TipoEstado, TipoFelicitacion, Unidad
 
 from core.mixins import (
     AdminRequiredMixin,
@@ -32,7 +28,12 @@ from core.mixins import (
     PuedeGestionarSancionesMixin
 )
 
+from .conteos import conteos
+from .utils import resolver_destinos
+from reportes.lecturas import registrar_lectura
 from reportes.utils import BitacoraMixin, registrar_log
+from reportes.views import ReportePersonalView as ReporteBaseView
+from reportes.views import exportar_personal_excel  # noqa: F401 — usada en personal/urls.py
 
 
 # ==========================================
@@ -93,15 +94,14 @@ class PersonalListView(UsuarioAutorizadoRequiredMixin, ListView):
         context['genero_sel'] = self.request.GET.get('genero', '')
         context['activo_sel'] = self.request.GET.get('activo', '')
 
-        from catalogos.models import Grado, Unidad, TipoEstado
-        context['grados']         = Grado.objects.filter(activo=True).order_by('orden')
-        context['unidades']       = Unidad.objects.filter(activa=True).order_by('nombre')
-        context['estados']        = TipoEstado.objects.all()
-        context['total_general']  = PersonalPolicial.objects.count()
+        context['grados']         = cache_catalogos.lista(Grado, activo=True)
+        context['unidades']       = cache_catalogos.lista(Unidad, orden='nombre', activa=True)
+        context['estados']        = cache_catalogos.lista(TipoEstado)
+        context['total_general']  = conteos().get((), 0)
         return context
 
 
-class PersonalCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
+class PersonalCreateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeCrearMixin, CreateView):
     bitacora_modulo = 'personal'
     model = PersonalPolicial
     template_name = 'personal/personal_form.html'
@@ -119,7 +119,7 @@ class PersonalCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
     success_url = reverse_lazy('personal_list')
 
 
-class PersonalUpdateView(BitacoraMixin, PuedeEditarMixin, UpdateView):
+class PersonalUpdateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeEditarMixin, UpdateView):
     bitacora_modulo = 'personal'
     model = PersonalPolicial
     template_name = 'personal/personal_form.html'
@@ -142,6 +142,11 @@ class PersonalDetailView(UsuarioAutorizadoRequiredMixin, DetailView):
     template_name = 'personal/personal_detail.html'
     context_object_name = 'persona'
 
+    def get_context_data(self, **kwargs):
+        resolver_destinos([self.object])
+        registrar_lectura(self.request, 'personal', self.object)
+        return super().get_context_data(**kwargs)
+
 
 class PersonalDeleteView(BitacoraMixin, PuedeEliminarMixin, DeleteView):
     bitacora_modulo = 'personal'
@@ -166,10 +171,11 @@ class KardexPersonalListView(UsuarioAutorizadoRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['persona'] = PersonalPolicial.objects.get(pk=self.kwargs['personal_id'])
+        registrar_lectura(self.request, 'kardex', context['persona'])
         return context
 
 
-class KardexCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
+class KardexCreateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeCrearMixin, CreateView):
     bitacora_modulo = 'kardex'
     model = KardexDigital
     template_name = 'personal/kardex_form.html'
@@ -194,9 +200,9 @@ class KardexCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
         form.fields['estado_nuevo'].required    = False
 
         personal = PersonalPolicial.objects.get(pk=self.kwargs['personal_id'])
-        form.fields['grado_anterior'].initial  = personal.grado
-        form.fields['unidad_anterior'].initial = personal.unidad
-        form.fields['estado_anterior'].initial = personal.estado_actual
+        form.fields['grado_anterior'].initial  = personal.grado_id
+        form.fields['unidad_anterior'].initial = personal.unidad_id
+        form.fields['estado_anterior'].initial = personal.estado_actual_id
         return form
 
     def form_valid(self, form):
@@ -291,7 +297,7 @@ class SancionListView(PuedeGestionarSancionesMixin, ListView):
     ordering = ['-fecha_sancion']
 
 
-class SancionCreateView(BitacoraMixin, PuedeGestionarSancionesMixin, CreateView):
+class SancionCreateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeGestionarSancionesMixin, CreateView):
     bitacora_modulo = 'sanciones'
     model = SancionAplicada
     template_name = 'personal/sancion_form.html'
@@ -306,7 +312,7 @@ class SancionCreateView(BitacoraMixin, PuedeGestionarSancionesMixin, CreateView)
         return super().form_valid(form)
 
 
-class SancionUpdateView(BitacoraMixin, PuedeGestionarSancionesMixin, UpdateView):
+class SancionUpdateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeGestionarSancionesMixin, UpdateView):
     bitacora_modulo = 'sanciones'
     model = SancionAplicada
     template_name = 'personal/sancion_form.html'
@@ -342,11 +348,11 @@ class FelicitacionListView(UsuarioAutorizadoRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_felicitacion'] = TipoFelicitacion.objects.all()
+        context['tipos_felicitacion'] = cache_catalogos.lista(TipoFelicitacion)
         return context
 
 
-class FelicitacionCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
+class FelicitacionCreateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeCrearMixin, CreateView):
     bitacora_modulo = 'felicitaciones'
     model = FelicitacionAplicada
     template_name = 'personal/felicitacion_form.html'
@@ -361,7 +367,7 @@ class FelicitacionCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
         return super().form_valid(form)
 
 
-class FelicitacionUpdateView(BitacoraMixin, PuedeEditarMixin, UpdateView):
+class FelicitacionUpdateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeEditarMixin, UpdateView):
     bitacora_modulo = 'felicitaciones'
     model = FelicitacionAplicada
     template_name = 'personal/felicitacion_form.html'
@@ -436,7 +442,7 @@ class DestinoPersonalListView(UsuarioAutorizadoRequiredMixin, ListView):
         return context
 
 
-class DestinoCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
+class DestinoCreateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeCrearMixin, CreateView):
     bitacora_modulo = 'destinos'
     model = DestinoPolicial
     template_name = 'personal/destino_form.html'
@@ -474,7 +480,7 @@ class DestinoCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
         return context
 
 
-class DestinoUpdateView(BitacoraMixin, PuedeEditarMixin, UpdateView):
+class DestinoUpdateView(BitacoraMixin, CatalogosEnCacheMixin, PuedeEditarMixin, UpdateView):
     bitacora_modulo = 'destinos'
     model = DestinoPolicial
     template_name = 'personal/destino_form.html'
@@ -511,197 +517,10 @@ class DestinoDeleteView(BitacoraMixin, PuedeEliminarMixin, DeleteView):
 
 
 # ==========================================
-# REPORTE EXCEL
+# REPORTE DE PERSONAL
 # ==========================================
+# Misma consulta, columnas y exportación que el módulo de reportes
+# (reportes/informes.py); aquí solo cambia la plantilla.
 
-def _build_workbook(queryset):
-    HEADERS = [
-        "GRADO", "APELLIDO PATERNO", "APELLIDO MATERNO",
-        "1ER. NOMBRE", "2DO. NOMBRE", "C. I.", "EXP.", "SEXO",
-        "DIRECCIÓN DEL DOMICILIO", "CARGO ACTUAL",
-        "UNIDAD DE DESTINO ACTUAL", "FECHA DESTINO ACTUAL",
-        "DESTINO ANTERIOR", "NÚMERO DE CELULAR",
-        "CORREO ELECTRÓNICO", "OTRA PROFESIÓN (LIC./TÉC.)",
-    ]
-    COL_WIDTHS = [14, 18, 18, 14, 14, 12, 6, 6, 28, 22, 22, 16, 22, 16, 26, 24]
-
-    h_font   = Font(name='Arial', bold=True, color='FFFFFF', size=10)
-    h_fill   = PatternFill('solid', start_color='1F3864')
-    h_align  = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    c_font   = Font(name='Arial', size=9)
-    c_align  = Alignment(vertical='center', wrap_text=True)
-    side     = Side(style='thin', color='AAAAAA')
-    border   = Border(left=side, right=side, top=side, bottom=side)
-    alt_fill = PatternFill('solid', start_color='EAF0FB')
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Personal"
-
-    ws.merge_cells(f'A1:{get_column_letter(len(HEADERS))}1')
-    ws['A1'] = 'UTEPPI — REPORTE DE PERSONAL POLICIAL'
-    ws['A1'].font      = Font(name='Arial', bold=True, size=13, color='1F3864')
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-    ws.row_dimensions[1].height = 28
-
-    ws.append([''] * len(HEADERS))
-    ws.row_dimensions[2].height = 6
-
-    for col, header in enumerate(HEADERS, 1):
-        cell           = ws.cell(row=3, column=col, value=header)
-        cell.font      = h_font
-        cell.fill      = h_fill
-        cell.alignment = h_align
-        cell.border    = border
-    ws.row_dimensions[3].height = 36
-
-    for row_idx, p in enumerate(queryset, start=4):
-        destino_activo   = p.destinos.filter(activo=True).first()
-        destino_anterior = p.destinos.filter(activo=False).order_by('-fecha_inicio').first()
-
-        partes         = (p.nombres or '').split(' ', 1)
-        primer_nombre  = partes[0] if partes else ''
-        segundo_nombre = partes[1] if len(partes) > 1 else ''
-
-        row_data = [
-            p.grado.abreviatura,
-            p.apellido_paterno,
-            p.apellido_materno,
-            primer_nombre,
-            segundo_nombre,
-            p.ci,
-            p.expedido,
-            p.get_genero_display(),
-            p.direccion_domicilio or '',
-            p.cargo_actual or '',
-            (destino_activo.unidad_destino.nombre
-                if destino_activo and destino_activo.unidad_destino
-                else (destino_activo.lugar_destino if destino_activo else '')),
-            str(destino_activo.fecha_inicio) if destino_activo else '',
-            (f"{destino_anterior.lugar_destino} "
-             f"({destino_anterior.fecha_inicio} - "
-             f"{destino_anterior.fecha_fin or 'actualidad'})")
-                if destino_anterior else '',
-            p.telefono_personal or '',
-            p.correo_institucional or '',
-            p.otra_profesion or '',
-        ]
-
-        fill = alt_fill if row_idx % 2 == 0 else None
-        for col, value in enumerate(row_data, 1):
-            cell           = ws.cell(row=row_idx, column=col, value=value)
-            cell.font      = c_font
-            cell.alignment = c_align
-            cell.border    = border
-            if fill:
-                cell.fill = fill
-        ws.row_dimensions[row_idx].height = 18
-
-    for i, width in enumerate(COL_WIDTHS, 1):
-        ws.column_dimensions[get_column_letter(i)].width = width
-
-    ws.freeze_panes = 'A4'
-    ws.auto_filter.ref = f"A3:{get_column_letter(len(HEADERS))}3"
-    return wb
-
-
-class ReportePersonalView(OficialAdministrativoRequiredMixin, ListView):
-    model               = PersonalPolicial
-    template_name       = 'personal/reporte_personal.html'
-    context_object_name = 'personal'
-    paginate_by         = 50
-
-    def get_queryset(self):
-        return self._queryset_filtrado()
-
-    def _queryset_filtrado(self):
-        qs = PersonalPolicial.objects.select_related(
-            'grado', 'unidad', 'estado_actual'
-        ).prefetch_related('destinos__unidad_destino')
-
-        buscar = self.request.GET.get('buscar', '').strip()
-        if buscar:
-            qs = qs.filter(
-                Q(nombres__icontains=buscar)          |
-                Q(apellido_paterno__icontains=buscar) |
-                Q(apellido_materno__icontains=buscar) |
-                Q(ci__icontains=buscar)
-            )
-        if self.request.GET.get('grado'):
-            qs = qs.filter(grado_id=self.request.GET['grado'])
-        if self.request.GET.get('unidad'):
-            qs = qs.filter(unidad_id=self.request.GET['unidad'])
-        if self.request.GET.get('estado'):
-            qs = qs.filter(estado_actual_id=self.request.GET['estado'])
-        if self.request.GET.get('genero'):
-            qs = qs.filter(genero=self.request.GET['genero'])
-
-        return qs.order_by('grado__orden', 'apellido_paterno', 'nombres')
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        from catalogos.models import Grado, Unidad, TipoEstado
-        context.update({
-            'grados'         : Grado.objects.filter(activo=True).order_by('orden'),
-            'unidades'       : Unidad.objects.filter(activa=True).order_by('nombre'),
-            'estados'        : TipoEstado.objects.all(),
-            'buscar'         : self.request.GET.get('buscar', ''),
-            'grado_sel'      : self.request.GET.get('grado', ''),
-            'unidad_sel'     : self.request.GET.get('unidad', ''),
-            'estado_sel'     : self.request.GET.get('estado', ''),
-            'genero_sel'     : self.request.GET.get('genero', ''),
-            'total_filtrado' : self._queryset_filtrado().count(),
-            'query_string'   : self.request.GET.urlencode(),
-        })
-        return context
-
-
-def exportar_personal_excel(request):
-    if not request.user.is_authenticated or not (
-        request.user.es_administrador() or request.user.es_oficial_administrativo()
-    ):
-        from django.core.exceptions import PermissionDenied
-        raise PermissionDenied
-
-    qs = PersonalPolicial.objects.select_related(
-        'grado', 'unidad', 'estado_actual'
-    ).prefetch_related('destinos__unidad_destino')
-
-    buscar = request.GET.get('buscar', '').strip()
-    if buscar:
-        qs = qs.filter(
-            Q(nombres__icontains=buscar)          |
-            Q(apellido_paterno__icontains=buscar) |
-            Q(apellido_materno__icontains=buscar) |
-            Q(ci__icontains=buscar)
-        )
-    if request.GET.get('grado'):
-        qs = qs.filter(grado_id=request.GET['grado'])
-    if request.GET.get('unidad'):
-        qs = qs.filter(unidad_id=request.GET['unidad'])
-    if request.GET.get('estado'):
-        qs = qs.filter(estado_actual_id=request.GET['estado'])
-    if request.GET.get('genero'):
-        qs = qs.filter(genero=request.GET['genero'])
-
-    qs = qs.order_by('grado__orden', 'apellido_paterno', 'nombres')
-
-    # Registrar descarga en bitácora
-    registrar_log(
-        request, 'OTRO', 'reportes',
-        f'Descargó reporte Excel de personal ({qs.count()} registros)',
-    )
-
-    wb     = _build_workbook(qs)
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    from datetime import date
-    filename = f"reporte_personal_{date.today().strftime('%Y%m%d')}.xlsx"
-    response = HttpResponse(
-        output,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
\ No newline at end of file
+class ReportePersonalView(ReporteBaseView):
+    template_name = 'personal/reporte_personal.html'
@@ -0,0 +1,132 @@
+"""
+Resúmenes de actividad de la bitácora a partir de ActividadDiaria.
+
+Cada vez que se guardan entradas de bitácora (reportes/escritor_bitacora.py),
+acumular() las cuenta en memoria por (día, módulo, acción, usuario) y suma esos
+conteos con un solo INSERT ... ON CONFLICT DO UPDATE. Los resúmenes del panel
+de la bitácora y de la primera página del PDF leen solo esta tabla: unas pocas
+filas por día, sin importar cuántos registros tenga la bitácora.
+
+La suma no va en la misma transacción que el INSERT de la bitácora; si alguna
+vez falla (o hay registros cargados por otra vía), `acumular_actividad`
+recalcula los días desde la bitácora.
+
+Uso:
+    resumen = resumen_actividad(desde, hasta, modulo='personal')
+
+    python manage.py acumular_actividad                      # todo lo que hay en la bitácora
+    python manage.py acumular_actividad --desde 2026-10-01
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ActividadDiaria, BitacoraLog
+
+
+DIAS_RESUMEN = 30      # rango del panel cuando no se filtra por fecha
+MAX_USUARIOS = 10
+LOTE_INSERT  = 500
+
+
+# ── Escritura ─────────────────────────────────────────────────────
+
+def _sumar(conteos):
+    tabla = connection.ops.quote_name(ActividadDiaria._meta.db_table)
+    filas = list(conteos.items())
+    # bulk_create(update_conflicts=True) reemplaza el total; aquí hay que sumarlo
+    with connection.cursor() as cursor:
+        for i in range(0, len(filas), LOTE_INSERT):
+            lote = filas[i:i + LOTE_INSERT]
+            cursor.execute(
+                f'INSERT INTO {tabla} (dia, modulo, accion, usuario_id, total) '
+                f'VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(lote))} '
+                f'ON CONFLICT (dia, modulo, accion, (COALESCE(usuario_id, 0))) '
+                f'DO UPDATE SET total = {tabla}.total + EXCLUDED.total',
+                [valor for clave, total in lote for valor in (*clave, total)],
+            )
+
+
+def acumular(registros):
+    """Suma a ActividadDiaria los BitacoraLog recién guardados."""
+    conteos = Counter(
+        (timezone.localtime(r.fecha_hora).date(), r.modulo, r.accion, r.usuario_id)
+        for r in registros
+    )
+    if conteos:
+        _sumar(conteos)
+
+
+def recalcular(desde, hasta):
+    """Rehace los conteos de los días [desde, hasta] (fechas locales) desde la bitácora."""
+    inicio = timezone.make_aware(datetime.combine(desde, time.min))
+    fin    = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
+    grupos = (
+        BitacoraLog.objects
+        .filter(fecha_hora__gte=inicio, fecha_hora__lt=fin)
+        .annotate(dia=TruncDate('fecha_hora'))
+        .values_list('dia', 'modulo', 'accion', 'usuario_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        ActividadDiaria.objects.filter(dia__gte=desde, dia__lte=hasta).delete()
+        filas = [
+            ActividadDiaria(dia=dia, modulo=modulo, accion=accion, usuario_id=usuario_id, total=total)
+            for dia, modulo, accion, usuario_id, total in grupos
+        ]
+        ActividadDiaria.objects.bulk_create(filas, batch_size=LOTE_INSERT)
+    return len(filas)
+
+
+# ── Lectura ───────────────────────────────────────────────────────
+
+def rango_resumen(desde=None, hasta=None):
+    """Completa el rango: hasta hoy y DIAS_RESUMEN días hacia atrás."""
+    hasta = hasta or timezone.localdate()
+    desde = desde or hasta - timedelta(days=DIAS_RESUMEN - 1)
+    return desde, hasta
+
+
+def resumen_actividad(desde=None, hasta=None, accion=None, modulo=None, usuario=None):
+    """
+    Totales por acción, módulo, usuario y día en [desde, hasta].
+
+    Devuelve un diccionario con 'desde', 'hasta', 'total' y las listas
+    'por_accion', 'por_modulo', 'por_usuario' (los MAX_USUARIOS con más
+    registros) y 'por_dia' de (clave, etiqueta, total), más 'max_dia'.
+    """
+    desde, hasta = rango_resumen(desde, hasta)
+    qs = ActividadDiaria.objects.filter(dia__gte=desde, dia__lte=hasta)
+    if accion:
+        qs = qs.filter(accion=accion)
+    if modulo:
+        qs = qs.filter(modulo=modulo)
+    if usuario:
+        qs = qs.filter(usuario_id=usuario)
+
+    def agrupar(*campos):
+        return qs.values_list(*campos).annotate(n=Sum('total')).order_by('-n', campos[0])
+
+    acciones = dict(BitacoraLog.ACCION_CHOICES)
+    modulos  = dict(BitacoraLog.MODULO_CHOICES)
+    por_accion = [(a, acciones.get(a, a), n) for a, n in agrupar('accion')]
+    por_dia    = [(d, f'{d:%d/%m}', n) for d, n in agrupar('dia').order_by('dia')]
+    return {
+        'desde'      : desde,
+        'hasta'      : hasta,
+        'total'      : sum(n for _, _, n in por_accion),
+        'por_accion' : por_accion,
+        'por_modulo' : [(m, modulos.get(m, m), n) for m, n in agrupar('modulo')],
+        'por_usuario': [
+            (u, nombre or ('Sistema' if u is None else f'Usuario #{u} (eliminado)'), n)
+            for u, nombre, n in agrupar('usuario', 'usuario__username')[:MAX_USUARIOS]
+        ],
+        'por_dia'    : por_dia,
+        'max_dia'    : max((n for _, _, n in por_dia), default=0),
+    }
@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import LecturaAgregada
 
-# Register your models here.
+@admin.register(LecturaAgregada)
+class LecturaAgregadaAdmin(admin.ModelAdmin):
+    list_display  = ['hora', 'usuario', 'modulo', 'objeto_repr', 'total']
+    list_filter   = ['modulo']
+    search_fields = ['objeto_id', 'objeto_repr', 'usuario__username']
+    date_hierarchy = 'hora'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
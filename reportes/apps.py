@@ -7,4 +7,4 @@ class ReportesConfig(AppConfig):
     verbose_name       = 'Reportes y Bitácora'
 
     def ready(self):
-        import reportes.signals  # noqa: F401 — activa las señales de login/logout
\ No newline at end of file
+        import reportes.signals  # noqa: F401 — activa las señales de login/logout y de caché
\ No newline at end of file
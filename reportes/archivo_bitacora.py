@@ -0,0 +1,328 @@
+"""
+Archivo histórico de la bitácora en JSONL comprimido con gzip.
+
+Cada partición (un día o un mes, en hora local) se escribe en su propio
+archivo `.jsonl.gz` leyendo tuplas de `values_list()` con un cursor del
+servidor ordenado por fecha_hora. El manifiesto `manifest.json` de cada
+granularidad guarda filas, tamaño y SHA-256 de cada archivo; se reescribe
+tras cada partición, así una corrida interrumpida continúa donde quedó y la
+corrida nocturna solo escribe las particiones cerradas que faltan.
+
+Estructura en BITACORA_ARCHIVO_DIR:
+    dia/manifest.json
+    dia/2026/10/bitacora_2026-10-17.jsonl.gz
+    mes/manifest.json
+    mes/2026/bitacora_2026-09.jsonl.gz
+
+Uso:
+    python manage.py archivar_bitacora                 # particiones diarias pendientes
+    python manage.py archivar_bitacora --granularidad mes --desde 2025-01-01
+
+    for registro in buscar(date(2025, 1, 1), date(2025, 3, 31), modulo='personal'):
+        ...
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import BitacoraLog
+
+
+GRANULARIDADES = ('dia', 'mes')
+CURSOR_CHUNK   = 5000
+NIVEL_GZIP     = 6
+
+CAMPOS = ('id', 'fecha_hora', 'usuario_id', 'usuario__username', 'accion',
+          'modulo', 'descripcion', 'objeto_id', 'objeto_repr', 'ip_address', 'cambios')
+CLAVES = ('id', 'fecha_hora', 'usuario_id', 'usuario', 'accion',
+          'modulo', 'descripcion', 'objeto_id', 'objeto_repr', 'ip_address', 'cambios')
+
+
+# ── Particiones ───────────────────────────────────────────────────
+
+def _inicio_particion(dia, granularidad):
+    return dia if granularidad == 'dia' else dia.replace(day=1)
+
+
+def _siguiente(inicio, granularidad):
+    if granularidad == 'dia':
+        return inicio + timedelta(days=1)
+    return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def nombre_particion(inicio, granularidad):
+    return inicio.isoformat() if granularidad == 'dia' else inicio.strftime('%Y-%m')
+
+
+def ruta_relativa(inicio, granularidad):
+    nombre = f'bitacora_{nombre_particion(inicio, granularidad)}.jsonl.gz'
+    if granularidad == 'dia':
+        return os.path.join(inicio.strftime('%Y'), inicio.strftime('%m'), nombre)
+    return os.path.join(inicio.strftime('%Y'), nombre)
+
+
+def _limite(dia):
+    """Medianoche local del día como datetime con zona horaria."""
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def particiones(granularidad, desde, hasta):
+    """Inicios de las particiones que cubren [desde, hasta] (fechas locales)."""
+    inicio = _inicio_particion(desde, granularidad)
+    while inicio <= hasta:
+        yield inicio
+        inicio = _siguiente(inicio, granularidad)
+
+
+def ultima_cerrada(granularidad, hoy=None):
+    """Último día incluido en una partición que ya no puede recibir registros."""
+    hoy = hoy or timezone.localdate()
+    return _inicio_particion(hoy, granularidad) - timedelta(days=1)
+
+
+def primer_registro():
+    primera = BitacoraLog.objects.aggregate(primera=Min('fecha_hora'))['primera']
+    return timezone.localtime(primera).date() if primera else None
+
+
+# ── Manifiesto ────────────────────────────────────────────────────
+
+def directorio(granularidad):
+    return os.path.join(str(settings.BITACORA_ARCHIVO_DIR), granularidad)
+
+
+def ruta_manifiesto(granularidad):
+    return os.path.join(directorio(granularidad), 'manifest.json')
+
+
+def leer_manifiesto(granularidad):
+    try:
+        with open(ruta_manifiesto(granularidad), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'granularidad': granularidad, 'campos': list(CLAVES), 'particiones': {}}
+
+
+def _escribir_atomico(ruta, escribir, modo='wb'):
+    carpeta = os.path.dirname(ruta)
+    os.makedirs(carpeta, exist_ok=True)
+    with tempfile.NamedTemporaryFile(modo, dir=carpeta, prefix='.', delete=False) as tmp:
+        try:
+            escribir(tmp)
+        except BaseException:
+            os.remove(tmp.name)
+            raise
+    os.replace(tmp.name, ruta)
+
+
+def _guardar_manifiesto(manifiesto):
+    _escribir_atomico(
+        ruta_manifiesto(manifiesto['granularidad']),
+        lambda f: json.dump(manifiesto, f, ensure_ascii=False, indent=2, sort_keys=True),
+        modo='w',
+    )
+
+
+# ── Escritura ─────────────────────────────────────────────────────
+
+class _EscritorConHash:
+    """Archivo que calcula el SHA-256 de los bytes comprimidos mientras se escriben."""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.hash    = hashlib.sha256()
+        self.bytes   = 0
+
+    def write(self, datos):
+        self.hash.update(datos)
+        self.bytes += len(datos)
+        return self.archivo.write(datos)
+
+    def flush(self):
+        self.archivo.flush()
+
+
+def _escribir_particion(inicio, fin, archivo):
+    """Vuelca los registros de [inicio, fin) en `archivo`. Devuelve (filas, sha256, bytes)."""
+    qs = BitacoraLog.objects.filter(
+        fecha_hora__gte=_limite(inicio), fecha_hora__lt=_limite(fin)
+    ).order_by('fecha_hora', 'id').values_list(*CAMPOS)
+
+    codificar = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    escritor  = _EscritorConHash(archivo)
+    filas     = 0
+    # mtime=0 y sin nombre: el mismo contenido produce el mismo archivo y checksum
+    with gzip.GzipFile(fileobj=escritor, mode='wb', compresslevel=NIVEL_GZIP, mtime=0) as gz:
+        lineas = []
+        for fila in qs.iterator(chunk_size=CURSOR_CHUNK):
+            registro = dict(zip(CLAVES, fila))
+            registro['fecha_hora'] = fila[1].isoformat()
+            lineas.append(codificar(registro))
+            if len(lineas) >= CURSOR_CHUNK:
+                gz.write(('\n'.join(lineas) + '\n').encode('utf-8'))
+                filas += len(lineas)
+                lineas = []
+        if lineas:
+            gz.write(('\n'.join(lineas) + '\n').encode('utf-8'))
+            filas += len(lineas)
+    return filas, escritor.hash.hexdigest(), escritor.bytes
+
+
+def archivar(granularidad='dia', desde=None, hasta=None, rehacer=False, aviso=None):
+    """
+    Escribe las particiones de [desde, hasta] que no estén en el manifiesto.
+
+    desde   — por defecto, el día del primer registro de la bitácora.
+    hasta   — por defecto, el último día de la última partición cerrada; nunca
+              se archiva el día o mes en curso porque aún recibe registros.
+    rehacer — vuelve a escribir también las particiones ya archivadas.
+    aviso   — callable opcional que recibe (nombre, entrada) tras cada partición.
+
+    Devuelve la lista de nombres de partición escritos.
+    """
+    if granularidad not in GRANULARIDADES:
+        raise ValueError(f'Granularidad no válida: {granularidad}')
+
+    cerrada = ultima_cerrada(granularidad)
+    desde   = desde or primer_registro()
+    hasta   = min(hasta or cerrada, cerrada)
+    if desde is None or desde > hasta:
+        return []
+
+    base       = directorio(granularidad)
+    manifiesto = leer_manifiesto(granularidad)
+    escritas   = []
+
+    for inicio in particiones(granularidad, desde, hasta):
+        nombre   = nombre_particion(inicio, granularidad)
+        relativa = ruta_relativa(inicio, granularidad)
+        entrada  = manifiesto['particiones'].get(nombre)
+        if entrada and not rehacer and os.path.exists(os.path.join(base, entrada['archivo'])):
+            continue
+
+        fin       = _siguiente(inicio, granularidad)
+        resultado = {}
+
+        def escribir(archivo):
+            resultado['filas'], resultado['sha256'], resultado['bytes'] = \
+                _escribir_particion(inicio, fin, archivo)
+
+        _escribir_atomico(os.path.join(base, relativa), escribir)
+
+        entrada = {
+            'archivo'  : relativa.replace(os.sep, '/'),
+            'desde'    : _limite(inicio).isoformat(),
+            'hasta'    : _limite(fin).isoformat(),
+            'filas'    : resultado['filas'],
+            'bytes'    : resultado['bytes'],
+            'sha256'   : resultado['sha256'],
+            'generado' : timezone.now().isoformat(),
+        }
+        manifiesto['particiones'][nombre] = entrada
+        _guardar_manifiesto(manifiesto)
+        escritas.append(nombre)
+        if aviso:
+            aviso(nombre, entrada)
+
+    return escritas
+
+
+def ruta_archivo(granularidad, nombre):
+    """Ruta absoluta del archivo de una partición registrada, o None."""
+    entrada = leer_manifiesto(granularidad)['particiones'].get(nombre)
+    if entrada is None:
+        return None
+    ruta = os.path.join(directorio(granularidad), entrada['archivo'])
+    return ruta if os.path.exists(ruta) else None
+
+
+def verificar(granularidad, nombres=None):
+    """
+    Recalcula el SHA-256 de cada archivo (o solo de `nombres`).
+    Devuelve los nombres que no coinciden o no están archivados.
+    """
+    base        = directorio(granularidad)
+    erroneas    = []
+    registradas = leer_manifiesto(granularidad)['particiones']
+    if nombres is not None:
+        erroneas    = sorted(set(nombres) - set(registradas))
+        registradas = {n: e for n, e in registradas.items() if n in nombres}
+    for nombre, entrada in sorted(registradas.items()):
+        h = hashlib.sha256()
+        try:
+            with open(os.path.join(base, entrada['archivo']), 'rb') as f:
+                for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(bloque)
+        except FileNotFoundError:
+            erroneas.append(nombre)
+            continue
+        if h.hexdigest() != entrada['sha256']:
+            erroneas.append(nombre)
+    return erroneas
+
+
+# ── Lectura ───────────────────────────────────────────────────────
+
+def mes_archivado(inicio):
+    """True si el mes está archivado entero: por mes o todos sus días."""
+    if nombre_particion(inicio, 'mes') in leer_manifiesto('mes')['particiones']:
+        return True
+    dias = leer_manifiesto('dia')['particiones']
+    fin  = _siguiente(inicio, 'mes') - timedelta(days=1)
+    return all(nombre_particion(dia, 'dia') in dias for dia in particiones('dia', inicio, fin))
+
+
+def _archivos(desde, hasta):
+    """Archivos que cubren [desde, hasta]: el mensual si existe, si no los diarios."""
+    meses = leer_manifiesto('mes')['particiones']
+    dias  = leer_manifiesto('dia')['particiones']
+    for mes in particiones('mes', desde, hasta):
+        entrada = meses.get(nombre_particion(mes, 'mes'))
+        if entrada:
+            yield os.path.join(directorio('mes'), entrada['archivo'])
+            continue
+        fin = min(_siguiente(mes, 'mes') - timedelta(days=1), hasta)
+        for dia in particiones('dia', max(mes, desde), fin):
+            entrada = dias.get(nombre_particion(dia, 'dia'))
+            if entrada:
+                yield os.path.join(directorio('dia'), entrada['archivo'])
+
+
+def buscar(desde, hasta, usuario=None, modulo=None, accion=None, texto=None):
+    """
+    Registros archivados entre dos fechas locales (inclusive), en orden.
+
+    Solo lee: abre los .jsonl.gz que cubren el rango y filtra línea a línea.
+    usuario — username exacto; texto — se busca en descripción y objeto.
+    """
+    inicio = _limite(desde)
+    fin    = _limite(hasta + timedelta(days=1))
+    texto  = texto.lower() if texto else None
+    for ruta in _archivos(desde, hasta):
+        if not os.path.exists(ruta):
+            continue
+        with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+            for linea in f:
+                registro = json.loads(linea)
+                if usuario and registro['usuario'] != usuario:
+                    continue
+                if modulo and registro['modulo'] != modulo:
+                    continue
+                if accion and registro['accion'] != accion:
+                    continue
+                if texto and texto not in f"{registro['descripcion']} {registro['objeto_repr'] or ''}".lower():
+                    continue
+                fecha = datetime.fromisoformat(registro['fecha_hora'])
+                if not inicio <= fecha < fin:
+                    continue
+                registro['fecha_hora'] = fecha
+                yield registro
+
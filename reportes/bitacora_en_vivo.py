@@ -0,0 +1,173 @@
+"""
+Bitácora en vivo: las entradas nuevas llegan a los navegadores como
+server-sent events, sin recargar ni volver a consultar la tabla.
+
+Publicación (reportes/escritor_bitacora.py): después de cada INSERT de
+bitácora, publicar() reparte las entradas recién guardadas.
+    - En PostgreSQL envía un NOTIFY por entrada al canal CANAL, con un solo
+      SELECT pg_notify(...) FROM unnest(...). PostgreSQL lo entrega al
+      confirmar la transacción, a todos los procesos.
+    - En otros motores (desarrollo local) entrega directo a los suscriptores
+      del mismo proceso.
+
+Suscripción: cada proceso ASGI tiene un solo hilo con una conexión propia en
+LISTEN. Lo arranca el primer suscriptor. Cada notificación se reparte a las
+colas asyncio de los clientes conectados; escuchar() filtra por módulo y
+acción en el servidor. Una conexión abierta por pestaña reemplaza las
+recargas de la bitácora.
+
+Solo se sirve con el servidor ASGI (gestion_policial/asgi.py); bajo WSGI la
+vista responde 501.
+
+Uso:
+    async for evento in escuchar(modulo='personal', accion='EDITAR'):
+        ...   # dict, o None cada INTERVALO_LATIDO segundos sin entradas
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.db import connection, connections
+
+from .models import BitacoraLog
+
+
+logger = logging.getLogger(__name__)
+
+CANAL            = 'bitacora'
+INTERVALO_LATIDO = 15       # segundos sin entradas antes de avisar al cliente
+COLA_MAX         = 500      # un cliente lento pierde entradas en vez de acumularlas
+MAX_DESCRIPCION  = 1000     # NOTIFY admite hasta 8000 bytes por mensaje
+
+_ACCIONES = dict(BitacoraLog.ACCION_CHOICES)
+
+
+def evento(registro):
+    """Datos de una entrada para el navegador, sin consultas."""
+    usuario = registro.usuario if BitacoraLog.usuario.is_cached(registro) else None
+    return {
+        'id'         : registro.pk,
+        'fecha_hora' : registro.fecha_hora.isoformat(),
+        'usuario'    : usuario.username if usuario else None,
+        'accion'     : registro.accion,
+        'accion_texto': _ACCIONES.get(registro.accion, registro.accion),
+        'modulo'     : registro.modulo,
+        'descripcion': registro.descripcion[:MAX_DESCRIPCION],
+        'objeto_repr': registro.objeto_repr,
+        'ip_address' : registro.ip_address,
+    }
+
+
+# ── Suscriptores del proceso ──────────────────────────────────────
+
+class _Difusion:
+
+    def __init__(self):
+        self.cerrojo      = threading.Lock()
+        self.suscriptores = set()       # (loop, cola)
+        self.oyente       = None
+        self.escuchando   = threading.Event()   # la conexión del oyente ya hizo LISTEN
+
+    def suscribir(self):
+        cola = asyncio.Queue(maxsize=COLA_MAX)
+        with self.cerrojo:
+            self.suscriptores.add((asyncio.get_running_loop(), cola))
+        if connection.vendor == 'postgresql':
+            self._asegurar_oyente()
+        return cola
+
+    def desuscribir(self, cola):
+        with self.cerrojo:
+            self.suscriptores = {s for s in self.suscriptores if s[1] is not cola}
+
+    def entregar(self, eventos):
+        with self.cerrojo:
+            suscriptores = list(self.suscriptores)
+        for loop, cola in suscriptores:
+            for datos in eventos:
+                loop.call_soon_threadsafe(_poner, cola, datos)
+
+    # ── LISTEN (PostgreSQL) ───────────────────────────────────────
+
+    def _asegurar_oyente(self):
+        with self.cerrojo:
+            if self.oyente is None or not self.oyente.is_alive():
+                self.oyente = threading.Thread(target=self._escuchar, name='bitacora-en-vivo', daemon=True)
+                self.oyente.start()
+
+    def _escuchar(self):
+        while True:
+            # Conexión aparte: la de Django es por hilo y no debe quedar en LISTEN
+            propia = connections.create_connection('default')
+            try:
+                propia.ensure_connection()
+                conexion = propia.connection
+                conexion.autocommit = True
+                with conexion.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CANAL}')
+                self.escuchando.set()
+                while True:
+                    if select.select([conexion], [], [], INTERVALO_LATIDO) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    eventos = []
+                    while conexion.notifies:
+                        eventos.append(json.loads(conexion.notifies.pop(0).payload))
+                    if eventos:
+                        self.entregar(eventos)
+            except Exception:
+                logger.exception('Se perdió la conexión de la bitácora en vivo; se reintenta')
+                time.sleep(5)
+            finally:
+                self.escuchando.clear()
+                propia.close()
+
+
+def _poner(cola, datos):
+    try:
+        cola.put_nowait(datos)
+    except asyncio.QueueFull:
+        pass
+
+
+_difusion = _Difusion()
+
+
+# ── API ───────────────────────────────────────────────────────────
+
+def publicar(registros):
+    """Reparte las entradas recién guardadas (ver módulo)."""
+    eventos = [evento(r) for r in registros if r.pk is not None]
+    if not eventos:
+        return
+    if connection.vendor != 'postgresql':
+        _difusion.entregar(eventos)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, mensaje) FROM unnest(%s::text[]) AS mensaje',
+            [CANAL, [json.dumps(e, ensure_ascii=False) for e in eventos]],
+        )
+
+
+async def escuchar(modulo=None, accion=None):
+    """Entradas nuevas que coinciden con los filtros; None como latido."""
+    cola = _difusion.suscribir()
+    try:
+        while True:
+            try:
+                datos = await asyncio.wait_for(cola.get(), INTERVALO_LATIDO)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if modulo and datos['modulo'] != modulo:
+                continue
+            if accion and datos['accion'] != accion:
+                continue
+            yield datos
+    finally:
+        _difusion.desuscribir(cola)
@@ -0,0 +1,56 @@
+"""
+Búsqueda de texto en la bitácora.
+
+En PostgreSQL la migración 0007 agrega a reportes_bitacoralog la columna
+generada `busqueda`: el tsvector de la descripción (peso A) y del objeto
+afectado (peso B) con la configuración es_unaccent, que es la de español con
+stemming y sin tildes. PostgreSQL la calcula en cada INSERT y la indexa con GIN.
+
+filtrar_texto() busca con websearch_to_tsquery, que admite "frase exacta",
+-excluir y OR, más los usuarios cuyo username contiene el texto. La tabla de
+usuarios es chica y BitacoraLog tiene índice en usuario_id, así las dos
+condiciones usan índices. Con `por_relevancia` ordena por ts_rank y luego por
+fecha. En otros motores sigue el icontains de siempre.
+
+Uso:
+    qs = filtrar_texto(BitacoraLog.objects.all(), 'sanción leve', por_relevancia=True)
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import BitacoraLog
+
+
+CONFIGURACION = 'es_unaccent'
+
+_COLUMNA  = f'{connection.ops.quote_name(BitacoraLog._meta.db_table)}.busqueda'
+_CONSULTA = f"websearch_to_tsquery('{CONFIGURACION}', %s)"
+
+
+def texto_completo():
+    """True si la base de datos tiene la columna de búsqueda (PostgreSQL)."""
+    return connection.vendor == 'postgresql'
+
+
+def filtrar_texto(queryset, texto, por_relevancia=False):
+    """Filtra la bitácora por `texto` (ver módulo)."""
+    usuarios = get_user_model().objects.filter(username__icontains=texto).values('pk')
+    if not texto_completo():
+        return queryset.filter(
+            Q(usuario__in=usuarios)          |
+            Q(descripcion__icontains=texto)  |
+            Q(objeto_repr__icontains=texto)
+        )
+
+    coincide = RawSQL(f'{_COLUMNA} @@ {_CONSULTA}', [texto], output_field=BooleanField())
+    queryset = queryset.filter(Q(coincide) | Q(usuario__in=usuarios))
+    if por_relevancia:
+        queryset = queryset.annotate(
+            # float8: ts_rank devuelve real y el cursor de la paginación
+            # (reportes/paginacion.py) compara la relevancia por igualdad
+            relevancia=RawSQL(f'ts_rank({_COLUMNA}, {_CONSULTA})::float8', [texto], output_field=FloatField()),
+        ).order_by('-relevancia', '-fecha_hora', '-id')
+    return queryset
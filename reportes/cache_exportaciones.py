@@ -0,0 +1,155 @@
+"""
+Caché en disco de exportaciones ya generadas.
+
+La clave de cada archivo combina el tipo de reporte, los filtros GET
+normalizados y un sello de versión de datos guardado en el caché compartido.
+Las señales de reportes/signals.py renuevan el sello al guardar o eliminar
+personal, destinos, grados o unidades, así una descarga nunca sirve datos
+viejos. El directorio se mantiene bajo EXPORT_CACHE_MAX_BYTES desalojando
+los archivos usados hace más tiempo (LRU por fecha de modificación).
+
+Uso:
+    from reportes import cache_exportaciones
+
+    clave   = cache_exportaciones.clave('personal_excel', request.GET)
+    archivo = cache_exportaciones.obtener(clave, 'xlsx')     # abierto en 'rb', o None
+    if archivo is None:
+        archivo = cache_exportaciones.guardar(clave, 'xlsx', wb.save)   # también abierto
+
+    partes = cache_exportaciones.guardar_partes(clave, 'xlsx', partes)  # copia al enviar
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CLAVE_VERSION        = 'exportaciones:version_datos'
+PARAMETROS_IGNORADOS = {'page'}
+
+
+def _directorio():
+    directorio = str(settings.EXPORT_CACHE_DIR)
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def version_datos():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def invalidar():
+    """Nuevo sello de versión: todas las entradas anteriores dejan de coincidir."""
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+
+
+def clave(tipo, params):
+    """Hash de (tipo, filtros no vacíos ordenados, versión de datos)."""
+    filtros = sorted(
+        (nombre, valor.strip())
+        for nombre, valores in params.lists()
+        if nombre not in PARAMETROS_IGNORADOS
+        for valor in valores
+        if valor.strip()
+    )
+    contenido = json.dumps([tipo, filtros, version_datos()], ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def obtener(clave, extension):
+    """
+    El archivo en caché ya abierto en binario (y marcado como usado), o None.
+
+    Se abre aquí y no se devuelve la ruta: desalojar() de otro worker puede
+    borrarlo en cualquier momento, y un archivo ya abierto se sigue leyendo
+    aunque se borre. Si desaparece antes de abrirlo, es un fallo de caché.
+    """
+    ruta = os.path.join(_directorio(), f'{clave}.{extension}')
+    try:
+        archivo = open(ruta, 'rb')
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(ruta)
+    except FileNotFoundError:
+        pass        # se desalojó recién: se sirve igual desde el archivo abierto
+    return archivo
+
+
+def guardar(clave, extension, escribir):
+    """
+    escribir — callable que recibe un archivo binario y vuelca el contenido
+               (por ejemplo Workbook.save).
+
+    Escribe en un temporal oculto y lo renombra de forma atómica, así otro
+    worker nunca lee un archivo a medias. Devuelve el archivo ya abierto en
+    'rb': se abre antes de publicarlo, porque desde ese momento desalojar()
+    (de este worker o de otro) puede borrarlo, incluso enseguida si él solo
+    supera EXPORT_CACHE_MAX_BYTES.
+    """
+    directorio = _directorio()
+    ruta       = os.path.join(directorio, f'{clave}.{extension}')
+    with tempfile.NamedTemporaryFile(dir=directorio, prefix='.', delete=False) as tmp:
+        try:
+            escribir(tmp)
+        except BaseException:
+            os.remove(tmp.name)
+            raise
+    archivo = open(tmp.name, 'rb')
+    os.replace(tmp.name, ruta)
+    desalojar()
+    return archivo
+
+
+def guardar_partes(clave, extension, partes):
+    """
+    Entrega los bytes de `partes` a medida que llegan y a la vez los escribe
+    en un temporal oculto. Solo si `partes` se consume completo el temporal se
+    publica en la caché: una descarga cortada no deja un archivo a medias.
+    """
+    directorio = _directorio()
+    ruta       = os.path.join(directorio, f'{clave}.{extension}')
+    with tempfile.NamedTemporaryFile(dir=directorio, prefix='.', delete=False) as tmp:
+        try:
+            for parte in partes:
+                tmp.write(parte)
+                yield parte
+        except BaseException:
+            os.remove(tmp.name)
+            raise
+    os.replace(tmp.name, ruta)
+    desalojar()
+
+
+def desalojar():
+    """Elimina los archivos menos usados hasta quedar bajo EXPORT_CACHE_MAX_BYTES."""
+    archivos = []
+    for entrada in os.scandir(_directorio()):
+        if entrada.name.startswith('.') or not entrada.is_file():
+            continue
+        try:
+            st = entrada.stat()
+        except FileNotFoundError:
+            continue
+        archivos.append((st.st_mtime, st.st_size, entrada.path))
+
+    total = sum(tamano for _, tamano, _ in archivos)
+    for _, tamano, ruta in sorted(archivos):
+        if total <= settings.EXPORT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        except PermissionError:     # Windows: lo tiene abierto una descarga en curso
+            continue
+        total -= tamano
@@ -0,0 +1,60 @@
+"""
+Exportación a CSV / TSV en streaming.
+
+Las filas llegan como tuplas de `values_list()` leídas con un cursor del lado
+del servidor (`iterator(chunk_size=...)`), sin instanciar modelos. Se escriben
+por lotes en un buffer que se vacía en cada bloque enviado, así la memoria se
+mantiene plana aunque se exporten millones de filas.
+
+Uso:
+    from reportes.csv_export import respuesta_delimitada
+
+    filas = qs.values_list('campo1', 'campo2').iterator(chunk_size=CURSOR_CHUNK_SIZE)
+    return respuesta_delimitada(['CAMPO 1', 'CAMPO 2'], filas, 'reporte', formato='tsv')
+"""
+
+import csv
+import io
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+
+FORMATOS = {
+    'csv': (',',  'text/csv; charset=utf-8'),
+    'tsv': ('\t', 'text/tab-separated-values; charset=utf-8'),
+}
+
+CURSOR_CHUNK_SIZE = 5000    # filas por viaje del cursor del servidor
+FILAS_POR_BLOQUE  = 2000    # filas por bloque enviado al cliente
+
+
+def respuesta_delimitada(encabezados, filas, nombre_base, formato='csv'):
+    """
+    StreamingHttpResponse con las filas en CSV o TSV.
+
+    filas — iterable de tuplas (idealmente un values_list().iterator()).
+    """
+    delimitador, content_type = FORMATOS[formato]
+
+    def generar():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimitador, lineterminator='\r\n')
+        # BOM para que Excel abra el archivo como UTF-8
+        buffer.write('\ufeff')
+        writer.writerow(encabezados)
+        yield buffer.getvalue()
+
+        filas_iter = iter(filas)
+        while True:
+            bloque = list(islice(filas_iter, FILAS_POR_BLOQUE))
+            if not bloque:
+                break
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(bloque)
+            yield buffer.getvalue()
+
+    response = StreamingHttpResponse(generar(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre_base}.{formato}"'
+    return response
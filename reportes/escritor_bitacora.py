@@ -0,0 +1,207 @@
+"""
+Escritura de la bitácora, directa o diferida.
+
+Con BITACORA_ASINCRONA = False (por defecto) cada registro es un INSERT dentro
+del request, como siempre. Con True, los registros se encolan en memoria y un
+hilo del proceso los guarda con bulk_create:
+
+    - por tamaño: en cuanto hay BITACORA_LOTE registros en cola;
+    - por tiempo: a más tardar BITACORA_INTERVALO segundos después del primero;
+    - al terminar el proceso: atexit vacía lo que quede;
+    - por desborde: si la cola llega a BITACORA_COLA_MAX, el registro se guarda
+      de forma síncrona en el request que lo generó.
+
+La hora del evento se fija al encolar (fecha_hora usa default=timezone.now).
+Un registro diferido no forma parte de la transacción del request: si el
+request hace rollback, el registro igual se guarda.
+
+Tras cada guardado se suman los conteos diarios (reportes/actividad.py) y se
+publican las entradas para la bitácora en vivo (reportes/bitacora_en_vivo.py).
+
+Uso:
+    from reportes.escritor_bitacora import escribir
+    escribir(usuario=user, accion='LOGIN', modulo='sistema', descripcion='...', ip_address=ip)
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .actividad import acumular
+from .bitacora_en_vivo import publicar
+from .models import BitacoraLog
+
+
+logger = logging.getLogger(__name__)
+
+_FIN = object()     # despierta al hilo para que guarde su lote y termine
+
+
+class _EscritorDiferido:
+
+    def __init__(self):
+        self.cola    = None
+        self.hilo    = None
+        self.pid     = None
+        self.cerrojo = threading.Lock()
+        self.detener = threading.Event()
+
+    # ── Lado del request ──────────────────────────────────────────
+
+    def encolar(self, registro):
+        self._asegurar_hilo()
+        try:
+            self.cola.put_nowait(registro)
+        except queue.Full:
+            registro.save()
+            _guardados([registro])
+
+    def _asegurar_hilo(self):
+        # Se arranca en el primer uso de cada proceso: tras un fork (gunicorn
+        # --preload) el hilo del padre no existe en el hijo.
+        if self.pid == os.getpid() and self.hilo.is_alive():
+            return
+        with self.cerrojo:
+            if self.pid == os.getpid() and self.hilo.is_alive():
+                return
+            if self.pid != os.getpid():
+                self.cola = queue.Queue(maxsize=settings.BITACORA_COLA_MAX)
+                self.pid  = os.getpid()
+            self.detener.clear()
+            self.hilo = threading.Thread(target=self._bucle, name='escritor-bitacora', daemon=True)
+            self.hilo.start()
+
+    # ── Hilo escritor ─────────────────────────────────────────────
+
+    def _bucle(self):
+        while not self.detener.is_set():
+            lote = self._tomar_lote()
+            if lote:
+                self._guardar(lote)
+
+    def _tomar_lote(self):
+        intervalo = settings.BITACORA_INTERVALO
+        try:
+            primero = self.cola.get(timeout=intervalo)
+        except queue.Empty:
+            return []
+        if primero is _FIN:
+            return []
+        lote   = [primero]
+        limite = time.monotonic() + intervalo
+        while len(lote) < settings.BITACORA_LOTE:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                registro = self.cola.get(timeout=restante)
+            except queue.Empty:
+                break
+            if registro is _FIN:
+                break
+            lote.append(registro)
+        return lote
+
+    def _guardar(self, lote):
+        close_old_connections()
+        try:
+            BitacoraLog.objects.bulk_create(lote)
+        except Exception:
+            # Un registro con datos inválidos no debe hacer perder el lote entero
+            logger.exception('No se pudo guardar un lote de %d registros de bitácora', len(lote))
+            guardados = []
+            for registro in lote:
+                try:
+                    registro.save()
+                    guardados.append(registro)
+                except Exception:
+                    logger.exception('Registro de bitácora perdido: %s', registro.descripcion)
+            lote = guardados
+        _guardados(lote)
+
+    # ── Vaciado ───────────────────────────────────────────────────
+
+    def vaciar(self):
+        """Guarda en el hilo actual todo lo que quede en cola."""
+        if self.cola is None or self.pid != os.getpid():
+            return
+        lote = []
+        while True:
+            try:
+                registro = self.cola.get_nowait()
+            except queue.Empty:
+                break
+            if registro is not _FIN:
+                lote.append(registro)
+        if lote:
+            self._guardar(lote)
+
+    def cerrar(self, espera=5.0):
+        """Detiene el hilo (esperando a que termine su lote) y vacía la cola."""
+        if self.hilo is not None and self.pid == os.getpid():
+            self.detener.set()
+            try:
+                self.cola.put(_FIN, timeout=espera)
+            except queue.Full:
+                pass
+            self.hilo.join(espera)
+        self.vaciar()
+
+
+def _guardados(registros):
+    # Los conteos se pueden recalcular (acumular_actividad) y la bitácora en
+    # vivo es solo un aviso: un error aquí no debe afectar al request ni a la
+    # bitácora ya guardada. El savepoint evita que un fallo deje abortada una
+    # transacción que esté en curso.
+    try:
+        with transaction.atomic():
+            acumular(registros)
+    except Exception:
+        logger.exception('No se pudo actualizar la actividad diaria de %d registros', len(registros))
+    try:
+        with transaction.atomic():
+            publicar(registros)
+    except Exception:
+        logger.exception('No se pudo publicar en vivo %d registros de bitácora', len(registros))
+
+
+_escritor = _EscritorDiferido()
+atexit.register(_escritor.cerrar)
+
+
+def escribir(**campos):
+    """Registra una entrada de bitácora (ver módulo)."""
+    registro = BitacoraLog(**campos)
+    if settings.BITACORA_ASINCRONA:
+        _escritor.encolar(registro)
+    else:
+        registro.save()
+        _guardados([registro])
+
+
+def guardar(**campos):
+    """Guarda una entrada ya, sin cola ni contexto del request, y la devuelve."""
+    registro = BitacoraLog.objects.create(**campos)
+    _guardados([registro])
+    return registro
+
+
+def escribir_lote(registros):
+    """Guarda varios BitacoraLog ya armados en un solo INSERT (o los encola)."""
+    if settings.BITACORA_ASINCRONA:
+        for registro in registros:
+            _escritor.encolar(registro)
+    else:
+        BitacoraLog.objects.bulk_create(registros)
+        _guardados(registros)
+
+
+def vaciar():
+    """Fuerza la escritura de lo que esté en cola (comandos, pruebas)."""
+    _escritor.vaciar()
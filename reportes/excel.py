@@ -0,0 +1,260 @@
+"""
+Exportación a Excel en modo streaming.
+
+Los libros usan la hoja write-only de openpyxl: cada fila se serializa a un
+archivo temporal en cuanto se agrega, así la memoria no crece con el número de
+registros. Los estilos se registran una sola vez por libro como NamedStyle y
+cada celda solo guarda el nombre del estilo.
+
+Para descargar, xlsx_streaming arma el ZIP del .xlsx a medida que se escriben
+las filas: el primer bloque sale con las primeras filas y no cuando el libro
+está completo.
+
+Uso:
+    from reportes.excel import libro_reporte, respuesta_excel
+
+    return respuesta_excel(lambda: [('Personal', REPORTE, qs)], 'reporte.xlsx')
+
+    libro_reporte(REPORTE, qs, 'Personal').save(destino)      # libro completo
+
+Para varias hojas en un libro está libro_hojas; para un libro por grupo
+(p. ej. por unidad) en una sola pasada, libros_por_grupo; para hojas armadas
+a mano, nuevo_libro, agregar_hoja y fila_estilizada.
+"""
+
+import shutil
+import zipfile
+
+from django.http import StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
+
+from .zip_export import SalidaZip
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CHUNK_SIZE        = 64 * 1024
+
+
+def _estilos():
+    """Estilos institucionales del reporte (mismo formato que el libro clásico)."""
+    side   = Side(style='thin', color='AAAAAA')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    c_font  = Font(name='Arial', size=9)
+    c_align = Alignment(vertical='center', wrap_text=True)
+    return [
+        NamedStyle(
+            name='titulo',
+            font=Font(name='Arial', bold=True, size=13, color='1F3864'),
+            alignment=Alignment(horizontal='center', vertical='center'),
+        ),
+        NamedStyle(
+            name='encabezado',
+            font=Font(name='Arial', bold=True, color='FFFFFF', size=10),
+            fill=PatternFill('solid', start_color='1F3864'),
+            alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+            border=border,
+        ),
+        NamedStyle(name='celda', font=c_font, alignment=c_align, border=border),
+        NamedStyle(
+            name='celda_alt',
+            font=c_font, alignment=c_align, border=border,
+            fill=PatternFill('solid', start_color='EAF0FB'),
+        ),
+    ]
+
+
+def _celda(ws, valor, estilo):
+    cell       = WriteOnlyCell(ws, value=valor)
+    cell.style = estilo
+    return cell
+
+
+def nuevo_libro():
+    """Libro write-only con los estilos nombrados ya registrados."""
+    wb = Workbook(write_only=True)
+    for estilo in _estilos():
+        wb.add_named_style(estilo)
+    return wb
+
+
+def agregar_hoja(wb, nombre, encabezados, anchos, titulo):
+    """
+    Crea una hoja con título (fila 1), separador (fila 2) y encabezados (fila 3).
+    Las dimensiones se fijan antes de escribir la primera fila, como exige el
+    modo write-only; los datos usan la altura por defecto de la hoja para no
+    guardar una dimensión por fila.
+    """
+    ws     = wb.create_sheet(nombre)
+    ultima = get_column_letter(len(encabezados))
+
+    for i, ancho in enumerate(anchos, 1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho
+    ws.row_dimensions[1].height = 28
+    ws.row_dimensions[2].height = 6
+    ws.row_dimensions[3].height = 36
+    ws.sheet_format.defaultRowHeight = 18
+    ws.sheet_format.customHeight     = True
+
+    ws.freeze_panes    = 'A4'
+    ws.auto_filter.ref = f'A3:{ultima}3'
+    ws.merged_cells.add(f'A1:{ultima}1')
+
+    ws.append([_celda(ws, titulo, 'titulo')])
+    ws.append([])
+    ws.append([_celda(ws, h, 'encabezado') for h in encabezados])
+    return ws
+
+
+def fila_estilizada(ws, valores, alterna=False):
+    """Convierte una lista de valores en celdas con el estilo de datos (cebra)."""
+    estilo = 'celda_alt' if alterna else 'celda'
+    return [_celda(ws, v, estilo) for v in valores]
+
+
+def _filas_rapidas(ws):
+    """
+    Igual que fila_estilizada, pero resuelve cada estilo nombrado una sola vez
+    por hoja y todas las celdas de datos comparten ese mismo StyleArray; buscar
+    el estilo por nombre en cada celda es la mayor parte del costo por fila.
+    Compartirlo es seguro porque una celda write-only no se modifica después
+    de agregarla: la hoja la serializa en append() y la descarta.
+    """
+    estilos = {
+        alterna: _celda(ws, None, 'celda_alt' if alterna else 'celda')._style
+        for alterna in (False, True)
+    }
+
+    def fila(valores, alterna):
+        estilo = estilos[alterna]
+        celdas = []
+        for valor in valores:
+            cell        = WriteOnlyCell(ws, value=valor)
+            cell._style = estilo
+            celdas.append(cell)
+        return celdas
+    return fila
+
+
+def libro_reporte(reporte, queryset, nombre_hoja, progreso=None, chunk_size=2000):
+    """
+    Libro de una hoja con las filas de un Reporte (reportes/proyeccion.py).
+    progreso — callable opcional que recibe el número de filas escritas.
+    """
+    return libro_hojas([(nombre_hoja, reporte, queryset)], progreso, chunk_size)
+
+
+def libro_hojas(hojas, progreso=None, chunk_size=2000):
+    """
+    Libro con una hoja por cada (nombre_hoja, reporte, queryset).
+
+    Las hojas se escriben una tras otra, cada una con su propia consulta y
+    cursor; el progreso acumula las filas de todas las hojas.
+    """
+    wb     = nuevo_libro()
+    previo = 0
+    for nombre_hoja, reporte, queryset in hojas:
+        avance  = (lambda n, base=previo: progreso(base + n)) if progreso else None
+        previo += _escribir_hoja(wb, nombre_hoja, reporte, reporte.titulo,
+                                 reporte.filas(queryset, chunk_size, avance))
+    return wb
+
+
+def libros_por_grupo(reporte, queryset, campo, nombre_hoja, titulo=None, chunk_size=2000):
+    """
+    Un libro de una hoja por cada valor de `campo`, en una sola pasada del
+    queryset (que debe venir ordenado primero por `campo`). Genera
+    (valor, libro); cada libro debe guardarse antes de pedir el siguiente.
+
+    titulo — callable opcional valor → título de la hoja.
+    """
+    for valor, filas in reporte.grupos(queryset, campo, chunk_size):
+        wb = nuevo_libro()
+        _escribir_hoja(wb, nombre_hoja, reporte,
+                       titulo(valor) if titulo else reporte.titulo, filas)
+        yield valor, wb
+
+
+def _escribir_hoja(wb, nombre_hoja, reporte, titulo, filas):
+    """Agrega la hoja con las filas ya convertidas; devuelve cuántas escribió."""
+    ws   = agregar_hoja(wb, nombre_hoja, reporte.encabezados, reporte.anchos, titulo)
+    fila = _filas_rapidas(ws)
+    i = -1
+    for i, valores in enumerate(filas):
+        ws.append(fila(valores, i % 2 == 0))
+    return i + 1
+
+
+class _SinHojas:
+    """ZipFile para ExcelWriter que omite las hojas ya enviadas por xlsx_streaming."""
+
+    def __init__(self, zf, enviadas):
+        self.zf       = zf
+        self.enviadas = enviadas
+
+    def write(self, origen, nombre):
+        if nombre not in self.enviadas:
+            self.zf.write(origen, nombre)
+
+    def __getattr__(self, nombre):
+        return getattr(self.zf, nombre)
+
+
+def xlsx_streaming(hojas, chunk_size=2000):
+    """
+    Genera los bytes del libro con una hoja por cada (nombre_hoja, reporte,
+    queryset) mientras se escriben las filas.
+
+    Un .xlsx es un ZIP. La hoja write-only va serializando sus filas en un
+    archivo temporal; cada `chunk_size` filas lo nuevo de ese archivo se copia
+    a la entrada de la hoja en el ZIP y se entrega. Estilos, libro, relaciones
+    y [Content_Types].xml dependen de todas las hojas: los escribe openpyxl al
+    final, y en un ZIP el orden de las entradas no importa.
+    """
+    salida   = SalidaZip()
+    wb       = nuevo_libro()
+    enviadas = set()
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for numero, (nombre_hoja, reporte, queryset) in enumerate(hojas, start=1):
+            ws     = agregar_hoja(wb, nombre_hoja, reporte.encabezados, reporte.anchos, reporte.titulo)
+            fila   = _filas_rapidas(ws)
+            nombre = f'xl/worksheets/sheet{numero}.xml'    # el mismo que le da ExcelWriter
+            # _writer.out es el temporal donde openpyxl escribe el XML de la hoja
+            with zf.open(nombre, 'w') as destino, open(ws._writer.out, 'rb') as origen:
+                for i, valores in enumerate(reporte.filas(queryset, chunk_size), start=1):
+                    ws.append(fila(valores, i % 2 == 1))
+                    if i % chunk_size == 0:
+                        shutil.copyfileobj(origen, destino)
+                        yield salida.vaciar()
+                ws.close()
+                shutil.copyfileobj(origen, destino)
+            enviadas.add(nombre)
+            yield salida.vaciar()
+        ExcelWriter(wb, _SinHojas(zf, enviadas)).write_data()
+    yield salida.vaciar()
+
+
+def respuesta_excel(hojas, filename, guardar=None, chunk_size=2000):
+    """
+    StreamingHttpResponse con el libro de xlsx_streaming.
+
+    hojas   — callable sin argumentos que devuelve [(nombre_hoja, reporte,
+              queryset)]; se llama dentro del iterador, así las cabeceras
+              salen antes de consultar la base de datos.
+    guardar — callable opcional que recibe el generador de bytes y devuelve
+              otro que entrega los mismos bytes (lo usa la caché de
+              exportaciones para quedarse con una copia).
+    """
+    def generar():
+        yield b''
+        partes = xlsx_streaming(hojas(), chunk_size)
+        if guardar is not None:
+            partes = guardar(partes)
+        yield from partes
+
+    response = StreamingHttpResponse(generar(), content_type=XLSX_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
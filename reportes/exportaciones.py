@@ -0,0 +1,117 @@
+"""
+Cola de exportaciones en segundo plano sobre la base de datos local.
+
+Encolar desde una vista:
+    from reportes.exportaciones import encolar
+    job = encolar('personal_excel', request.user, request.GET)
+
+Procesar la cola (proceso aparte del servidor web):
+    python manage.py procesar_exportaciones
+"""
+
+import tempfile
+from datetime import date, timedelta
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .excel import libro_hojas, libro_reporte
+from .informes import (
+    filtrar_bitacora, hojas_expediente, queryset_personal, resumen_bitacora, resumen_bitacora_pdf,
+    REPORTE_PERSONAL, REPORTE_BITACORA,
+)
+from .models import ExportJob
+from .pdf_tabla import dibujar_pdf, subtitulo
+
+
+def encolar(tipo, usuario, params):
+    """Crea el trabajo con los filtros no vacíos del GET."""
+    parametros = {clave: valor for clave, valor in params.items() if valor}
+    return ExportJob.objects.create(tipo=tipo, usuario=usuario, parametros=parametros)
+
+
+def tomar_siguiente():
+    """
+    Toma el trabajo pendiente más antiguo y lo marca como 'procesando'.
+    SKIP LOCKED permite correr varios workers sin que dos tomen el mismo.
+    """
+    with transaction.atomic():
+        job = ExportJob.objects.select_for_update(skip_locked=True).filter(
+            estado='pendiente'
+        ).order_by('fecha_creacion').first()
+        if job is None:
+            return None
+        job.estado       = 'procesando'
+        job.fecha_inicio = timezone.now()
+        job.save(update_fields=['estado', 'fecha_inicio'])
+    return job
+
+
+def liberar_atascados(minutos):
+    """Devuelve a la cola los trabajos de un worker que murió a mitad de proceso."""
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return ExportJob.objects.filter(
+        estado='procesando', fecha_inicio__lt=limite
+    ).update(estado='pendiente', filas_procesadas=0)
+
+
+# ── Renderizadores ────────────────────────────────────────────────
+# Reciben el trabajo, un archivo temporal binario y el callback de
+# progreso; devuelven el nombre con el que se guarda el archivo.
+
+def _iniciar(job, total):
+    job.filas_total = total
+    job.save(update_fields=['filas_total'])
+
+
+def _render_personal_excel(job, destino, progreso):
+    qs = queryset_personal(job.parametros)
+    _iniciar(job, qs.count())
+    libro_reporte(REPORTE_PERSONAL, qs, 'Personal', progreso=progreso).save(destino)
+    return f"reporte_personal_{date.today().strftime('%Y%m%d')}.xlsx"
+
+
+def _render_expediente_excel(job, destino, progreso):
+    hojas = hojas_expediente(job.parametros)
+    _iniciar(job, sum(qs.count() for _, _, qs in hojas))
+    libro_hojas(hojas, progreso=progreso).save(destino)
+    return f"expediente_personal_{date.today().strftime('%Y%m%d')}.xlsx"
+
+
+def _render_bitacora_pdf(job, destino, progreso):
+    qs = filtrar_bitacora(job.parametros)
+    _iniciar(job, qs.count())
+    dibujar_pdf(REPORTE_BITACORA, qs, destino,
+                subtitulo(job.usuario.username, job.filas_total), progreso=progreso,
+                resumen=resumen_bitacora_pdf(resumen_bitacora(job.parametros)))
+    return f"bitacora_{date.today().strftime('%Y%m%d')}.pdf"
+
+
+RENDERIZADORES = {
+    'personal_excel':   _render_personal_excel,
+    'expediente_excel': _render_expediente_excel,
+    'bitacora_pdf':     _render_bitacora_pdf,
+}
+
+
+def ejecutar(job):
+    """Genera el archivo del trabajo y lo guarda en el storage por defecto."""
+    def progreso(filas):
+        ExportJob.objects.filter(pk=job.pk).update(filas_procesadas=filas)
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            nombre = RENDERIZADORES[job.tipo](job, tmp, progreso)
+            tmp.seek(0)
+            job.archivo.save(nombre, File(tmp), save=False)
+        job.estado           = 'completado'
+        job.filas_procesadas = job.filas_total
+        job.error            = None
+    except Exception as e:
+        job.estado = 'error'
+        job.error  = str(e)
+
+    job.fecha_fin = timezone.now()
+    job.save(update_fields=['estado', 'filas_procesadas', 'archivo', 'error', 'fecha_fin'])
+    return job
@@ -0,0 +1,205 @@
+"""
+Hojas de vida en lote: un PDF por efectivo, comprimidos en un ZIP.
+
+1. Los datos se leen por bloques de BLOQUE_DATOS personas con una consulta por
+   tabla (personal, kardex, destinos, sanciones, felicitaciones); las etiquetas
+   de catálogos salen de mapa_catalogos(). Cada persona queda en un
+   diccionario simple (ver reportes/pdf_hoja_vida.py).
+2. Los diccionarios se envían a un pool de procesos que dibuja los PDF sin
+   tocar la base de datos. Hay como máximo PENDIENTES_POR_PROCESO documentos
+   en vuelo por proceso, así la memoria no crece con el tamaño del lote.
+3. Cada PDF terminado se agrega al ZIP (reportes/zip_export.py) en el orden
+   del reporte y los bytes se entregan de inmediato: la descarga avanza
+   mientras el pool sigue dibujando.
+
+Uso:
+    for bloque in zip_hojas_vida(queryset_personal(request.GET)):
+        ...
+
+    python manage.py generar_hojas_vida --unidad 3 --salida hojas_vida.zip   # todos los núcleos
+"""
+
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from personal.models import (
+    PersonalPolicial, KardexDigital, DestinoPolicial, SancionAplicada, FelicitacionAplicada,
+)
+
+from .informes import mapa_catalogos
+from .pdf_hoja_vida import dibujar_hoja_vida
+from .zip_export import zip_streaming
+
+
+BLOQUE_DATOS           = 200
+PENDIENTES_POR_PROCESO = 4
+
+
+def numero_procesos(procesos=None):
+    """
+    Procesos del pool: el argumento o HOJAS_VIDA_PROCESOS. Este último es
+    pequeño a propósito: cada descarga web levanta su propio pool, y dos
+    descargas con un proceso por núcleo saturarían el servidor. Usar todos
+    los núcleos es cosa de `generar_hojas_vida`.
+    """
+    return max(1, procesos or settings.HOJAS_VIDA_PROCESOS)
+
+
+# ── Datos ─────────────────────────────────────────────────────────
+
+def _fecha(valor):
+    return valor.strftime('%d/%m/%Y') if valor else ''
+
+
+def _por_persona(queryset, campos):
+    agrupado = defaultdict(list)
+    for fila in queryset.values_list('personal_id', *campos):
+        agrupado[fila[0]].append(fila[1:])
+    return agrupado
+
+
+def _ruta_foto(nombre):
+    if not nombre:
+        return None
+    ruta = os.path.join(str(settings.MEDIA_ROOT), nombre)
+    return ruta if os.path.exists(ruta) else None
+
+
+def _hojas_bloque(ids, cat, generado):
+    grado   = cat['grado']
+    unidad  = cat['unidad']
+    estado  = cat['estado']
+    genero  = dict(PersonalPolicial.GENERO_CHOICES)
+    t_kard  = dict(KardexDigital.TIPO_REGISTRO_CHOICES)
+    t_dest  = dict(DestinoPolicial.TIPO_DESTINO_CHOICES)
+    e_sanc  = dict(SancionAplicada.ESTADO_CHOICES)
+
+    personas = {
+        p['pk']: p for p in PersonalPolicial.objects.filter(pk__in=ids).values(
+            'pk', 'codigo_identificacion', 'ci', 'expedido', 'nombres',
+            'apellido_paterno', 'apellido_materno', 'fecha_nacimiento', 'genero',
+            'grado_id', 'unidad_id', 'estado_actual_id', 'fecha_ingreso',
+            'telefono_personal', 'correo_institucional', 'direccion_domicilio',
+            'cargo_actual', 'otra_profesion', 'foto',
+        )
+    }
+    kardex = _por_persona(
+        KardexDigital.objects.filter(personal_id__in=ids).order_by('-fecha_registro', '-pk'),
+        ('fecha_registro', 'tipo_registro', 'descripcion', 'documento_referencia'),
+    )
+    destinos = _por_persona(
+        DestinoPolicial.objects.filter(personal_id__in=ids).order_by('-fecha_inicio', '-pk'),
+        ('tipo_destino', 'unidad_destino_id', 'lugar_destino', 'fecha_inicio', 'fecha_fin', 'activo'),
+    )
+    sanciones = _por_persona(
+        SancionAplicada.objects.filter(personal_id__in=ids).order_by('-fecha_sancion', '-pk'),
+        ('fecha_sancion', 'tipo_sancion_id', 'motivo', 'estado'),
+    )
+    felicitaciones = _por_persona(
+        FelicitacionAplicada.objects.filter(personal_id__in=ids).order_by('-fecha_felicitacion', '-pk'),
+        ('fecha_felicitacion', 'tipo_felicitacion_id', 'motivo'),
+    )
+
+    for pk in ids:
+        p = personas.get(pk)
+        if p is None:
+            continue
+        abreviatura = grado.get(p['grado_id'], '')
+        nombre      = f"{p['apellido_paterno']} {p['apellido_materno']} {p['nombres']}"
+        yield {
+            'archivo'  : f"{slugify(f'{abreviatura} {nombre}')}_{p['ci']}.pdf",
+            'titulo'   : f'{abreviatura} {nombre}'.upper(),
+            'subtitulo': generado,
+            'foto'     : _ruta_foto(p['foto']),
+            'datos'    : [
+                ('Código',              p['codigo_identificacion']),
+                ('C. I.',               f"{p['ci']} {p['expedido']}"),
+                ('Fecha de nacimiento', _fecha(p['fecha_nacimiento'])),
+                ('Sexo',                genero.get(p['genero'], '')),
+                ('Grado',               abreviatura),
+                ('Unidad',              unidad.get(p['unidad_id'], '')),
+                ('Estado',              estado.get(p['estado_actual_id'], '')),
+                ('Fecha de ingreso',    _fecha(p['fecha_ingreso'])),
+                ('Cargo actual',        p['cargo_actual']),
+                ('Celular',             p['telefono_personal']),
+                ('Correo',              p['correo_institucional']),
+                ('Domicilio',           p['direccion_domicilio']),
+                ('Otra profesión',      p['otra_profesion']),
+            ],
+            'secciones': [
+                ('Destinos', ['TIPO', 'UNIDAD', 'LUGAR', 'DESDE', 'HASTA', 'ACTIVO'], [3, 4, 4, 2, 2, 1.5], [
+                    (t_dest.get(tipo, tipo), unidad.get(u_id, ''), lugar,
+                     _fecha(inicio), _fecha(fin), 'Sí' if activo else 'No')
+                    for tipo, u_id, lugar, inicio, fin, activo in destinos.get(pk, ())
+                ]),
+                ('Kardex', ['FECHA', 'TIPO', 'DESCRIPCIÓN', 'DOCUMENTO'], [2, 3.5, 8, 3], [
+                    (_fecha(fecha), t_kard.get(tipo, tipo), descripcion, documento)
+                    for fecha, tipo, descripcion, documento in kardex.get(pk, ())
+                ]),
+                ('Sanciones', ['FECHA', 'SANCIÓN', 'MOTIVO', 'ESTADO'], [2, 4, 8, 2], [
+                    (_fecha(fecha), cat['sancion'].get(t_id, ''), motivo, e_sanc.get(e, e))
+                    for fecha, t_id, motivo, e in sanciones.get(pk, ())
+                ]),
+                ('Felicitaciones', ['FECHA', 'FELICITACIÓN', 'MOTIVO'], [2, 5, 9], [
+                    (_fecha(fecha), cat['felicitacion'].get(t_id, ''), motivo)
+                    for fecha, t_id, motivo in felicitaciones.get(pk, ())
+                ]),
+            ],
+        }
+
+
+def datos_hojas_vida(queryset, bloque=BLOQUE_DATOS):
+    """Diccionarios de hoja de vida en el orden del queryset, leídos por bloques."""
+    ids      = list(queryset.values_list('pk', flat=True))
+    cat      = mapa_catalogos()
+    generado = f"Generado el {timezone.localdate().strftime('%d/%m/%Y')}"
+    for i in range(0, len(ids), bloque):
+        yield from _hojas_bloque(ids[i:i + bloque], cat, generado)
+
+
+# ── PDF en paralelo ───────────────────────────────────────────────
+
+def pdfs_hojas_vida(queryset, procesos=None):
+    """
+    Genera (nombre_archivo, bytes_pdf) en el orden del queryset.
+
+    Con un solo proceso dibuja en línea; si no, usa un pool 'spawn' (los
+    procesos hijos no heredan conexiones ni hilos del servidor web).
+    """
+    procesos = numero_procesos(procesos)
+    hojas    = datos_hojas_vida(queryset)
+    if procesos == 1:
+        for hoja in hojas:
+            yield hoja['archivo'], dibujar_hoja_vida(hoja)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=procesos, mp_context=get_context('spawn'))
+    try:
+        en_vuelo = deque()
+        for hoja in hojas:
+            en_vuelo.append((hoja['archivo'], pool.submit(dibujar_hoja_vida, hoja)))
+            if len(en_vuelo) >= procesos * PENDIENTES_POR_PROCESO:
+                archivo, futuro = en_vuelo.popleft()
+                yield archivo, futuro.result()
+        while en_vuelo:
+            archivo, futuro = en_vuelo.popleft()
+            yield archivo, futuro.result()
+    finally:
+        # Si la descarga se corta, no dibujar lo que quedó en cola
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ── ZIP ───────────────────────────────────────────────────────────
+
+def zip_hojas_vida(queryset, procesos=None, progreso=None):
+    """
+    Bytes del ZIP con una hoja de vida por persona, a medida que se generan.
+    progreso — callable opcional que recibe el número de documentos agregados.
+    """
+    return zip_streaming(pdfs_hojas_vida(queryset, procesos), progreso)
@@ -0,0 +1,471 @@
+"""
+Definiciones de los reportes tabulares (ver reportes/proyeccion.py).
+
+Cada reporte se usa tal cual en todas sus salidas:
+    REPORTE_PERSONAL          — Excel de personal (16 columnas)
+    REPORTE_PERSONAL_PANTALLA — vista previa en pantalla y PDF de personal
+    REPORTE_PERSONAL_TEXTO    — CSV / TSV de personal
+    REPORTE_BITACORA          — PDF de la bitácora
+    REPORTE_BITACORA_TEXTO    — CSV / TSV de la bitácora
+    filtrar_bitacora()        — bitácora con los filtros de la pantalla
+    resumen_bitacora_pdf()    — página de resumen del PDF de la bitácora
+
+El expediente consolidado (hojas_expediente) arma sus reportes en cada
+exportación porque resuelve las claves foráneas con los catálogos del momento.
+"""
+
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import CharField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.utils import timezone
+from reportlab.lib import colors
+
+from catalogos import cache_catalogos
+from catalogos.models import Grado, Unidad, TipoEstado, TipoSancion, TipoFelicitacion
+from core.models import Usuario
+from personal.models import (
+    PersonalPolicial, DestinoPolicial, KardexDigital, PermisoLicencia,
+    SancionAplicada, FelicitacionAplicada,
+)
+
+from .actividad import resumen_actividad
+from .busqueda_bitacora import filtrar_texto
+from .models import BitacoraLog
+from .pdf_tabla import COLORES_ACCION
+from .proyeccion import Columna, Reporte, etiqueta
+
+
+# ================================================================
+# PERSONAL
+# ================================================================
+
+ORDEN_PERSONAL = ('grado__orden', 'apellido_paterno', 'nombres')
+
+
+def aplicar_filtros_personal(qs, params):
+    buscar = params.get('buscar', '').strip()
+    if buscar:
+        qs = qs.filter(
+            Q(nombres__icontains=buscar)          |
+            Q(apellido_paterno__icontains=buscar) |
+            Q(apellido_materno__icontains=buscar) |
+            Q(ci__icontains=buscar)
+        )
+    if params.get('grado'):
+        qs = qs.filter(grado_id=params['grado'])
+    if params.get('unidad'):
+        qs = qs.filter(unidad_id=params['unidad'])
+    if params.get('estado'):
+        qs = qs.filter(estado_actual_id=params['estado'])
+    if params.get('genero'):
+        qs = qs.filter(genero=params['genero'])
+    return qs
+
+
+def queryset_personal(params):
+    """Personal filtrado por los parámetros GET y en el orden de los reportes."""
+    return aplicar_filtros_personal(
+        PersonalPolicial.objects.order_by(*ORDEN_PERSONAL), params
+    )
+
+
+# Destino activo y anterior más recientes: subconsultas correlacionadas
+# resueltas en la misma consulta del reporte.
+_destinos = DestinoPolicial.objects.filter(
+    personal=OuterRef('pk')
+).order_by('-fecha_inicio', '-pk')
+_activo   = _destinos.filter(activo=True)
+_anterior = _destinos.filter(activo=False)
+
+ANOTACIONES_PERSONAL = {
+    'sexo': etiqueta('genero', PersonalPolicial.GENERO_CHOICES),
+    'destino_actual': Subquery(
+        _activo.values(v=Coalesce('unidad_destino__nombre', 'lugar_destino'))[:1]
+    ),
+    'destino_lugar': Subquery(_activo.values('lugar_destino')[:1]),
+    'destino_fecha': Subquery(_activo.values('fecha_inicio')[:1]),
+    'destino_anterior': Subquery(
+        _anterior.values(v=Concat(
+            'lugar_destino', Value(' ('),
+            Cast('fecha_inicio', CharField()), Value(' - '),
+            Coalesce(Cast('fecha_fin', CharField()), Value('actualidad')), Value(')'),
+            output_field=CharField(),
+        ))[:1]
+    ),
+}
+
+
+def _texto(valor):
+    return valor or ''
+
+
+def _primer_nombre(nombres):
+    return (nombres or '').split(' ', 1)[0]
+
+
+def _segundo_nombre(nombres):
+    partes = (nombres or '').split(' ', 1)
+    return partes[1] if len(partes) > 1 else ''
+
+
+def _fecha_texto(fecha):
+    return str(fecha) if fecha else ''
+
+
+REPORTE_PERSONAL = Reporte(
+    'UTEPPI — REPORTE DE PERSONAL POLICIAL',
+    columnas=[
+        Columna('GRADO',                      'grado__abreviatura', ancho=14),
+        Columna('APELLIDO PATERNO',           'apellido_paterno',   ancho=18),
+        Columna('APELLIDO MATERNO',           'apellido_materno',   ancho=18),
+        Columna('1ER. NOMBRE',                'nombres',            ancho=14, transformar=_primer_nombre),
+        Columna('2DO. NOMBRE',                'nombres',            ancho=14, transformar=_segundo_nombre),
+        Columna('C. I.',                      'ci',                 ancho=12),
+        Columna('EXP.',                       'expedido',           ancho=6),
+        Columna('SEXO',                       'sexo',               ancho=6),
+        Columna('DIRECCIÓN DEL DOMICILIO',    'direccion_domicilio', ancho=28, transformar=_texto),
+        Columna('CARGO ACTUAL',               'cargo_actual',       ancho=22, transformar=_texto),
+        Columna('UNIDAD DE DESTINO ACTUAL',   'destino_actual',     ancho=22, transformar=_texto),
+        Columna('FECHA DESTINO ACTUAL',       'destino_fecha',      ancho=16, transformar=_fecha_texto),
+        Columna('DESTINO ANTERIOR',           'destino_anterior',   ancho=22, transformar=_texto),
+        Columna('NÚMERO DE CELULAR',          'telefono_personal',  ancho=16, transformar=_texto),
+        Columna('CORREO ELECTRÓNICO',         'correo_institucional', ancho=26, transformar=_texto),
+        Columna('OTRA PROFESIÓN (LIC./TÉC.)', 'otra_profesion',     ancho=24, transformar=_texto),
+    ],
+    anotaciones=ANOTACIONES_PERSONAL,
+)
+
+REPORTE_PERSONAL_PANTALLA = Reporte(
+    'UTEPPI — REPORTE DE PERSONAL POLICIAL',
+    columnas=[
+        Columna('GRADO',          'grado__abreviatura', ancho=8),
+        Columna('AP. PATERNO',    'apellido_paterno',   ancho=16),
+        Columna('AP. MATERNO',    'apellido_materno',   ancho=16),
+        Columna('NOMBRE(S)',      'nombres',            ancho=20),
+        Columna('C.I.',           'ci', 'expedido',     ancho=12,
+                transformar=lambda ci, expedido: f'{ci} {expedido}'),
+        Columna('SEXO',           'sexo',               ancho=10),
+        Columna('CARGO ACTUAL',   'cargo_actual',       ancho=20, transformar=_texto),
+        Columna('UNIDAD DESTINO', 'destino_lugar',      ancho=22, transformar=_texto),
+        Columna('CELULAR',        'telefono_personal',  ancho=12, transformar=_texto),
+        Columna('OTRA PROFESIÓN', 'otra_profesion',     ancho=20, transformar=_texto),
+    ],
+    anotaciones=ANOTACIONES_PERSONAL,
+)
+
+REPORTE_PERSONAL_TEXTO = Reporte(
+    'UTEPPI — REPORTE DE PERSONAL POLICIAL',
+    columnas=[
+        Columna('CÓDIGO',             'codigo_identificacion'),
+        Columna('GRADO',              'grado__abreviatura'),
+        Columna('APELLIDO PATERNO',   'apellido_paterno'),
+        Columna('APELLIDO MATERNO',   'apellido_materno'),
+        Columna('NOMBRES',            'nombres'),
+        Columna('C. I.',              'ci'),
+        Columna('EXP.',               'expedido'),
+        Columna('SEXO',               'sexo'),
+        Columna('UNIDAD',             'unidad__nombre'),
+        Columna('ESTADO',             'estado_actual__nombre'),
+        Columna('FECHA DE INGRESO',   'fecha_ingreso'),
+        Columna('CARGO ACTUAL',       'cargo_actual'),
+        Columna('NÚMERO DE CELULAR',  'telefono_personal'),
+        Columna('CORREO ELECTRÓNICO', 'correo_institucional'),
+        Columna('OTRA PROFESIÓN',     'otra_profesion'),
+    ],
+    anotaciones=ANOTACIONES_PERSONAL,
+)
+
+
+# ================================================================
+# EXPEDIENTE CONSOLIDADO
+# ================================================================
+
+def mapa_catalogos():
+    """
+    {catálogo: {pk: etiqueta}} desde la copia en memoria de los catálogos
+    (solo los usuarios se consultan, una vez por exportación). Las hojas del
+    expediente proyectan solo los *_id y resuelven la etiqueta en Python, así
+    cada hoja es una consulta sin joins a los catálogos.
+    """
+    return {
+        'grado'       : cache_catalogos.etiquetas(Grado, 'abreviatura'),
+        'unidad'      : cache_catalogos.etiquetas(Unidad, 'nombre'),
+        'estado'      : cache_catalogos.etiquetas(TipoEstado, 'nombre'),
+        'sancion'     : cache_catalogos.etiquetas(TipoSancion, 'nombre'),
+        'felicitacion': cache_catalogos.etiquetas(TipoFelicitacion, 'nombre'),
+        'usuario'     : dict(Usuario.objects.values_list('pk', 'username')),
+    }
+
+
+def _resolver(mapa):
+    return lambda pk: mapa.get(pk, '') if pk is not None else ''
+
+
+def _opciones(choices):
+    mapa = dict(choices)
+    return lambda valor: mapa.get(valor, valor or '')
+
+
+def _cambio(mapa, anterior, nuevo):
+    if anterior is None and nuevo is None:
+        return ''
+    return f"{mapa.get(anterior, '—')} → {mapa.get(nuevo, '—')}"
+
+
+def _columnas_persona(cat):
+    """Columnas que identifican al efectivo en las hojas de registros relacionados."""
+    return [
+        Columna('GRADO',            'personal__grado_id', ancho=10,
+                transformar=_resolver(cat['grado'])),
+        Columna('C. I.',            'personal__ci',       ancho=12),
+        Columna('APELLIDOS Y NOMBRES',
+                'personal__apellido_paterno', 'personal__apellido_materno', 'personal__nombres',
+                ancho=32, transformar=lambda p, m, n: f'{p} {m} {n}'),
+    ]
+
+
+def hojas_expediente(params, cat=None):
+    """
+    Hojas del expediente consolidado: [(nombre_hoja, reporte, queryset), ...].
+
+    Todas las hojas usan los mismos filtros del reporte de personal; las de
+    registros relacionados filtran con una subconsulta sobre el personal
+    filtrado, de modo que cada hoja es una sola consulta sin importar cuántos
+    efectivos incluya.
+    """
+    cat      = cat or mapa_catalogos()
+    personal = aplicar_filtros_personal(PersonalPolicial.objects.all(), params)
+    ids      = personal.values('pk')
+    orden    = [f'personal__{campo}' for campo in ORDEN_PERSONAL]
+    usuario  = _resolver(cat['usuario'])
+
+    hoja_personal = Reporte(
+        'UTEPPI — EXPEDIENTE: PERSONAL',
+        columnas=[
+            Columna('CÓDIGO',             'codigo_identificacion', ancho=14),
+            Columna('GRADO',              'grado_id',          ancho=10, transformar=_resolver(cat['grado'])),
+            Columna('APELLIDO PATERNO',   'apellido_paterno',  ancho=18),
+            Columna('APELLIDO MATERNO',   'apellido_materno',  ancho=18),
+            Columna('NOMBRES',            'nombres',           ancho=22),
+            Columna('C. I.',              'ci', 'expedido',    ancho=14,
+                    transformar=lambda ci, expedido: f'{ci} {expedido}'),
+            Columna('SEXO',               'genero',            ancho=10,
+                    transformar=_opciones(PersonalPolicial.GENERO_CHOICES)),
+            Columna('UNIDAD',             'unidad_id',         ancho=24, transformar=_resolver(cat['unidad'])),
+            Columna('ESTADO',             'estado_actual_id',  ancho=14, transformar=_resolver(cat['estado'])),
+            Columna('FECHA DE INGRESO',   'fecha_ingreso',     ancho=14, transformar=_fecha_texto),
+            Columna('CARGO ACTUAL',       'cargo_actual',      ancho=22, transformar=_texto),
+            Columna('NÚMERO DE CELULAR',  'telefono_personal', ancho=16, transformar=_texto),
+            Columna('CORREO ELECTRÓNICO', 'correo_institucional', ancho=26, transformar=_texto),
+        ],
+    )
+
+    hoja_kardex = Reporte(
+        'UTEPPI — EXPEDIENTE: KARDEX DIGITAL',
+        columnas=_columnas_persona(cat) + [
+            Columna('FECHA',          'fecha_registro',  ancho=12, transformar=_fecha_texto),
+            Columna('TIPO',           'tipo_registro',   ancho=20,
+                    transformar=_opciones(KardexDigital.TIPO_REGISTRO_CHOICES)),
+            Columna('DESCRIPCIÓN',    'descripcion',     ancho=40),
+            Columna('GRADO ANT. → NUEVO', 'grado_anterior_id', 'grado_nuevo_id', ancho=16,
+                    transformar=lambda a, n: _cambio(cat['grado'], a, n)),
+            Columna('UNIDAD ANT. → NUEVA', 'unidad_anterior_id', 'unidad_nueva_id', ancho=30,
+                    transformar=lambda a, n: _cambio(cat['unidad'], a, n)),
+            Columna('ESTADO ANT. → NUEVO', 'estado_anterior_id', 'estado_nuevo_id', ancho=22,
+                    transformar=lambda a, n: _cambio(cat['estado'], a, n)),
+            Columna('DOCUMENTO',      'documento_referencia', ancho=18, transformar=_texto),
+            Columna('REGISTRADO POR', 'registrado_por_id', ancho=14, transformar=usuario),
+        ],
+    )
+
+    hoja_permisos = Reporte(
+        'UTEPPI — EXPEDIENTE: PERMISOS Y LICENCIAS',
+        columnas=_columnas_persona(cat) + [
+            Columna('TIPO',         'tipo_permiso',    ancho=20,
+                    transformar=_opciones(PermisoLicencia.TIPO_PERMISO_CHOICES)),
+            Columna('DESDE',        'fecha_inicio',    ancho=12, transformar=_fecha_texto),
+            Columna('HASTA',        'fecha_fin',       ancho=12, transformar=_fecha_texto),
+            Columna('DÍAS',         'dias_solicitados', ancho=6),
+            Columna('MOTIVO',       'motivo',          ancho=40),
+            Columna('ESTADO',       'estado',          ancho=12,
+                    transformar=_opciones(PermisoLicencia.ESTADO_CHOICES)),
+            Columna('APROBADO POR', 'aprobado_por_id', ancho=14, transformar=usuario),
+            Columna('N° OFICIO',    'numero_oficio',   ancho=14, transformar=_texto),
+        ],
+    )
+
+    hoja_sanciones = Reporte(
+        'UTEPPI — EXPEDIENTE: SANCIONES',
+        columnas=_columnas_persona(cat) + [
+            Columna('FECHA',     'fecha_sancion',    ancho=12, transformar=_fecha_texto),
+            Columna('SANCIÓN',   'tipo_sancion_id',  ancho=24, transformar=_resolver(cat['sancion'])),
+            Columna('DESDE',     'fecha_inicio',     ancho=12, transformar=_fecha_texto),
+            Columna('HASTA',     'fecha_fin',        ancho=12, transformar=_fecha_texto),
+            Columna('MOTIVO',    'motivo',           ancho=40),
+            Columna('ESTADO',    'estado',           ancho=12,
+                    transformar=_opciones(SancionAplicada.ESTADO_CHOICES)),
+            Columna('DOCUMENTO', 'documento_referencia', ancho=18, transformar=_texto),
+        ],
+    )
+
+    hoja_felicitaciones = Reporte(
+        'UTEPPI — EXPEDIENTE: FELICITACIONES',
+        columnas=_columnas_persona(cat) + [
+            Columna('FECHA',        'fecha_felicitacion',   ancho=12, transformar=_fecha_texto),
+            Columna('FELICITACIÓN', 'tipo_felicitacion_id', ancho=24,
+                    transformar=_resolver(cat['felicitacion'])),
+            Columna('MOTIVO',       'motivo',               ancho=40),
+            Columna('DOCUMENTO',    'documento_referencia', ancho=18, transformar=_texto),
+        ],
+    )
+
+    hoja_destinos = Reporte(
+        'UTEPPI — EXPEDIENTE: DESTINOS',
+        columnas=_columnas_persona(cat) + [
+            Columna('TIPO',        'tipo_destino',      ancho=20,
+                    transformar=_opciones(DestinoPolicial.TIPO_DESTINO_CHOICES)),
+            Columna('UNIDAD',      'unidad_destino_id', ancho=24, transformar=_resolver(cat['unidad'])),
+            Columna('LUGAR',       'lugar_destino',     ancho=24),
+            Columna('DESDE',       'fecha_inicio',      ancho=12, transformar=_fecha_texto),
+            Columna('HASTA',       'fecha_fin',         ancho=12, transformar=_fecha_texto),
+            Columna('ACTIVO',      'activo',            ancho=8,
+                    transformar=lambda v: 'Sí' if v else 'No'),
+            Columna('RESOLUCIÓN',  'numero_resolucion', ancho=18, transformar=_texto),
+        ],
+    )
+
+    return [
+        ('Personal', hoja_personal,
+         personal.order_by(*ORDEN_PERSONAL)),
+        ('Kardex', hoja_kardex,
+         KardexDigital.objects.filter(personal__in=ids).order_by(*orden, '-fecha_registro', '-pk')),
+        ('Permisos', hoja_permisos,
+         PermisoLicencia.objects.filter(personal__in=ids).order_by(*orden, '-fecha_inicio', '-pk')),
+        ('Sanciones', hoja_sanciones,
+         SancionAplicada.objects.filter(personal__in=ids).order_by(*orden, '-fecha_sancion', '-pk')),
+        ('Felicitaciones', hoja_felicitaciones,
+         FelicitacionAplicada.objects.filter(personal__in=ids).order_by(*orden, '-fecha_felicitacion', '-pk')),
+        ('Destinos', hoja_destinos,
+         DestinoPolicial.objects.filter(personal__in=ids).order_by(*orden, '-fecha_inicio', '-pk')),
+    ]
+
+
+# ================================================================
+# BITÁCORA
+# ================================================================
+
+def leer_fecha(valor):
+    """Fecha 'AAAA-MM-DD' de un parámetro GET; None si falta o no es válida."""
+    try:
+        return date.fromisoformat(valor or '')
+    except ValueError:
+        return None
+
+
+def _medianoche(valor, dias=0):
+    """Medianoche local de la fecha 'AAAA-MM-DD' más `dias`; None si no es válida."""
+    dia = leer_fecha(valor)
+    if dia is None:
+        return None
+    return timezone.make_aware(datetime.combine(dia + timedelta(days=dias), time.min))
+
+
+def filtrar_bitacora(params, por_relevancia=False):
+    """Bitácora con los filtros de la pantalla (GET o parámetros de un ExportJob)."""
+    qs = BitacoraLog.objects.select_related('usuario')
+
+    buscar = params.get('buscar', '').strip()
+    if buscar:
+        # Texto completo con índice GIN en PostgreSQL (ver reportes/busqueda_bitacora.py)
+        qs = filtrar_texto(qs, buscar, por_relevancia)
+    if params.get('accion'):
+        qs = qs.filter(accion=params['accion'])
+    if params.get('modulo'):
+        qs = qs.filter(modulo=params['modulo'])
+    if params.get('usuario'):
+        qs = qs.filter(usuario_id=params['usuario'])
+    # Rangos sobre la columna y no __date: así PostgreSQL usa el índice y lee
+    # solo las particiones mensuales de esas fechas
+    desde = _medianoche(params.get('fecha_desde'))
+    if desde:
+        qs = qs.filter(fecha_hora__gte=desde)
+    hasta = _medianoche(params.get('fecha_hasta'), dias=1)
+    if hasta:
+        qs = qs.filter(fecha_hora__lt=hasta)
+    return qs
+
+
+def resumen_bitacora(params):
+    """Resumen de actividad con los filtros de la bitácora, salvo el de texto."""
+    return resumen_actividad(
+        leer_fecha(params.get('fecha_desde')),
+        leer_fecha(params.get('fecha_hasta')),
+        accion=params.get('accion') or None,
+        modulo=params.get('modulo') or None,
+        usuario=params.get('usuario') or None,
+    )
+
+
+def _fecha_hora_local(valor):
+    return timezone.localtime(valor).strftime('%d/%m/%Y %H:%M:%S')
+
+
+# Etiquetas sin el emoji inicial: las fuentes estándar del PDF no tienen esos glifos
+_ACCIONES_PDF = [
+    (clave, texto.encode('cp1252', 'ignore').decode('cp1252').strip())
+    for clave, texto in BitacoraLog.ACCION_CHOICES
+]
+_COLOR_POR_ACCION = {
+    texto: COLORES_ACCION[clave]
+    for clave, texto in _ACCIONES_PDF if clave in COLORES_ACCION
+}
+
+def resumen_bitacora_pdf(resumen):
+    """Secciones de la página de resumen del PDF (ver reportes/actividad.py)."""
+    acciones = dict(_ACCIONES_PDF)
+    return [
+        ('POR ACCIÓN',  [(acciones.get(a, a), n) for a, _, n in resumen['por_accion']]),
+        ('POR MÓDULO',  [(etiqueta, n) for _, etiqueta, n in resumen['por_modulo']]),
+        ('POR USUARIO', [(nombre, n) for _, nombre, n in resumen['por_usuario']]),
+        ('POR DÍA',     [(d.strftime('%d/%m/%Y'), n) for d, _, n in resumen['por_dia']]),
+    ]
+
+
+REPORTE_BITACORA = Reporte(
+    'UTEPPI — BITÁCORA DEL SISTEMA',
+    columnas=[
+        Columna('FECHA Y HORA',    'fecha_hora',        ancho=21, transformar=_fecha_hora_local),
+        Columna('USUARIO',         'usuario__username', ancho=15,
+                transformar=lambda v: v or '—'),
+        Columna('ACCIÓN',          'accion_texto',      ancho=12,
+                resaltar=lambda v: _COLOR_POR_ACCION.get(v, colors.grey)),
+        Columna('MÓDULO',          'modulo_texto',      ancho=12),
+        Columna('DESCRIPCIÓN',     'descripcion',       ancho=48,
+                transformar=lambda v: v.replace('\n', ' ')),
+        Columna('OBJETO AFECTADO', 'objeto_repr',       ancho=24,
+                transformar=lambda v: v or '—'),
+        Columna('IP',              'ip_address',        ancho=15,
+                transformar=lambda v: v or '—'),
+    ],
+    anotaciones={
+        'accion_texto': etiqueta('accion', _ACCIONES_PDF),
+        'modulo_texto': etiqueta('modulo', BitacoraLog.MODULO_CHOICES),
+    },
+)
+
+REPORTE_BITACORA_TEXTO = Reporte(
+    'UTEPPI — BITÁCORA DEL SISTEMA',
+    columnas=[
+        Columna('FECHA Y HORA',    'fecha_hora', transformar=_fecha_hora_local),
+        Columna('USUARIO',         'usuario__username'),
+        Columna('ACCIÓN',          'accion'),
+        Columna('MÓDULO',          'modulo'),
+        Columna('DESCRIPCIÓN',     'descripcion'),
+        Columna('OBJETO AFECTADO', 'objeto_repr'),
+        Columna('IP',              'ip_address'),
+        Columna('CAMBIOS',         'cambios',
+                transformar=lambda v: json.dumps(v, ensure_ascii=False) if v else ''),
+    ],
+)
@@ -0,0 +1,140 @@
+"""
+Auditoría de consultas (VER) agregada por usuario, registro y hora.
+
+Las fichas de personal, el kardex y "Mi perfil" se consultan mucho más de lo
+que se editan; una fila de bitácora por visita sería la mayor parte de las
+escrituras. registrar_lectura() solo suma 1 en un contador en memoria del
+proceso con clave (hora, usuario, módulo, objeto). Cada
+BITACORA_LECTURAS_INTERVALO segundos un hilo del proceso vuelca el contador
+en LecturaAgregada con un solo INSERT ... ON CONFLICT DO UPDATE que suma los
+totales, haya o no requests nuevos; al terminar el proceso (atexit) se vacía
+lo que quede. Si el proceso muere sin aviso (SIGKILL, OOM) se pierde como
+mucho un intervalo de conteos.
+
+Los módulos de BITACORA_LECTURAS_COMPLETAS (p. ej. 'sanciones') registran cada
+consulta en la bitácora como una entrada VER normal.
+
+Uso:
+    from reportes.lecturas import registrar_lectura
+    registrar_lectura(request, 'personal', persona)
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import LecturaAgregada
+from .utils import registrar_log
+
+
+logger = logging.getLogger(__name__)
+
+LOTE_INSERT = 500
+
+
+class _Contador:
+
+    def __init__(self):
+        self.cerrojo  = threading.Lock()
+        self.conteos  = Counter()
+        self.nombres  = {}          # clave → str(objeto) de la última consulta
+        self.pid      = None
+        self.hilo     = None
+        self.detener  = threading.Event()
+
+    def sumar(self, clave, nombre):
+        with self.cerrojo:
+            if self.pid != os.getpid():
+                # Tras un fork los conteos del padre no son de este proceso
+                # y su hilo no existe en el hijo
+                self.conteos, self.nombres, self.pid = Counter(), {}, os.getpid()
+                self.hilo = None
+            if self.hilo is None or not self.hilo.is_alive():
+                self.detener.clear()
+                self.hilo = threading.Thread(target=self._bucle, name='lecturas-bitacora', daemon=True)
+                self.hilo.start()
+            self.conteos[clave] += 1
+            self.nombres[clave]  = nombre
+
+    def _bucle(self):
+        while not self.detener.wait(settings.BITACORA_LECTURAS_INTERVALO):
+            close_old_connections()
+            self.vaciar()
+
+    def tomar(self):
+        with self.cerrojo:
+            conteos, nombres = self.conteos, self.nombres
+            self.conteos, self.nombres = Counter(), {}
+        return conteos, nombres
+
+    def devolver(self, conteos, nombres):
+        with self.cerrojo:
+            self.conteos.update(conteos)
+            for clave, nombre in nombres.items():
+                self.nombres.setdefault(clave, nombre)
+
+    def vaciar(self):
+        if self.pid != os.getpid():
+            return
+        conteos, nombres = self.tomar()
+        if not conteos:
+            return
+        try:
+            with transaction.atomic():
+                _sumar(conteos, nombres)
+        except Exception:
+            # Se reintenta en el próximo volcado
+            logger.exception('No se pudieron guardar %d conteos de consultas', len(conteos))
+            self.devolver(conteos, nombres)
+
+
+    def cerrar(self, espera=5.0):
+        """Detiene el hilo y guarda lo pendiente."""
+        self.detener.set()
+        if self.hilo is not None and self.pid == os.getpid():
+            self.hilo.join(espera)
+        self.vaciar()
+
+
+def _sumar(conteos, nombres):
+    tabla = connection.ops.quote_name(LecturaAgregada._meta.db_table)
+    hora  = LecturaAgregada._meta.get_field('hora')
+    filas = [
+        ((hora.get_db_prep_value(clave[0], connection), *clave[1:]), total, nombres[clave][:300])
+        for clave, total in conteos.items()
+    ]
+    with connection.cursor() as cursor:
+        for i in range(0, len(filas), LOTE_INSERT):
+            lote = filas[i:i + LOTE_INSERT]
+            cursor.execute(
+                f'INSERT INTO {tabla} (hora, usuario_id, modulo, objeto_id, objeto_repr, total) '
+                f'VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(lote))} '
+                f'ON CONFLICT (hora, modulo, objeto_id, (COALESCE(usuario_id, 0))) '
+                f'DO UPDATE SET total = {tabla}.total + EXCLUDED.total, objeto_repr = EXCLUDED.objeto_repr',
+                [valor for clave, total, nombre in lote for valor in (*clave, nombre, total)],
+            )
+
+
+_contador = _Contador()
+atexit.register(_contador.cerrar)
+
+
+def registrar_lectura(request, modulo, objeto):
+    """Cuenta una consulta de `objeto` (ver módulo)."""
+    if modulo in settings.BITACORA_LECTURAS_COMPLETAS:
+        registrar_log(request, 'VER', modulo, f'Consultó: {objeto}', objeto=objeto)
+        return
+    usuario = request.user.pk if request.user.is_authenticated else None
+    hora    = timezone.now().replace(minute=0, second=0, microsecond=0)
+    _contador.sumar((hora, usuario, modulo, str(objeto.pk)), str(objeto))
+
+
+def vaciar():
+    """Guarda ya los conteos pendientes (comandos, pruebas)."""
+    _contador.vaciar()
@@ -0,0 +1,182 @@
+"""
+Límite de intentos de login fallidos por IP y por par (IP, usuario).
+
+Cada intento fallido suma en contadores del caché compartido (el de disco de
+settings.CACHES, o el local en memoria) por IP y por IP + nombre de usuario.
+Se usa una ventana deslizante aproximada: el contador de la ventana actual
+más la parte proporcional del de la anterior. Cuando alguno llega al máximo,
+el login rechaza el intento antes de validar el formulario, sin calcular el
+hash de la contraseña ni tocar la base de datos. Lo aplican custom_login y,
+con el decorador limitar_login, el login del admin (gestion_policial/urls.py).
+
+El segundo contador es por par y no solo por usuario: con un contador por
+usuario, cualquiera que conozca un nombre de usuario podría bloquear esa
+cuenta con LOGIN_MAX_FALLOS_USUARIO intentos. A cambio, quien reparte los
+intentos sobre una misma cuenta desde muchas IPs solo queda frenado por
+LOGIN_MAX_FALLOS_IP en cada una de ellas.
+
+En la bitácora no queda una fila por intento. Por ventana y por IP hay una
+sola fila de fallos: se guarda con el primero (de inmediato, para conocer su
+id) y cada fallo siguiente de la ventana le actualiza el total. Como el
+límite corta los fallos al llegar al máximo, son a lo sumo
+LOGIN_MAX_FALLOS_IP escrituras por ventana y el total queda completo aunque
+no haya más tráfico. Del bloqueo se registra solo el primer rechazo.
+
+La IP de los contadores es la de ip_cliente(): REMOTE_ADDR, que el cliente no
+puede elegir. X-Forwarded-For solo se usa cuando la conexión llega desde un
+proxy de PROXIES_CONFIABLES; si no, bastaría cambiar esa cabecera en cada
+intento para esquivar el límite por IP o para bloquear la IP de otro.
+
+Configuración en settings: LOGIN_VENTANA (segundos), LOGIN_MAX_FALLOS_IP,
+LOGIN_MAX_FALLOS_USUARIO (por par IP + usuario) y PROXIES_CONFIABLES.
+
+Uso:
+    ip = limite_login.ip_cliente(request)
+    if limite_login.bloqueado(ip, username):
+        limite_login.registrar_rechazo(ip, username)
+        ...
+    limite_login.registrar_fallo(ip, username)    # desde user_login_failed
+
+    admin.site.login = limite_login.limitar_login(admin.site.login)
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .escritor_bitacora import guardar
+from .models import BitacoraLog
+from .utils import auditar
+
+
+def ip_cliente(request):
+    """
+    IP desde la que se conecta el cliente. Detrás de proxies confiables, la
+    última dirección de X-Forwarded-For que no es de uno de ellos (las
+    anteriores las escribe el cliente).
+    """
+    remota = request.META.get('REMOTE_ADDR')
+    if remota not in settings.PROXIES_CONFIABLES:
+        return remota
+    saltos = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    for ip in reversed(saltos):
+        if ip not in settings.PROXIES_CONFIABLES:
+            return ip
+    return remota
+
+
+def _ventana():
+    return settings.LOGIN_VENTANA
+
+
+def _limites(ip, username):
+    """(tipo, valor, máximo) de los contadores que aplican al intento."""
+    usuario = (username or '').lower()
+    limites = [
+        ('ip',         ip,                                       settings.LOGIN_MAX_FALLOS_IP),
+        ('ip_usuario', f'{ip or ""}|{usuario}' if usuario else '', settings.LOGIN_MAX_FALLOS_USUARIO),
+    ]
+    return [(tipo, valor, maximo) for tipo, valor, maximo in limites if valor]
+
+
+def _clave(contador, tipo, valor, numero):
+    # El username lo escribe quien intenta entrar: se resume para que la clave sea segura
+    resumen = hashlib.sha256(valor.encode()).hexdigest()[:20]
+    return f'login:{contador}:{tipo}:{resumen}:{numero}'
+
+
+def _sumar(contador, tipo, valor, ahora):
+    """Suma 1 en la ventana actual y devuelve el nuevo valor."""
+    clave = _clave(contador, tipo, valor, int(ahora // _ventana()))
+    cache.add(clave, 0, timeout=2 * _ventana())
+    try:
+        return cache.incr(clave)
+    except ValueError:          # expiró entre add e incr
+        cache.set(clave, 1, timeout=2 * _ventana())
+        return 1
+
+
+def fallos_recientes(tipo, valor, ahora=None):
+    """Fallos estimados en los últimos LOGIN_VENTANA segundos."""
+    ahora    = time.time() if ahora is None else ahora
+    numero   = int(ahora // _ventana())
+    claves   = [_clave('fallos', tipo, valor, numero), _clave('fallos', tipo, valor, numero - 1)]
+    valores  = cache.get_many(claves)
+    fraccion = (ahora % _ventana()) / _ventana()
+    return valores.get(claves[0], 0) + valores.get(claves[1], 0) * (1 - fraccion)
+
+
+def bloqueado(ip, username, ahora=None):
+    return any(
+        fallos_recientes(tipo, valor, ahora) >= maximo
+        for tipo, valor, maximo in _limites(ip, username)
+    )
+
+
+def _descripcion_fallos(n, username):
+    if n == 1:
+        return f'Intento de login fallido — usuario: {username or "desconocido"}'
+    return (
+        f'Intentos de login fallidos: {n} en la ventana de {_ventana() // 60} min '
+        f'— último usuario: {username or "desconocido"}'
+    )
+
+
+def registrar_fallo(ip, username, ahora=None):
+    """Cuenta un login fallido en la fila de bitácora de su ventana (ver módulo)."""
+    ahora = time.time() if ahora is None else ahora
+    contadores = [(tipo, valor, _sumar('fallos', tipo, valor, ahora)) for tipo, valor, _ in _limites(ip, username)]
+    if not contadores:
+        return
+    tipo, valor, n = contadores[0]      # por IP; sin IP, por usuario
+    clave = _clave('fila', tipo, valor, int(ahora // _ventana()))
+    if n == 1:
+        registro = guardar(
+            accion='ERROR', modulo='sistema', descripcion=_descripcion_fallos(n, username), ip_address=ip,
+        )
+        cache.set(clave, registro.pk, timeout=2 * _ventana())
+        return
+    pk = cache.get(clave)
+    if pk is not None:
+        # Total del contador, no +1: si un UPDATE se pierde, el siguiente lo corrige
+        BitacoraLog.objects.filter(pk=pk).update(descripcion=_descripcion_fallos(n, username))
+
+
+def registrar_rechazo(ip, username, ahora=None):
+    """Cuenta un intento rechazado; solo el primero de la ventana llega a la bitácora."""
+    ahora = time.time() if ahora is None else ahora
+    limites = _limites(ip, username)
+    if not limites:
+        return
+    tipo, valor, _ = limites[0]
+    if _sumar('rechazos', tipo, valor, ahora) == 1:
+        auditar(
+            'ERROR', 'sistema',
+            f'Login bloqueado por exceso de intentos fallidos — usuario: {username or "desconocido"} '
+            f'(pausa de hasta {_ventana() // 60} min)',
+            ip=ip,
+        )
+
+
+def limitar_login(vista):
+    """
+    Decorador para vistas de login que no son custom_login (el admin): con
+    demasiados fallos recientes responde 429 sin autenticar.
+    """
+    @wraps(vista)
+    def envuelta(request, *args, **kwargs):
+        if request.method == 'POST':
+            ip       = ip_cliente(request)
+            username = request.POST.get('username')
+            if bloqueado(ip, username):
+                registrar_rechazo(ip, username)
+                return HttpResponse(
+                    '⛔ Demasiados intentos fallidos. Espere unos minutos e intente de nuevo.',
+                    content_type='text/plain; charset=utf-8', status=429,
+                )
+        return vista(request, *args, **kwargs)
+    return envuelta
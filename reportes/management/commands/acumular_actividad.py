@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reportes.actividad import recalcular
+from reportes.archivo_bitacora import particiones, primer_registro
+from reportes.particiones_bitacora import siguiente_mes
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha no válida: {valor} (use AAAA-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde la bitácora los conteos de actividad diaria de los resúmenes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde', type=_fecha, metavar='AAAA-MM-DD',
+            help='Primer día (por defecto, el del primer registro que sigue en la base de datos).',
+        )
+        parser.add_argument(
+            '--hasta', type=_fecha, metavar='AAAA-MM-DD',
+            help='Último día (por defecto, hoy).',
+        )
+
+    def handle(self, *args, **options):
+        # Por defecto no se toca lo anterior al primer registro: esos días ya
+        # se depuraron de la bitácora y sus conteos no se pueden rehacer
+        desde = options['desde'] or primer_registro()
+        hasta = options['hasta'] or timezone.localdate()
+        if desde is None:
+            self.stdout.write('✔️ La bitácora está vacía')
+            return
+        if desde > hasta:
+            raise CommandError('--desde es posterior a --hasta')
+
+        # Un mes por transacción
+        filas = 0
+        for mes in particiones('mes', desde, hasta):
+            fin = min(siguiente_mes(mes) - timedelta(days=1), hasta)
+            n = recalcular(max(mes, desde), fin)
+            filas += n
+            self.stdout.write(f'   📊 {mes:%Y-%m}: {n} fila(s) de resumen')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Actividad recalculada del {desde:%d/%m/%Y} al {hasta:%d/%m/%Y} ({filas} filas)'
+        ))
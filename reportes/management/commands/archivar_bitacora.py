@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.archivo_bitacora import GRANULARIDADES, archivar, verificar
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha no válida: {valor} (use AAAA-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Archiva la bitácora en JSONL comprimido (gzip), un archivo por día o por mes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--granularidad', choices=GRANULARIDADES, default='dia',
+            help='Un archivo por día o por mes (por defecto dia).',
+        )
+        parser.add_argument(
+            '--desde', type=_fecha, metavar='AAAA-MM-DD',
+            help='Primer día a archivar (por defecto, el del primer registro).',
+        )
+        parser.add_argument(
+            '--hasta', type=_fecha, metavar='AAAA-MM-DD',
+            help='Último día a archivar (por defecto, la última partición cerrada).',
+        )
+        parser.add_argument(
+            '--rehacer', action='store_true',
+            help='Vuelve a escribir también las particiones ya archivadas.',
+        )
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Solo comprueba los checksums del manifiesto.',
+        )
+
+    def handle(self, *args, **options):
+        granularidad = options['granularidad']
+
+        if options['verificar']:
+            erroneas = verificar(granularidad)
+            if erroneas:
+                raise CommandError(f'❌ Checksum distinto o archivo faltante: {", ".join(erroneas)}')
+            self.stdout.write(self.style.SUCCESS('✅ Todos los archivos coinciden con el manifiesto'))
+            return
+
+        def aviso(nombre, entrada):
+            self.stdout.write(f'   📦 {nombre}: {entrada["filas"]} filas, {entrada["bytes"]} bytes')
+
+        escritas = archivar(
+            granularidad,
+            desde=options['desde'],
+            hasta=options['hasta'],
+            rehacer=options['rehacer'],
+            aviso=aviso,
+        )
+        if escritas:
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(escritas)} partición(es) archivada(s)'))
+        else:
+            self.stdout.write('✔️ Sin particiones pendientes')
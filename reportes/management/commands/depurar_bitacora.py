@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.retencion_bitacora import (
+    LOTE_BORRADO, ArchivoIncompleto, depurar, fecha_corte, meses_retencion, vencidos,
+)
+
+
+class Command(BaseCommand):
+    help = 'Archiva y elimina de la base de datos la bitácora anterior al período de retención.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses', type=int, default=None,
+            help='Meses a conservar además del actual (por defecto SistemaConfig.retencion_bitacora_meses).',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=LOTE_BORRADO,
+            help=f'Filas por DELETE (por defecto {LOTE_BORRADO}).',
+        )
+        parser.add_argument(
+            '--pausa', type=float, default=0,
+            help='Segundos de espera entre lotes.',
+        )
+        parser.add_argument(
+            '--simular', action='store_true',
+            help='Solo informa el corte y cuántos registros se eliminarían.',
+        )
+
+    def handle(self, *args, **options):
+        meses = meses_retencion() if options['meses'] is None else options['meses']
+        if meses < 1:
+            self.stdout.write('✔️ Sin límite de retención (retencion_bitacora_meses = 0)')
+            return
+
+        corte = fecha_corte(meses)
+        self.stdout.write(f'🗓️ Se conserva desde el {corte:%d/%m/%Y} ({meses} mes(es) más el actual)')
+        if options['simular']:
+            self.stdout.write(f'   🔎 {vencidos(corte).count()} registro(s) se archivarían y eliminarían')
+            return
+
+        def aviso(nombre, detalle):
+            if isinstance(detalle, dict):
+                self.stdout.write(f'   📦 {nombre}: {detalle["filas"]} filas archivadas')
+            else:
+                self.stdout.write(f'   🗑️ {nombre}: {detalle}')
+
+        def progreso(borradas):
+            if borradas % (options['lote'] * 50) == 0:
+                self.stdout.write(f'   ✂️ {borradas} fila(s) borradas')
+
+        try:
+            resultado = depurar(meses, options['lote'], options['pausa'], aviso, progreso)
+        except ArchivoIncompleto as e:
+            raise CommandError(f'❌ {e}. No se eliminó nada.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(resultado["meses"])} mes(es) archivado(s), '
+            f'{len(resultado["particiones"])} partición(es) y {resultado["filas"]} fila(s) eliminadas, '
+            f'{resultado["lecturas"]} conteo(s) de consultas depurados'
+        ))
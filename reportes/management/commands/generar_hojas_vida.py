@@ -0,0 +1,50 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.hojas_vida import numero_procesos, zip_hojas_vida
+from reportes.informes import queryset_personal
+
+
+class Command(BaseCommand):
+    help = 'Genera en paralelo las hojas de vida en PDF del personal filtrado y las guarda en un ZIP.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', required=True, help='Ruta del archivo ZIP a escribir.')
+        parser.add_argument('--unidad', help='ID de la unidad.')
+        parser.add_argument('--grado',  help='ID del grado.')
+        parser.add_argument('--estado', help='ID del estado actual.')
+        parser.add_argument('--genero', choices=('M', 'F'))
+        parser.add_argument('--buscar', help='Nombre, apellido o C. I.')
+        parser.add_argument(
+            '--procesos', type=int, default=None,
+            help='Procesos del pool (por defecto, todos los núcleos).',
+        )
+
+    def handle(self, *args, **options):
+        params = {
+            clave: options[clave]
+            for clave in ('unidad', 'grado', 'estado', 'genero', 'buscar')
+            if options[clave]
+        }
+        qs    = queryset_personal(params)
+        total = qs.count()
+        if not total:
+            raise CommandError('No hay personal con esos filtros.')
+
+        procesos = numero_procesos(options['procesos'] or os.cpu_count())
+        self.stdout.write(f'🚀 {total} hoja(s) de vida con {procesos} proceso(s)')
+        inicio = time.monotonic()
+
+        def progreso(n):
+            if n % 100 == 0 or n == total:
+                self.stdout.write(f'   📄 {n}/{total}')
+
+        with open(options['salida'], 'wb') as salida:
+            for bloque in zip_hojas_vida(qs, procesos, progreso):
+                salida.write(bloque)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {options["salida"]} generado en {time.monotonic() - inicio:.1f} s'
+        ))
@@ -0,0 +1,83 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.particiones_bitacora import (
+    MESES_ADELANTE, DEFAULT, ParticionesNoDisponibles,
+    acopladas, asegurar_particiones, comprobar, desacopladas, filas_aproximadas, quitar_antes,
+)
+
+
+def _mes(valor):
+    try:
+        return date.fromisoformat(f'{valor}-01')
+    except ValueError:
+        raise CommandError(f'Mes no válido: {valor} (use AAAA-MM)')
+
+
+class Command(BaseCommand):
+    help = 'Crea por adelantado las particiones mensuales de la bitácora y quita las viejas (PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses-adelante', type=int, default=MESES_ADELANTE,
+            help=f'Meses futuros a crear además del actual (por defecto {MESES_ADELANTE}).',
+        )
+        quitar = parser.add_mutually_exclusive_group()
+        quitar.add_argument(
+            '--desacoplar-antes', type=_mes, metavar='AAAA-MM',
+            help='Desacopla (DETACH) las particiones de los meses anteriores; las tablas quedan.',
+        )
+        quitar.add_argument(
+            '--eliminar-antes', type=_mes, metavar='AAAA-MM',
+            help='Desacopla y elimina (DROP) las particiones de los meses anteriores.',
+        )
+        parser.add_argument(
+            '--sin-archivo', action='store_true',
+            help='Quita también meses que no estén en el archivo de archivar_bitacora.',
+        )
+        parser.add_argument(
+            '--listar', action='store_true',
+            help='Solo muestra las particiones y sus filas aproximadas.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['listar']:
+                self._listar()
+                return
+
+            creadas = asegurar_particiones(options['meses_adelante'])
+            for nombre in creadas:
+                self.stdout.write(f'   🆕 {nombre}')
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(creadas)} partición(es) creada(s)'))
+
+            limite = options['eliminar_antes'] or options['desacoplar_antes']
+            if limite:
+                self._quitar(limite, eliminar=bool(options['eliminar_antes']),
+                             exigir_archivo=not options['sin_archivo'])
+        except ParticionesNoDisponibles as e:
+            raise CommandError(f'❌ {e}')
+
+        filas_default = filas_aproximadas(DEFAULT)
+        if filas_default > 0:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ {DEFAULT} tiene ~{filas_default} fila(s): cree las particiones de esos meses.'
+            ))
+
+    def _quitar(self, limite, eliminar, exigir_archivo):
+        iconos = {'desacoplada': '📤', 'eliminada': '🗑️', 'sin archivar': '⏭️'}
+
+        def aviso(nombre, accion):
+            self.stdout.write(f'   {iconos[accion]} {nombre}: {accion}')
+
+        afectadas = quitar_antes(limite, eliminar=eliminar, exigir_archivo=exigir_archivo, aviso=aviso)
+        verbo = 'eliminada(s)' if eliminar else 'desacoplada(s)'
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(afectadas)} partición(es) {verbo}'))
+
+    def _listar(self):
+        comprobar()
+        for nombre in acopladas():
+            self.stdout.write(f'   📁 {nombre}: ~{filas_aproximadas(nombre)} fila(s)')
+        for nombre in desacopladas():
+            self.stdout.write(f'   📤 {nombre}: desacoplada, ~{filas_aproximadas(nombre)} fila(s)')
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reportes.exportaciones import tomar_siguiente, ejecutar, liberar_atascados
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de exportaciones (Excel/PDF) fuera de los workers web.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Procesa los trabajos pendientes y termina (útil para cron).',
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=2.0,
+            help='Segundos de espera cuando la cola está vacía (por defecto 2).',
+        )
+        parser.add_argument(
+            '--liberar-atascados', type=int, default=60, metavar='MINUTOS',
+            help='Reencola trabajos que llevan más de N minutos en proceso (por defecto 60).',
+        )
+
+    def handle(self, *args, **options):
+        liberados = liberar_atascados(options['liberar_atascados'])
+        if liberados:
+            self.stdout.write(f'♻️ {liberados} trabajo(s) atascado(s) devuelto(s) a la cola')
+
+        self.stdout.write('🚀 Worker de exportaciones iniciado')
+        try:
+            while True:
+                job = tomar_siguiente()
+                if job is None:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                self.stdout.write(f'⚙️ Procesando #{job.pk} — {job.get_tipo_display()}')
+                job = ejecutar(job)
+                if job.estado == 'completado':
+                    self.stdout.write(f'   ✅ {job.filas_total} filas → {job.archivo.name}')
+                else:
+                    self.stdout.write(self.style.ERROR(f'   ❌ {job.error}'))
+        except KeyboardInterrupt:
+            self.stdout.write('👋 Worker detenido')
@@ -0,0 +1,20 @@
+from .utils import ContextoBitacora, contexto_bitacora
+
+
+class BitacoraMiddleware:
+    """
+    Junta las entradas de bitácora del request y las guarda con un solo
+    INSERT al terminar (ver reportes/utils.py). Debe ir después de
+    AuthenticationMiddleware para conocer al usuario.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        ctx   = ContextoBitacora(request)
+        token = contexto_bitacora.set(ctx)
+        try:
+            return self.get_response(request)
+        finally:
+            contexto_bitacora.reset(token)
+            ctx.cerrar()
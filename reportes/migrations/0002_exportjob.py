@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('personal_excel', 'Reporte de personal (Excel)'), ('bitacora_pdf', 'Bitácora (PDF)')], max_length=30, verbose_name='Tipo')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Filtros')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('completado', 'Completado'), ('error', 'Error')], default='pendiente', max_length=15, verbose_name='Estado')),
+                ('filas_total', models.PositiveIntegerField(default=0, verbose_name='Filas totales')),
+                ('filas_procesadas', models.PositiveIntegerField(default=0, verbose_name='Filas procesadas')),
+                ('archivo', models.FileField(blank=True, null=True, upload_to='exportaciones/%Y/%m/', verbose_name='Archivo')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Detalle del error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de solicitud')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Inicio de proceso')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fin de proceso')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exportaciones', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Exportación',
+                'verbose_name_plural': 'Exportaciones',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'fecha_creacion'], name='reportes_ex_estado_057dab_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0002_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='tipo',
+            field=models.CharField(choices=[('personal_excel', 'Reporte de personal (Excel)'), ('expediente_excel', 'Expediente consolidado de personal (Excel)'), ('bitacora_pdf', 'Bitácora (PDF)')], max_length=30, verbose_name='Tipo'),
+        ),
+    ]
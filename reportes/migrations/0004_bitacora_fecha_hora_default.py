@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0003_exportjob_expediente'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bitacoralog',
+            name='fecha_hora',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Fecha y hora'),
+        ),
+    ]
@@ -0,0 +1,160 @@
+"""
+Convierte reportes_bitacoralog en una tabla particionada por mes (PostgreSQL).
+
+En PostgreSQL:
+    1. La tabla actual se renombra y se crea la particionada con las mismas
+       columnas y clave primaria (id, fecha_hora).
+    2. Se crean las particiones mensuales desde el primer registro hasta tres
+       meses adelante, más la DEFAULT, y se copian las filas.
+    3. La secuencia de id continúa donde quedó y los índices y claves
+       foráneas se recrean con sus nombres originales.
+
+En otros motores solo se agrega el índice sobre fecha_hora.
+
+No importa reportes.particiones_bitacora a propósito: la migración debe seguir
+haciendo lo mismo aunque el módulo cambie. Los nombres deben coincidir.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+TABLA          = 'reportes_bitacoralog'
+ANTIGUA        = 'reportes_bitacoralog_antigua'
+SECUENCIA      = 'reportes_bitacoralog_id_seq'
+MESES_ADELANTE = 3
+
+
+def _siguiente_mes(inicio):
+    return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _limite(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min)).isoformat()
+
+
+def _definiciones(cursor, tabla):
+    """SQL para recrear los índices (salvo la PK) y claves foráneas de `tabla`."""
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_indexdef(x.indexrelid)
+          FROM pg_index x JOIN pg_class c ON c.oid = x.indexrelid
+         WHERE x.indrelid = %s::regclass AND NOT x.indisprimary
+        """,
+        [tabla],
+    )
+    indices = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [tabla],
+    )
+    claves = cursor.fetchall()
+    return (
+        [nombre for nombre, _ in indices],
+        # ON ONLY aparece en los índices de una tabla particionada
+        [definicion.replace(' ON ONLY ', ' ON ') for _, definicion in indices]
+        + [f'ALTER TABLE {TABLA} ADD CONSTRAINT "{nombre}" {definicion}' for nombre, definicion in claves],
+    )
+
+
+def _apartar(schema_editor, cursor):
+    """Renombra TABLA a ANTIGUA y libera los nombres de sus índices y su PK."""
+    indices, recrear = _definiciones(cursor, TABLA)
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+        [TABLA],
+    )
+    pk = cursor.fetchone()[0]
+
+    schema_editor.execute(f'ALTER TABLE {TABLA} RENAME TO {ANTIGUA}')
+    schema_editor.execute(f'ALTER TABLE {ANTIGUA} RENAME CONSTRAINT "{pk}" TO "{ANTIGUA}_pkey"')
+    for nombre in indices:
+        schema_editor.execute(f'DROP INDEX "{nombre}"')
+    return recrear
+
+
+def particionar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        recrear = _apartar(schema_editor, cursor)
+
+        # La identidad de la columna no se puede llevar a una tabla particionada
+        # (antes de PostgreSQL 17): se reemplaza por una secuencia propia.
+        schema_editor.execute(f'ALTER TABLE {ANTIGUA} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [ANTIGUA])
+        serial = cursor.fetchone()[0]
+        if serial:
+            schema_editor.execute(f'ALTER TABLE {ANTIGUA} ALTER COLUMN id DROP DEFAULT')
+            schema_editor.execute(f'DROP SEQUENCE {serial}')
+
+        schema_editor.execute(
+            f'CREATE TABLE {TABLA} (LIKE {ANTIGUA}, PRIMARY KEY (id, fecha_hora)) '
+            f'PARTITION BY RANGE (fecha_hora)'
+        )
+        schema_editor.execute(f'CREATE SEQUENCE {SECUENCIA} AS bigint OWNED BY {TABLA}.id')
+        schema_editor.execute(f"ALTER TABLE {TABLA} ALTER COLUMN id SET DEFAULT nextval('{SECUENCIA}')")
+
+        cursor.execute(f'SELECT min(fecha_hora) FROM {ANTIGUA}')
+        primera = cursor.fetchone()[0]
+        hoy     = timezone.localdate()
+        inicio  = (timezone.localtime(primera).date() if primera else hoy).replace(day=1)
+        fin     = hoy.replace(day=1)
+        for _ in range(MESES_ADELANTE):
+            fin = _siguiente_mes(fin)
+        while inicio <= fin:
+            siguiente = _siguiente_mes(inicio)
+            schema_editor.execute(
+                f'CREATE TABLE {TABLA}_p{inicio:%Y_%m} PARTITION OF {TABLA} '
+                f"FOR VALUES FROM ('{_limite(inicio)}') TO ('{_limite(siguiente)}')"
+            )
+            inicio = siguiente
+        schema_editor.execute(f'CREATE TABLE {TABLA}_default PARTITION OF {TABLA} DEFAULT')
+
+        schema_editor.execute(f'INSERT INTO {TABLA} SELECT * FROM {ANTIGUA}')
+        schema_editor.execute(
+            f"SELECT setval('{SECUENCIA}', COALESCE((SELECT max(id) FROM {TABLA}), 0) + 1, false)"
+        )
+        schema_editor.execute(f'DROP TABLE {ANTIGUA}')
+        for sql in recrear:
+            schema_editor.execute(sql)
+
+
+def desparticionar(apps, schema_editor):
+    """Vuelve a una tabla simple con las filas de las particiones acopladas."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        recrear = _apartar(schema_editor, cursor)
+
+        schema_editor.execute(f'CREATE TABLE {TABLA} (LIKE {ANTIGUA})')
+        schema_editor.execute(f'INSERT INTO {TABLA} SELECT * FROM {ANTIGUA}')
+        schema_editor.execute(f'DROP TABLE {ANTIGUA}')     # con sus particiones y la secuencia
+        schema_editor.execute(f'ALTER TABLE {TABLA} ADD CONSTRAINT "{TABLA}_pkey" PRIMARY KEY (id)')
+        schema_editor.execute(f'ALTER TABLE {TABLA} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        schema_editor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLA}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {TABLA}), 0) + 1, false)"
+        )
+        for sql in recrear:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0004_bitacora_fecha_hora_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(particionar, desparticionar),
+        migrations.AddIndex(
+            model_name='bitacoralog',
+            index=models.Index(fields=['fecha_hora'], name='bitacora_fecha_hora_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:59
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0005_bitacora_particionada'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActividadDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Día')),
+                ('modulo', models.CharField(choices=[('personal', 'Personal'), ('destinos', 'Destinos'), ('catalogos', 'Catálogos'), ('permisos', 'Permisos'), ('sanciones', 'Sanciones'), ('felicitaciones', 'Felicitaciones'), ('kardex', 'Kardex'), ('usuarios', 'Usuarios'), ('reportes', 'Reportes'), ('sistema', 'Sistema')], max_length=30, verbose_name='Módulo')),
+                ('accion', models.CharField(choices=[('LOGIN', '🔐 Inicio de sesión'), ('LOGOUT', '🚪 Cierre de sesión'), ('CREAR', '➕ Crear'), ('EDITAR', '✏️ Editar'), ('ELIMINAR', '🗑️ Eliminar'), ('VER', '👁️ Ver'), ('ERROR', '❌ Error'), ('OTRO', '⚙️ Otro')], max_length=20, verbose_name='Acción')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Registros')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Actividad diaria',
+                'verbose_name_plural': 'Actividad diaria',
+                'constraints': [models.UniqueConstraint(models.F('dia'), models.F('modulo'), models.F('accion'), django.db.models.functions.comparison.Coalesce(models.F('usuario'), models.Value(0)), name='actividad_diaria_unica')],
+            },
+        ),
+    ]
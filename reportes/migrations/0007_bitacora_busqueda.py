@@ -0,0 +1,63 @@
+"""
+Búsqueda de texto completo en la bitácora (solo PostgreSQL).
+
+    - Configuración de búsqueda es_unaccent: la de español con unaccent antes
+      del stemming, así "sanción", "sancion" y "sanciones" coinciden.
+    - Columna generada `busqueda` (tsvector de descripción y objeto afectado),
+      que PostgreSQL calcula en cada INSERT. El modelo no la declara.
+    - Índice GIN sobre esa columna; en la tabla particionada se crea uno por
+      partición.
+
+En otros motores no hace nada (ver reportes/busqueda_bitacora.py).
+"""
+
+from django.db import migrations
+
+
+TABLA         = 'reportes_bitacoralog'
+CONFIGURACION = 'es_unaccent'
+
+SQL = [
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    f"""
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIGURACION}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {CONFIGURACION} (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION {CONFIGURACION}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END $$
+    """,
+    f"""
+    ALTER TABLE {TABLA} ADD COLUMN busqueda tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{CONFIGURACION}', coalesce(descripcion, '')), 'A') ||
+        setweight(to_tsvector('{CONFIGURACION}', coalesce(objeto_repr, '')), 'B')
+    ) STORED
+    """,
+    f'CREATE INDEX bitacora_busqueda_gin ON {TABLA} USING gin (busqueda)',
+]
+
+SQL_REVERSO = [
+    'DROP INDEX IF EXISTS bitacora_busqueda_gin',
+    f'ALTER TABLE {TABLA} DROP COLUMN IF EXISTS busqueda',
+]
+
+
+def _ejecutar(sentencias):
+    def operacion(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0006_actividaddiaria'),
+    ]
+
+    operations = [
+        migrations.RunPython(_ejecutar(SQL), _ejecutar(SQL_REVERSO)),
+    ]
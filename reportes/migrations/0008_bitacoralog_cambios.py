@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0007_bitacora_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bitacoralog',
+            name='cambios',
+            field=models.JSONField(blank=True, null=True, verbose_name='Cambios'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:14
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0008_bitacoralog_cambios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LecturaAgregada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hora', models.DateTimeField(verbose_name='Hora')),
+                ('modulo', models.CharField(choices=[('personal', 'Personal'), ('destinos', 'Destinos'), ('catalogos', 'Catálogos'), ('permisos', 'Permisos'), ('sanciones', 'Sanciones'), ('felicitaciones', 'Felicitaciones'), ('kardex', 'Kardex'), ('usuarios', 'Usuarios'), ('reportes', 'Reportes'), ('sistema', 'Sistema')], max_length=30, verbose_name='Módulo')),
+                ('objeto_id', models.CharField(max_length=50, verbose_name='ID del objeto')),
+                ('objeto_repr', models.CharField(blank=True, max_length=300, verbose_name='Objeto consultado')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Consultas')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Lectura agregada',
+                'verbose_name_plural': 'Lecturas agregadas',
+                'indexes': [models.Index(fields=['modulo', 'objeto_id'], name='lectura_objeto_idx')],
+                'constraints': [models.UniqueConstraint(models.F('hora'), models.F('modulo'), models.F('objeto_id'), django.db.models.functions.comparison.Coalesce(models.F('usuario'), models.Value(0)), name='lectura_agregada_unica')],
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 
 
 class BitacoraLog(models.Model):
@@ -41,12 +44,17 @@ class BitacoraLog(models.Model):
     objeto_id   = models.CharField(max_length=50, blank=True, null=True, verbose_name='ID del objeto')
     objeto_repr = models.CharField(max_length=300, blank=True, null=True, verbose_name='Objeto afectado')
     ip_address  = models.GenericIPAddressField(blank=True, null=True, verbose_name='Dirección IP')
-    fecha_hora  = models.DateTimeField(auto_now_add=True, verbose_name='Fecha y hora')
+    # {campo: [antes, después]} de los campos que cambiaron (ver BitacoraMixin)
+    cambios     = models.JSONField(blank=True, null=True, verbose_name='Cambios')
+    # default en lugar de auto_now_add: el escritor diferido conserva la hora del evento
+    fecha_hora  = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Fecha y hora')
 
     class Meta:
         verbose_name        = 'Log de bitácora'
         verbose_name_plural = 'Bitácora / Logs'
         ordering            = ['-fecha_hora']
+        # En PostgreSQL la tabla está particionada por mes (ver reportes/particiones_bitacora.py)
+        indexes             = [models.Index(fields=['fecha_hora'], name='bitacora_fecha_hora_idx')]
 
     def __str__(self):
         usuario = self.usuario.username if self.usuario else 'Sistema'
@@ -64,4 +72,149 @@ class BitacoraLog(models.Model):
             'ERROR':    'dark',
             'OTRO':     'light',
         }
-        return colores.get(self.accion, 'secondary')
\ No newline at end of file
+        return colores.get(self.accion, 'secondary')
+
+class ActividadDiaria(models.Model):
+    """
+    Registros de bitácora por día (hora local), módulo, acción y usuario.
+
+    Se incrementa cada vez que se guarda bitácora (ver reportes/actividad.py) y
+    se recalcula con `acumular_actividad`. No se depura junto con la bitácora:
+    los resúmenes siguen cubriendo los meses ya archivados.
+    """
+
+    dia     = models.DateField(verbose_name='Día')
+    modulo  = models.CharField(max_length=30, choices=BitacoraLog.MODULO_CHOICES, verbose_name='Módulo')
+    accion  = models.CharField(max_length=20, choices=BitacoraLog.ACCION_CHOICES, verbose_name='Acción')
+    # Sin restricción de clave foránea: si se elimina el usuario, sus conteos se conservan
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True, blank=True,
+        related_name='+',
+        verbose_name='Usuario'
+    )
+    total   = models.PositiveIntegerField(default=0, verbose_name='Registros')
+
+    class Meta:
+        verbose_name        = 'Actividad diaria'
+        verbose_name_plural = 'Actividad diaria'
+        constraints         = [
+            # COALESCE: las entradas sin usuario también caen en una sola fila por día
+            models.UniqueConstraint(
+                F('dia'), F('modulo'), F('accion'), Coalesce(F('usuario'), Value(0)),
+                name='actividad_diaria_unica',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dia:%d/%m/%Y} {self.modulo} {self.accion}: {self.total}"
+
+
+class LecturaAgregada(models.Model):
+    """
+    Consultas de un registro por usuario y hora (evento VER agregado).
+
+    Las vistas de consulta no escriben una fila de bitácora por visita: las
+    cuentan en memoria y las suman aquí cada cierto tiempo (ver
+    reportes/lecturas.py). Los módulos de BITACORA_LECTURAS_COMPLETAS sí
+    registran cada consulta en la bitácora.
+    """
+
+    hora        = models.DateTimeField(verbose_name='Hora')
+    usuario     = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True, blank=True,
+        related_name='+',
+        verbose_name='Usuario'
+    )
+    modulo      = models.CharField(max_length=30, choices=BitacoraLog.MODULO_CHOICES, verbose_name='Módulo')
+    objeto_id   = models.CharField(max_length=50, verbose_name='ID del objeto')
+    objeto_repr = models.CharField(max_length=300, blank=True, verbose_name='Objeto consultado')
+    total       = models.PositiveIntegerField(default=0, verbose_name='Consultas')
+
+    class Meta:
+        verbose_name        = 'Lectura agregada'
+        verbose_name_plural = 'Lecturas agregadas'
+        indexes             = [models.Index(fields=['modulo', 'objeto_id'], name='lectura_objeto_idx')]
+        constraints         = [
+            models.UniqueConstraint(
+                F('hora'), F('modulo'), F('objeto_id'), Coalesce(F('usuario'), Value(0)),
+                name='lectura_agregada_unica',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.hora:%d/%m/%Y %H:00} {self.modulo} #{self.objeto_id}: {self.total}"
+
+
+class ExportJob(models.Model):
+    """
+    Exportación pesada que se genera fuera del request.
+
+    La vista solo encola el trabajo con los filtros del GET; el comando
+    `procesar_exportaciones` lo toma de la base de datos, genera el archivo
+    y lo deja en `archivo` para descargarlo cuando esté listo.
+    """
+
+    TIPO_CHOICES = [
+        ('personal_excel',   'Reporte de personal (Excel)'),
+        ('expediente_excel', 'Expediente consolidado de personal (Excel)'),
+        ('bitacora_pdf',     'Bitácora (PDF)'),
+    ]
+
+    ESTADO_CHOICES = [
+        ('pendiente',  'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completado', 'Completado'),
+        ('error',      'Error'),
+    ]
+
+    usuario          = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='exportaciones',
+        verbose_name='Solicitado por'
+    )
+    tipo             = models.CharField(max_length=30, choices=TIPO_CHOICES, verbose_name='Tipo')
+    parametros       = models.JSONField(default=dict, blank=True, verbose_name='Filtros')
+    estado           = models.CharField(max_length=15, choices=ESTADO_CHOICES, default='pendiente', verbose_name='Estado')
+    filas_total      = models.PositiveIntegerField(default=0, verbose_name='Filas totales')
+    filas_procesadas = models.PositiveIntegerField(default=0, verbose_name='Filas procesadas')
+    archivo          = models.FileField(upload_to='exportaciones/%Y/%m/', blank=True, null=True, verbose_name='Archivo')
+    error            = models.TextField(blank=True, null=True, verbose_name='Detalle del error')
+    fecha_creacion   = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de solicitud')
+    fecha_inicio     = models.DateTimeField(blank=True, null=True, verbose_name='Inicio de proceso')
+    fecha_fin        = models.DateTimeField(blank=True, null=True, verbose_name='Fin de proceso')
+
+    class Meta:
+        verbose_name        = 'Exportación'
+        verbose_name_plural = 'Exportaciones'
+        ordering            = ['-fecha_creacion']
+        indexes             = [models.Index(fields=['estado', 'fecha_creacion'])]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} — {self.usuario} ({self.get_estado_display()})"
+
+    @property
+    def progreso(self):
+        if self.estado == 'completado':
+            return 100
+        if not self.filas_total:
+            return 0
+        return min(99, int(self.filas_procesadas * 100 / self.filas_total))
+
+    @property
+    def estado_color(self):
+        colores = {
+            'pendiente':  'secondary',
+            'procesando': 'primary',
+            'completado': 'success',
+            'error':      'danger',
+        }
+        return colores.get(self.estado, 'secondary')
@@ -0,0 +1,130 @@
+"""
+Paginación por cursor (keyset) y totales estimados para listados largos.
+
+Con OFFSET la base de datos lee y descarta todas las filas anteriores a la
+página, así que la página 10.000 cuesta mucho más que la 1. Aquí cada página
+continúa desde la clave de la última fila mostrada: con el orden
+(-fecha_hora, -id) la página siguiente es
+
+    WHERE (fecha_hora, id) < (última fecha, último id)  ORDER BY ... LIMIT n + 1
+
+que recorre el índice desde ese punto. Todas las páginas cuestan lo mismo. La
+fila extra indica si hay otra página. El cursor viaja en la URL como
+`?despues=...` o `?antes=...`.
+
+El total no se cuenta en cada página. contar() usa la estimación del
+planificador de PostgreSQL (EXPLAIN, sin ejecutar la consulta) y solo cuenta
+de verdad cuando el resultado estimado es chico o cuando se pide.
+
+Uso:
+    pagina = paginar(qs, CAMPOS, request.GET, 50)
+    pagina.filas, pagina.despues, pagina.antes
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import Q
+
+
+UMBRAL_EXACTO = 10000    # por debajo de esta estimación se cuenta exacto
+
+SEPARADOR = '~'
+
+
+@dataclass
+class Pagina:
+    filas   : list
+    despues : str | None      # cursor de la página siguiente
+    antes   : str | None      # cursor de la página anterior
+
+
+# ── Cursor ────────────────────────────────────────────────────────
+
+def _serializar(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else str(valor)
+
+
+def codificar(fila, campos):
+    return SEPARADOR.join(_serializar(getattr(fila, campo)) for campo, _ in campos)
+
+
+def decodificar(cursor, campos):
+    """Valores del cursor convertidos con el tipo de cada campo; None si no es válido."""
+    partes = (cursor or '').split(SEPARADOR)
+    if len(partes) != len(campos):
+        return None
+    try:
+        return [convertir(parte) for parte, (_, convertir) in zip(partes, campos)]
+    except (TypeError, ValueError):
+        return None
+
+
+def _condicion(campos, valores, operador):
+    """(c1, c2, ...) < (v1, v2, ...) escrito con OR: funciona en cualquier motor."""
+    condicion = Q()
+    for i, (campo, _) in enumerate(campos):
+        iguales = {nombre: valor for (nombre, _), valor in zip(campos[:i], valores[:i])}
+        condicion |= Q(**iguales, **{f'{campo}__{operador}': valores[i]})
+    return condicion
+
+
+# ── Página ────────────────────────────────────────────────────────
+
+def paginar(queryset, campos, params, tamano):
+    """
+    Página de `queryset` en orden descendente por `campos`.
+
+    campos — lista de (nombre, convertir): la clave única del orden, p. ej.
+             [('fecha_hora', datetime.fromisoformat), ('id', int)].
+    params — request.GET; usa 'despues' o 'antes'.
+    """
+    nombres = [nombre for nombre, _ in campos]
+    antes   = decodificar(params.get('antes'), campos)
+    despues = None if antes else decodificar(params.get('despues'), campos)
+
+    if antes:
+        # Hacia atrás: orden ascendente desde el cursor y se invierte
+        filas = list(queryset.filter(_condicion(campos, antes, 'gt')).order_by(*nombres)[:tamano + 1])
+        hay_mas = len(filas) > tamano
+        filas   = filas[:tamano][::-1]
+        return Pagina(
+            filas,
+            despues=codificar(filas[-1], campos) if filas else None,
+            antes=codificar(filas[0], campos) if hay_mas else None,
+        )
+
+    if despues:
+        queryset = queryset.filter(_condicion(campos, despues, 'lt'))
+    filas   = list(queryset.order_by(*[f'-{n}' for n in nombres])[:tamano + 1])
+    hay_mas = len(filas) > tamano
+    filas   = filas[:tamano]
+    return Pagina(
+        filas,
+        despues=codificar(filas[-1], campos) if hay_mas else None,
+        antes=codificar(filas[0], campos) if despues and filas else None,
+    )
+
+
+# ── Total ─────────────────────────────────────────────────────────
+
+def estimar(queryset):
+    """Filas estimadas por el planificador de PostgreSQL, sin ejecutar la consulta."""
+    plan = json.loads(queryset.order_by().values('pk').explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def contar(queryset, exacto=False):
+    """
+    Devuelve (total, es_exacto).
+
+    En PostgreSQL, salvo que se pida `exacto`, se estima y solo se cuenta si
+    la estimación es menor que UMBRAL_EXACTO. En otros motores siempre cuenta.
+    """
+    if not exacto and connection.vendor == 'postgresql':
+        estimado = estimar(queryset)
+        if estimado >= UMBRAL_EXACTO:
+            return estimado, False
+    return queryset.count(), True
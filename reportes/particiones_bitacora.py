@@ -0,0 +1,204 @@
+"""
+Particiones mensuales de la bitácora (solo PostgreSQL).
+
+Desde la migración 0005, en PostgreSQL `reportes_bitacoralog` es una tabla
+particionada por rango de fecha_hora: una partición por mes en hora local
+(`reportes_bitacoralog_p2026_10`) y una partición DEFAULT que recibe lo que
+caiga fuera de las creadas, así un INSERT nunca falla por falta de partición.
+
+    - Los INSERT solo tocan los índices de la partición del mes en curso.
+    - Las consultas con rango sobre fecha_hora (filtros de BitacoraView,
+      archivar_bitacora) leen solo las particiones de ese rango.
+    - Un mes viejo se quita con DETACH / DROP en lugar de un DELETE masivo.
+
+La clave primaria de la tabla es (id, fecha_hora), porque PostgreSQL exige que
+incluya la columna de partición; id sigue saliendo de una secuencia, así que
+para Django sigue siendo único.
+
+Uso:
+    python manage.py particionar_bitacora                        # próximos 3 meses
+    python manage.py particionar_bitacora --desacoplar-antes 2025-01
+    python manage.py particionar_bitacora --eliminar-antes 2024-01
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import archivo_bitacora
+from .models import BitacoraLog
+
+
+TABLA          = BitacoraLog._meta.db_table
+DEFAULT        = f'{TABLA}_default'
+MESES_ADELANTE = 3
+
+_PATRON = re.compile(rf'^{TABLA}_p(\d{{4}})_(\d{{2}})$')
+
+
+class ParticionesNoDisponibles(Exception):
+    """La base de datos no es PostgreSQL o la bitácora no está particionada."""
+
+
+# ── Meses ─────────────────────────────────────────────────────────
+
+def siguiente_mes(inicio):
+    return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def nombre_particion(inicio):
+    return f'{TABLA}_p{inicio:%Y_%m}'
+
+
+def inicio_de(nombre):
+    """Primer día del mes de una partición por su nombre; None si no es mensual."""
+    coincide = _PATRON.match(nombre)
+    return date(int(coincide[1]), int(coincide[2]), 1) if coincide else None
+
+
+def _limite(dia):
+    """Medianoche local del día, como literal timestamptz."""
+    return timezone.make_aware(datetime.combine(dia, time.min)).isoformat()
+
+
+# ── Catálogo de PostgreSQL ────────────────────────────────────────
+
+def _consulta(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def comprobar():
+    """Lanza ParticionesNoDisponibles si la tabla no está particionada."""
+    if connection.vendor != 'postgresql':
+        raise ParticionesNoDisponibles('El particionado de la bitácora requiere PostgreSQL.')
+    particionada = _consulta(
+        'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+        [TABLA],
+    )[0][0]
+    if not particionada:
+        raise ParticionesNoDisponibles(f'{TABLA} no está particionada (migración reportes 0005).')
+
+
+def acopladas():
+    """Nombres de las particiones acopladas a la tabla, incluida la DEFAULT."""
+    return [fila[0] for fila in _consulta(
+        """
+        SELECT c.relname
+          FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+         WHERE i.inhparent = to_regclass(%s)
+         ORDER BY c.relname
+        """,
+        [TABLA],
+    )]
+
+
+def desacopladas():
+    """Tablas de meses ya desacoplados que todavía existen."""
+    return [fila[0] for fila in _consulta(
+        """
+        SELECT c.relname
+          FROM pg_class c
+         WHERE c.relkind = 'r' AND c.relname LIKE %s AND pg_table_is_visible(c.oid)
+           AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+         ORDER BY c.relname
+        """,
+        [f'{TABLA}\\_p%'],
+    ) if _PATRON.match(fila[0])]
+
+
+def filas_aproximadas(nombre):
+    """Filas según las estadísticas de PostgreSQL (sin recorrer la tabla)."""
+    return _consulta('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [nombre])[0][0]
+
+
+# ── Crear ─────────────────────────────────────────────────────────
+
+def crear_particion(inicio):
+    """
+    Crea la partición del mes que empieza en `inicio`. Devuelve False si ya existía.
+
+    Si la partición DEFAULT tiene filas de ese mes (porque faltó correr el
+    comando a tiempo) se mueven a la nueva partición antes de acoplarla.
+    """
+    nombre = nombre_particion(inicio)
+    if nombre in acopladas():
+        return False
+
+    q      = connection.ops.quote_name
+    desde  = _limite(inicio)
+    hasta  = _limite(siguiente_mes(inicio))
+    rango  = f"FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+    filtro = f"fecha_hora >= '{desde}' AND fecha_hora < '{hasta}'"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {q(DEFAULT)} WHERE {filtro})')
+        if not cursor.fetchone()[0]:
+            cursor.execute(f'CREATE TABLE {q(nombre)} PARTITION OF {q(TABLA)} {rango}')
+            return True
+
+        # INCLUDING GENERATED: la columna de búsqueda (migración 0007) debe ser
+        # generada también en la partición; por eso el INSERT nombra las columnas
+        columnas = ', '.join(q(campo.column) for campo in BitacoraLog._meta.concrete_fields)
+        cursor.execute(f'CREATE TABLE {q(nombre)} (LIKE {q(TABLA)} INCLUDING DEFAULTS INCLUDING GENERATED)')
+        cursor.execute(
+            f'INSERT INTO {q(nombre)} ({columnas}) SELECT {columnas} FROM {q(DEFAULT)} WHERE {filtro}'
+        )
+        cursor.execute(f'DELETE FROM {q(DEFAULT)} WHERE {filtro}')
+        cursor.execute(f'ALTER TABLE {q(TABLA)} ATTACH PARTITION {q(nombre)} {rango}')
+    return True
+
+
+def asegurar_particiones(meses_adelante=MESES_ADELANTE, hoy=None):
+    """Crea las particiones del mes en curso y de los `meses_adelante` siguientes."""
+    comprobar()
+    inicio  = (hoy or timezone.localdate()).replace(day=1)
+    creadas = []
+    for _ in range(meses_adelante + 1):
+        if crear_particion(inicio):
+            creadas.append(nombre_particion(inicio))
+        inicio = siguiente_mes(inicio)
+    return creadas
+
+
+# ── Quitar meses viejos ───────────────────────────────────────────
+
+def quitar_antes(limite, eliminar=False, exigir_archivo=True, aviso=None):
+    """
+    Desacopla las particiones de los meses anteriores a `limite` (una fecha).
+
+    eliminar       — además hace DROP de esas tablas y de las ya desacopladas.
+    exigir_archivo — salta los meses que no estén en el archivo JSONL.
+    aviso          — callable opcional que recibe (nombre, accion) por tabla.
+
+    Nunca toca el mes en curso. Devuelve la lista de tablas afectadas.
+    """
+    comprobar()
+    limite = min(limite.replace(day=1), timezone.localdate().replace(day=1))
+    q      = connection.ops.quote_name
+
+    candidatas = [(n, False) for n in acopladas()]
+    if eliminar:
+        candidatas += [(n, True) for n in desacopladas()]
+
+    afectadas = []
+    for nombre, suelta in candidatas:
+        inicio = inicio_de(nombre)
+        if inicio is None or inicio >= limite:
+            continue
+        if exigir_archivo and not archivo_bitacora.mes_archivado(inicio):
+            if aviso:
+                aviso(nombre, 'sin archivar')
+            continue
+        with connection.cursor() as cursor:
+            if not suelta:
+                cursor.execute(f'ALTER TABLE {q(TABLA)} DETACH PARTITION {q(nombre)}')
+            if eliminar:
+                cursor.execute(f'DROP TABLE {q(nombre)}')
+        afectadas.append(nombre)
+        if aviso:
+            aviso(nombre, 'eliminada' if eliminar else 'desacoplada')
+    return afectadas
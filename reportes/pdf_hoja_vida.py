@@ -0,0 +1,148 @@
+"""
+Hoja de vida individual en PDF.
+
+Este módulo no importa Django: recibe un diccionario armado por
+reportes/hojas_vida.py y devuelve los bytes del PDF, así puede ejecutarse en
+procesos del pool sin configurar Django ni abrir conexiones a la base de datos.
+
+Estructura del diccionario:
+    {
+        'titulo'   : 'CAP. PÉREZ LÓPEZ JUAN CARLOS',
+        'subtitulo': 'Generado el 18/10/2026',
+        'foto'     : '/ruta/a/foto.jpg' o None,
+        'datos'    : [('C. I.', '1234567 LP'), ...],
+        'secciones': [(titulo, encabezados, anchos_relativos, filas), ...],
+    }
+"""
+
+import io
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, CondPageBreak,
+)
+
+
+AZUL       = colors.HexColor('#1F3864')
+CEBRA      = colors.HexColor('#EAF0FB')
+BORDE      = colors.HexColor('#AAAAAA')
+ANCHO_UTIL = A4[0] - 3 * cm
+
+_styles = getSampleStyleSheet()
+
+ESTILO_TITULO = ParagraphStyle(
+    'hv_titulo', parent=_styles['Title'],
+    fontSize=14, textColor=AZUL, alignment=TA_CENTER, spaceAfter=2,
+)
+ESTILO_SUBTITULO = ParagraphStyle(
+    'hv_subtitulo', parent=_styles['Normal'],
+    fontSize=9, textColor=colors.grey, alignment=TA_CENTER, spaceAfter=10,
+)
+ESTILO_SECCION = ParagraphStyle(
+    'hv_seccion', parent=_styles['Heading3'],
+    fontSize=10, textColor=AZUL, spaceBefore=10, spaceAfter=4,
+)
+ESTILO_CELDA = ParagraphStyle(
+    'hv_celda', parent=_styles['Normal'], fontSize=7.5, leading=9.5,
+)
+ESTILO_ENCABEZADO = ParagraphStyle(
+    'hv_encabezado', parent=ESTILO_CELDA, fontName='Helvetica-Bold', textColor=colors.white,
+)
+ESTILO_ETIQUETA = ParagraphStyle(
+    'hv_etiqueta', parent=ESTILO_CELDA, fontName='Helvetica-Bold', textColor=AZUL,
+)
+ESTILO_VACIO = ParagraphStyle(
+    'hv_vacio', parent=ESTILO_CELDA, textColor=colors.grey,
+)
+
+ESTILO_TABLA = TableStyle([
+    ('BACKGROUND',    (0, 0), (-1, 0),  AZUL),
+    ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [CEBRA, colors.white]),
+    ('GRID',          (0, 0), (-1, -1), 0.4, BORDE),
+    ('LINEBELOW',     (0, 0), (-1, 0),  1,   AZUL),
+    ('TOPPADDING',    (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ('LEFTPADDING',   (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING',  (0, 0), (-1, -1), 4),
+])
+
+ESTILO_DATOS = TableStyle([
+    ('BACKGROUND',    (0, 0), (0, -1),  CEBRA),
+    ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID',          (0, 0), (-1, -1), 0.4, BORDE),
+    ('TOPPADDING',    (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+
+def _p(texto, estilo=ESTILO_CELDA):
+    return Paragraph(escape(str(texto)) if texto not in (None, '') else '—', estilo)
+
+
+def _datos_personales(hoja):
+    filas = [[_p(etiqueta, ESTILO_ETIQUETA), _p(valor)] for etiqueta, valor in hoja['datos']]
+    ancho_foto = 3.5 * cm if hoja.get('foto') else 0
+    tabla = Table(filas, colWidths=[4.5 * cm, ANCHO_UTIL - 4.5 * cm - ancho_foto])
+    tabla.setStyle(ESTILO_DATOS)
+    if not ancho_foto:
+        return tabla
+
+    try:
+        foto = Image(hoja['foto'], width=3 * cm, height=4 * cm, kind='proportional')
+    except OSError:
+        foto = Spacer(3 * cm, 4 * cm)
+    contenedor = Table([[tabla, foto]], colWidths=[ANCHO_UTIL - ancho_foto, ancho_foto])
+    contenedor.setStyle(TableStyle([
+        ('VALIGN',       (0, 0), (-1, -1), 'TOP'),
+        ('ALIGN',        (1, 0), (1, 0),   'CENTER'),
+        ('LEFTPADDING',  (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+    ]))
+    return contenedor
+
+
+def _seccion(titulo, encabezados, anchos, filas):
+    # Salta de página solo si no entra el título con un par de filas
+    encabezado = [CondPageBreak(3 * cm), Paragraph(escape(titulo), ESTILO_SECCION)]
+    if not filas:
+        return encabezado + [_p('Sin registros.', ESTILO_VACIO)]
+
+    total  = sum(anchos)
+    anchos = [ANCHO_UTIL * a / total for a in anchos]
+    datos  = [[_p(h, ESTILO_ENCABEZADO) for h in encabezados]]
+    datos.extend([_p(v) for v in fila] for fila in filas)
+
+    tabla = Table(datos, colWidths=anchos, repeatRows=1)
+    tabla.setStyle(ESTILO_TABLA)
+    return encabezado + [tabla]
+
+
+def dibujar_hoja_vida(hoja):
+    """Devuelve los bytes del PDF de una hoja de vida."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=1.5 * cm, rightMargin=1.5 * cm,
+        topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+        title=hoja['titulo'],
+        pageCompression=1,
+    )
+
+    elementos = [
+        Paragraph('UTEPPI — HOJA DE VIDA', ESTILO_TITULO),
+        Paragraph(escape(hoja['titulo']), ESTILO_TITULO),
+        Paragraph(escape(hoja['subtitulo']), ESTILO_SUBTITULO),
+        _datos_personales(hoja),
+    ]
+    for seccion in hoja['secciones']:
+        elementos.extend(_seccion(*seccion))
+
+    doc.build(elementos)
+    return buffer.getvalue()
@@ -0,0 +1,325 @@
+"""
+Reportes tabulares en PDF dibujados directamente sobre el canvas de reportlab.
+
+La tabla de platypus calcula el alto de cada Paragraph y reparte la tabla
+completa entre páginas, un costo que crece más que linealmente con las filas.
+Aquí cada fila tiene alto fijo: los textos se recortan sumando los anchos de
+stringWidth por carácter y cada página se escribe como operadores PDF en
+cuanto se llena, así el tiempo es lineal y la memoria no depende del número
+de registros.
+
+Formato institucional: título, banda de encabezado azul repetida en cada
+página, filas cebra y, en las columnas con `resaltar`, texto en negrita del
+color que indique la celda (por ejemplo la acción de la bitácora).
+
+Uso:
+    from reportes.pdf_tabla import dibujar_pdf, respuesta_pdf, subtitulo
+
+    return respuesta_pdf(
+        lambda destino: dibujar_pdf(REPORTE, qs, destino, subtitulo('admin', total)),
+        'reporte.pdf',
+    )
+"""
+
+import tempfile
+from datetime import date
+
+from django.http import StreamingHttpResponse
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import cm
+from reportlab.lib.rl_accel import escapePDF
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from .excel import CHUNK_SIZE
+
+
+PAGINA   = landscape(A4)
+MARGEN_X = 1.5 * cm
+MARGEN_Y = 2 * cm
+RELLENO  = 4
+
+FUENTE         = 'Helvetica'
+FUENTE_NEGRITA = 'Helvetica-Bold'
+TAMANO         = 7
+ALTO_FILA      = 9 + 2 * RELLENO        # leading de la celda + relleno
+ALTO_CABECERA  = 2 * 9 + 2 * RELLENO    # encabezados en dos líneas como máximo
+
+AZUL   = colors.HexColor('#1F3864')
+CEBRA  = colors.HexColor('#EAF0FB')
+BORDE  = colors.HexColor('#AAAAAA')
+
+COLORES_ACCION = {
+    'LOGIN'   : colors.HexColor('#198754'),
+    'LOGOUT'  : colors.HexColor('#6c757d'),
+    'CREAR'   : colors.HexColor('#0d6efd'),
+    'EDITAR'  : colors.HexColor('#ffc107'),
+    'ELIMINAR': colors.HexColor('#dc3545'),
+    'ERROR'   : colors.HexColor('#212529'),
+    'OTRO'    : colors.HexColor('#6c757d'),
+}
+
+# Puntos por carácter de Columna.ancho (1 cm ≈ 6 caracteres de Excel);
+# si la tabla no cabe en la página se escala al ancho útil.
+PUNTOS_POR_CARACTER = cm / 6
+LOTE_CURSOR = 2000
+
+
+_ANCHOS = {}
+
+
+class _EscapePDF(dict):
+    """
+    Tabla para str.translate: carácter → texto escapado en WinAnsi (cp1252).
+    Los caracteres sin glifo en las fuentes estándar (emojis) se omiten.
+    """
+
+    def __missing__(self, codigo):
+        escapado = self[codigo] = escapePDF(chr(codigo).encode('cp1252', 'ignore'))
+        return escapado
+
+
+_ESCAPE = _EscapePDF()
+
+
+def _anchos_caracter(fuente, tamano):
+    """Tabla carácter → ancho en puntos, llenada a medida que aparecen caracteres."""
+    return _ANCHOS.setdefault((fuente, tamano), {})
+
+
+def recortar(texto, ancho, fuente=FUENTE, tamano=TAMANO):
+    """
+    Recorta `texto` con '…' para que quepa en `ancho` puntos.
+    Suma los anchos por carácter (memorizados) en una sola pasada, en lugar de
+    medir la cadena completa en cada intento.
+    """
+    tabla  = _anchos_caracter(fuente, tamano)
+    limite = ancho - (tabla.get('…') or tabla.setdefault('…', stringWidth('…', fuente, tamano)))
+    total  = 0
+    corte  = None
+    for i, ch in enumerate(texto):
+        w = tabla.get(ch)
+        if w is None:
+            w = tabla[ch] = stringWidth(ch, fuente, tamano)
+        total += w
+        if corte is None and total > limite:
+            corte = i
+        if total > ancho:
+            return texto[:corte].rstrip() + '…'
+    return texto
+
+
+def _rgb(color):
+    return f'{color.red:.3f} {color.green:.3f} {color.blue:.3f} rg'
+
+
+class _Lienzo:
+    """Dibuja título, cabecera y filas; abre una página nueva cuando hace falta."""
+
+    def __init__(self, destino, reporte, subtitulo, resumen=None):
+        self.c         = canvas.Canvas(destino, pagesize=PAGINA, pageCompression=1)
+        self.titulos   = reporte.encabezados
+        self.resaltar  = [col.resaltar for col in reporte.columnas]
+        util           = PAGINA[0] - 2 * MARGEN_X
+        self.anchos    = [ancho * PUNTOS_POR_CARACTER for ancho in reporte.anchos]
+        escala         = min(1, util / sum(self.anchos))
+        self.anchos    = [ancho * escala for ancho in self.anchos]
+        self.xs        = [MARGEN_X]
+        for ancho in self.anchos:
+            self.xs.append(self.xs[-1] + ancho)
+        self.y_tope    = None
+        self.y         = None
+        self.pagina    = 0
+        self.cebra     = []      # y inferior de las filas alternas de la página
+        self.texto     = []      # operadores de texto de la página
+        self.estado    = None
+        # Nombres internos (/F1, /F2) para escribir los operadores Tf
+        self.fuentes   = {f: self.c._doc.getInternalFontName(f) for f in (FUENTE, FUENTE_NEGRITA)}
+        self.c.setTitle(reporte.titulo)
+        if resumen:
+            self._pagina_resumen(reporte.titulo, subtitulo, resumen)
+        self._titulo(reporte.titulo, subtitulo)
+
+    # ── Página ───────────────────────────────────────────────────
+    def _titulo(self, titulo, subtitulo):
+        ancho, alto = PAGINA
+        y = alto - MARGEN_Y
+        self.c.setFillColor(AZUL)
+        self.c.setFont(FUENTE_NEGRITA, 14)
+        self.c.drawCentredString(ancho / 2, y - 14, titulo)
+        self.c.setFillColor(colors.grey)
+        self.c.setFont(FUENTE, 9)
+        self.c.drawCentredString(ancho / 2, y - 14 - 4 - 11, subtitulo)
+        self.pagina = 1
+        self.y      = y - 14 - 4 - 11 - 12 - 6
+        self._cabecera()
+
+    def _pagina_resumen(self, titulo, subtitulo, secciones):
+        """Primera página: una columna por sección con sus totales y barras."""
+        c           = self.c
+        ancho, alto = PAGINA
+        y_tope      = alto - MARGEN_Y
+        c.setFillColor(AZUL)
+        c.setFont(FUENTE_NEGRITA, 14)
+        c.drawCentredString(ancho / 2, y_tope - 14, f'{titulo} — RESUMEN')
+        c.setFillColor(colors.grey)
+        c.setFont(FUENTE, 9)
+        c.drawCentredString(ancho / 2, y_tope - 14 - 4 - 11, subtitulo)
+        y_tope -= 14 + 4 + 11 + 12 + 6
+
+        separacion = 0.6 * cm
+        util       = ancho - 2 * MARGEN_X
+        columna    = (util - separacion * (len(secciones) - 1)) / len(secciones)
+        cabe       = int((y_tope - ALTO_CABECERA - MARGEN_Y) // ALTO_FILA)
+        for i, (nombre, filas) in enumerate(secciones):
+            x = MARGEN_X + i * (columna + separacion)
+            c.setFillColor(AZUL)
+            c.rect(x, y_tope - ALTO_CABECERA, columna, ALTO_CABECERA, stroke=0, fill=1)
+            c.setFillColor(colors.white)
+            c.setFont(FUENTE_NEGRITA, 8)
+            c.drawCentredString(x + columna / 2, y_tope - ALTO_CABECERA / 2 - 8 * 0.35, nombre)
+
+            if len(filas) > cabe:
+                resto = filas[cabe - 1:]
+                filas = filas[:cabe - 1] + [(f'… y {len(resto)} más', sum(n for _, n in resto))]
+            maximo = max((n for _, n in filas), default=0) or 1
+            y = y_tope - ALTO_CABECERA
+            for j, (etiqueta, n) in enumerate(filas):
+                y -= ALTO_FILA
+                if j % 2 == 0:
+                    c.setFillColor(CEBRA)
+                    c.rect(x, y, columna, ALTO_FILA, stroke=0, fill=1)
+                c.setFillColor(BORDE)
+                c.rect(x, y + 1, (columna - 2 * RELLENO) * n / maximo, 1.5, stroke=0, fill=1)
+                c.setFillColor(colors.black)
+                c.setFont(FUENTE, TAMANO)
+                base = y + ALTO_FILA / 2 - TAMANO * 0.35
+                c.drawRightString(x + columna - RELLENO, base, str(n))
+                c.drawString(x + RELLENO, base, recortar(etiqueta, columna * 0.7))
+        c.showPage()
+
+    def _cabecera(self):
+        y_inf = self.y - ALTO_CABECERA
+        self.c.setFillColor(AZUL)
+        self.c.rect(self.xs[0], y_inf, self.xs[-1] - self.xs[0], ALTO_CABECERA,
+                    stroke=0, fill=1)
+        self.c.setFillColor(colors.white)
+        self.c.setFont(FUENTE_NEGRITA, 8)
+        centro = y_inf + ALTO_CABECERA / 2
+        for titulo, ancho, x in zip(self.titulos, self.anchos, self.xs):
+            self.c.drawCentredString(x + ancho / 2, centro - 8 * 0.35,
+                                     recortar(titulo, ancho - 2 * RELLENO, FUENTE_NEGRITA, 8))
+        self.y_tope = self.y
+        self.y      = y_inf
+        self.cebra  = []
+        self.texto  = []
+        self.estado = None
+
+    def _nueva_pagina(self):
+        self._cerrar_pagina()
+        self.c.showPage()
+        self.pagina += 1
+        self.y = PAGINA[1] - MARGEN_Y
+        self._cabecera()
+
+    def _cerrar_pagina(self):
+        """Fondos cebra, texto de las celdas y cuadrícula de la página."""
+        c     = self.c
+        ancho = self.xs[-1] - self.xs[0]
+        if self.cebra:
+            c.setFillColor(CEBRA)
+            ruta = c.beginPath()
+            for y in self.cebra:
+                ruta.rect(self.xs[0], y, ancho, ALTO_FILA)
+            c.drawPath(ruta, stroke=0, fill=1)
+        if self.texto:
+            c.addLiteral('BT\n' + '\n'.join(self.texto) + '\nET')
+
+        c.setStrokeColor(BORDE)
+        c.setLineWidth(0.4)
+        ruta = c.beginPath()
+        y = self.y_tope - ALTO_CABECERA
+        while y >= self.y - 0.01:
+            ruta.moveTo(self.xs[0], y)
+            ruta.lineTo(self.xs[-1], y)
+            y -= ALTO_FILA
+        ruta.moveTo(self.xs[0], self.y_tope)
+        ruta.lineTo(self.xs[-1], self.y_tope)
+        for x in self.xs:
+            ruta.moveTo(x, self.y_tope)
+            ruta.lineTo(x, self.y)
+        c.drawPath(ruta, stroke=1, fill=0)
+        # Línea gruesa bajo el encabezado
+        c.setStrokeColor(AZUL)
+        c.setLineWidth(1)
+        y_cab = self.y_tope - ALTO_CABECERA
+        c.line(self.xs[0], y_cab, self.xs[-1], y_cab)
+
+    # ── Filas ────────────────────────────────────────────────────
+    def fila(self, valores, alterna):
+        if self.y - ALTO_FILA < MARGEN_Y:
+            self._nueva_pagina()
+        y_inf = self.y - ALTO_FILA
+        if alterna:
+            self.cebra.append(y_inf)
+
+        agregar = self.texto.append
+        base    = y_inf + ALTO_FILA / 2 - TAMANO * 0.35
+        for valor, ancho, x, resaltar in zip(valores, self.anchos, self.xs, self.resaltar):
+            valor = '' if valor is None else str(valor)
+            if resaltar:
+                estado = (FUENTE_NEGRITA, resaltar(valor))
+            else:
+                estado = (FUENTE, colors.black)
+            if estado != self.estado:
+                agregar(f'{self.fuentes[estado[0]]} {TAMANO} Tf {_rgb(estado[1])}')
+                self.estado = estado
+            recorte = recortar(valor, ancho - 2 * RELLENO, estado[0])
+            agregar(f'1 0 0 1 {x + RELLENO:.2f} {base:.2f} Tm ({recorte.translate(_ESCAPE)}) Tj')
+        self.y = y_inf
+
+    def guardar(self):
+        self._cerrar_pagina()
+        self.c.showPage()
+        self.c.save()
+
+
+def subtitulo(generado_por, total):
+    return (f'Generado el {date.today().strftime("%d/%m/%Y")} '
+            f'por {generado_por} · {total} registros')
+
+
+def dibujar_pdf(reporte, queryset, destino, subtitulo, progreso=None, resumen=None):
+    """
+    Escribe en `destino` el PDF de las filas del reporte (cursor del servidor).
+    progreso — callable opcional que recibe el número de filas procesadas.
+    resumen  — lista opcional de (titulo, [(etiqueta, total), ...]) que se
+               dibuja en una primera página, una columna por sección.
+    """
+    lienzo = _Lienzo(destino, reporte, subtitulo, resumen)
+    for n, fila in enumerate(reporte.filas(queryset, LOTE_CURSOR, progreso), start=1):
+        lienzo.fila(fila, alterna=n % 2 == 1)
+    lienzo.guardar()
+
+
+def respuesta_pdf(construir, filename):
+    """
+    StreamingHttpResponse para un PDF generado en disco.
+
+    construir — callable que recibe un archivo binario y escribe el PDF.
+    """
+    def generar():
+        yield b''
+        with tempfile.TemporaryFile() as archivo:
+            construir(archivo)
+            archivo.seek(0)
+            while True:
+                chunk = archivo.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    response = StreamingHttpResponse(generar(), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
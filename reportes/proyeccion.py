@@ -0,0 +1,137 @@
+"""
+Motor de reportes tabulares por proyección.
+
+Un Reporte declara sus columnas; cada Columna toma uno o más valores de la
+consulta (campos del modelo o anotaciones) y opcionalmente los transforma en
+Python. El reporte se ejecuta como un único `values_list()` con las
+anotaciones que usan sus columnas: no se instancian modelos ni se recorren
+relaciones por fila. Excel, CSV/TSV, PDF y la pantalla consumen las mismas
+filas.
+
+Uso:
+    REPORTE = Reporte(
+        'UTEPPI — REPORTE',
+        columnas=[
+            Columna('GRADO', 'grado__abreviatura', ancho=14),
+            Columna('C. I.', 'ci', 'expedido', ancho=12,
+                    transformar=lambda ci, exp: f'{ci} {exp}'),
+        ],
+        anotaciones={'sexo': etiqueta('genero', PersonalPolicial.GENERO_CHOICES)},
+    )
+
+    for fila in REPORTE.filas(queryset):
+        ...
+"""
+
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import Case, CharField, Value, When
+
+
+def etiqueta(campo, choices, default=''):
+    """Expresión que resuelve en la base de datos la etiqueta de un campo con choices."""
+    return Case(
+        *[When(**{campo: valor}, then=Value(texto)) for valor, texto in choices],
+        default=Value(default),
+        output_field=CharField(),
+    )
+
+
+class Columna:
+    """
+    titulo      — encabezado de la columna.
+    campos      — nombres de campo (con __ para relaciones) o de anotaciones
+                  del reporte; si hay uno solo y no hay `transformar`, el valor
+                  se usa tal cual.
+    ancho       — ancho en caracteres (Excel); el PDF lo usa como proporción.
+    transformar — callable que recibe los valores de `campos` y devuelve la celda.
+    resaltar    — callable opcional celda → color; el PDF dibuja la celda en
+                  negrita con ese color.
+    """
+
+    def __init__(self, titulo, *campos, ancho=12, transformar=None, resaltar=None):
+        self.titulo      = titulo
+        self.campos      = campos
+        self.ancho       = ancho
+        self.transformar = transformar
+        self.resaltar    = resaltar
+
+
+class Reporte:
+    def __init__(self, titulo, columnas, anotaciones=None):
+        self.titulo      = titulo
+        self.columnas    = columnas
+        self.anotaciones = anotaciones or {}
+
+        # Campos únicos a proyectar y, por columna, sus posiciones en la tupla
+        self.campos = []
+        for col in columnas:
+            for campo in col.campos:
+                if campo not in self.campos:
+                    self.campos.append(campo)
+        indice = {campo: i for i, campo in enumerate(self.campos)}
+        self._extractores = [
+            (tuple(indice[c] for c in col.campos), col.transformar) for col in columnas
+        ]
+        self._directo = all(
+            transformar is None and len(posiciones) == 1
+            for posiciones, transformar in self._extractores
+        ) and [p[0] for p, _ in self._extractores] == list(range(len(self.campos)))
+
+    @property
+    def encabezados(self):
+        return [col.titulo for col in self.columnas]
+
+    @property
+    def anchos(self):
+        return [col.ancho for col in self.columnas]
+
+    def consulta(self, queryset, *extra):
+        """
+        values_list() con solo las anotaciones que usan las columnas.
+        extra — campos adicionales que se agregan al final de cada tupla.
+        """
+        usadas = {
+            nombre: expresion for nombre, expresion in self.anotaciones.items()
+            if nombre in self.campos
+        }
+        if usadas:
+            queryset = queryset.annotate(**usadas)
+        return queryset.values_list(*self.campos, *extra)
+
+    def convertir(self, tupla):
+        """Tupla de la consulta → lista de celdas del reporte."""
+        if self._directo:
+            return list(tupla)
+        fila = []
+        for posiciones, transformar in self._extractores:
+            if transformar is None:
+                fila.append(tupla[posiciones[0]])
+            else:
+                fila.append(transformar(*[tupla[i] for i in posiciones]))
+        return fila
+
+    def filas(self, queryset, chunk_size=2000, progreso=None):
+        """
+        Recorre el queryset con un cursor del servidor y entrega listas de celdas.
+        progreso — callable opcional que recibe el número de filas cada `chunk_size`.
+        """
+        convertir = self.convertir
+        for n, tupla in enumerate(self.consulta(queryset).iterator(chunk_size=chunk_size), start=1):
+            yield convertir(tupla)
+            if progreso and n % chunk_size == 0:
+                progreso(n)
+
+    def grupos(self, queryset, campo, chunk_size=2000):
+        """
+        Recorre el queryset una sola vez y entrega (valor, filas) por cada tramo
+        consecutivo con el mismo `campo`, como itertools.groupby. El queryset
+        debe venir ordenado primero por `campo`, y las filas de un tramo deben
+        consumirse antes de pedir el siguiente.
+        """
+        n         = len(self.campos)
+        convertir = self.convertir
+        tuplas    = self.consulta(queryset, campo).iterator(chunk_size=chunk_size)
+        for valor, tramo in groupby(tuplas, key=itemgetter(n)):
+            yield valor, (convertir(t[:n]) for t in tramo)
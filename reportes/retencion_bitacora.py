@@ -0,0 +1,155 @@
+"""
+Retención de la bitácora: en la base de datos quedan solo los últimos meses.
+
+SistemaConfig.retencion_bitacora_meses = N conserva el mes en curso y los N
+anteriores (0 = todo). Para lo que queda antes de ese corte:
+
+    1. Cada mes se archiva en JSONL.gz (reportes/archivo_bitacora.py). Si la
+       base tiene más filas que las del manifiesto (registros tardíos), el mes
+       se vuelve a archivar; luego se verifican los checksums. Sin archivo
+       verificado no se borra nada.
+    2. En PostgreSQL con la tabla particionada, las particiones de esos meses
+       se eliminan enteras (DROP), sin DELETE fila por fila.
+    3. Lo que quede (otros motores, partición DEFAULT) se borra en lotes de
+       LOTE_BORRADO filas recorriendo (fecha_hora, id) por keyset: cada lote es
+       una transacción corta y ninguno vuelve a leer las filas ya borradas.
+    4. Los conteos de consultas (LecturaAgregada, reportes/lecturas.py)
+       anteriores al corte se borran sin archivar.
+
+Los registros eliminados se consultan después con archivo_bitacora.buscar()
+(Archivo histórico → Buscar).
+
+Uso:
+    python manage.py depurar_bitacora                 # según SistemaConfig
+    python manage.py depurar_bitacora --meses 12 --simular
+"""
+
+from datetime import date, datetime, time, timedelta
+from time import sleep
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import SistemaConfig
+
+from . import archivo_bitacora
+from .models import BitacoraLog, LecturaAgregada
+from .particiones_bitacora import ParticionesNoDisponibles, quitar_antes, siguiente_mes
+
+
+LOTE_BORRADO = 2000
+
+
+class ArchivoIncompleto(Exception):
+    """Algún mes a eliminar no tiene su archivo o el checksum no coincide."""
+
+
+def meses_retencion():
+    config = SistemaConfig.objects.first()
+    return config.retencion_bitacora_meses if config else 0
+
+
+def fecha_corte(meses, hoy=None):
+    """Primer día del mes más antiguo que se conserva."""
+    hoy    = hoy or timezone.localdate()
+    indice = hoy.year * 12 + hoy.month - 1 - meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _limite(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def vencidos(corte):
+    return BitacoraLog.objects.filter(fecha_hora__lt=_limite(corte))
+
+
+# ── Archivo ───────────────────────────────────────────────────────
+
+def asegurar_archivo(corte, aviso=None):
+    """
+    Deja archivados y verificados los meses con registros anteriores a `corte`.
+    Devuelve los nombres de esos meses; lanza ArchivoIncompleto si falta alguno.
+    """
+    primero = archivo_bitacora.primer_registro()
+    if primero is None or primero >= corte:
+        return []
+    ultimo = corte - timedelta(days=1)
+
+    archivo_bitacora.archivar('mes', desde=primero, hasta=ultimo, aviso=aviso)
+    manifiesto = archivo_bitacora.leer_manifiesto('mes')['particiones']
+    nombres    = []
+    for inicio in archivo_bitacora.particiones('mes', primero, ultimo):
+        nombre = archivo_bitacora.nombre_particion(inicio, 'mes')
+        filas  = BitacoraLog.objects.filter(
+            fecha_hora__gte=_limite(inicio), fecha_hora__lt=_limite(siguiente_mes(inicio))
+        ).count()
+        if filas > manifiesto.get(nombre, {}).get('filas', -1):
+            archivo_bitacora.archivar('mes', desde=inicio, hasta=inicio, rehacer=True, aviso=aviso)
+        nombres.append(nombre)
+
+    erroneas = archivo_bitacora.verificar('mes', nombres)
+    if erroneas:
+        raise ArchivoIncompleto(f'Archivo faltante o con checksum distinto: {", ".join(erroneas)}')
+    return nombres
+
+
+# ── Borrado ───────────────────────────────────────────────────────
+
+def borrar_antes(corte, lote=LOTE_BORRADO, pausa=0, progreso=None):
+    """
+    Borra los registros anteriores a `corte` en lotes de `lote` filas.
+
+    pausa    — segundos de espera entre lotes, para repartir la carga de WAL.
+    progreso — callable opcional que recibe el total borrado tras cada lote.
+    """
+    pendientes = vencidos(corte).order_by('fecha_hora', 'id')
+    borradas   = 0
+    ultimo     = None
+    while True:
+        pagina = pendientes
+        if ultimo:
+            fecha, pk = ultimo
+            pagina = pendientes.filter(Q(fecha_hora__gt=fecha) | Q(fecha_hora=fecha, id__gt=pk))
+        claves = list(pagina.values_list('fecha_hora', 'id')[:lote])
+        if not claves:
+            return borradas
+
+        # El rango de fechas deja que PostgreSQL busque solo en esas particiones
+        borradas += BitacoraLog.objects.filter(
+            fecha_hora__gte=claves[0][0], fecha_hora__lte=claves[-1][0],
+            id__in=[pk for _, pk in claves],
+        ).delete()[0]
+        ultimo = claves[-1]
+        if progreso:
+            progreso(borradas)
+        if pausa:
+            sleep(pausa)
+
+
+def depurar(meses=None, lote=LOTE_BORRADO, pausa=0, aviso=None, progreso=None):
+    """
+    Archiva y elimina lo anterior al corte de retención (ver módulo).
+
+    meses — por defecto SistemaConfig.retencion_bitacora_meses; 0 no hace nada.
+    aviso — callable opcional (nombre, detalle): detalle es la entrada del
+            manifiesto de un mes archivado o la acción sobre una partición.
+
+    Devuelve None si no hay límite, o un diccionario con 'corte', 'meses'
+    (archivados), 'particiones' (eliminadas), 'filas' (borradas por lotes) y
+    'lecturas' (conteos de consultas borrados).
+    """
+    meses = meses_retencion() if meses is None else meses
+    if not meses:
+        return None
+
+    corte     = fecha_corte(meses)
+    archivado = asegurar_archivo(corte, aviso)
+    try:
+        eliminadas = quitar_antes(corte, eliminar=True, aviso=aviso)
+    except ParticionesNoDisponibles:
+        eliminadas = []
+    filas       = borrar_antes(corte, lote, pausa, progreso)
+    lecturas, _ = LecturaAgregada.objects.filter(hora__lt=_limite(corte)).delete()
+    return {'corte': corte, 'meses': archivado, 'particiones': eliminadas, 'filas': filas,
+            'lecturas': lecturas}
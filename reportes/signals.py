@@ -1,39 +1,49 @@
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import BitacoraLog
-from .utils import get_ip
+from catalogos.models import Grado, Unidad
+from personal.models import PersonalPolicial, DestinoPolicial
+
+from . import cache_exportaciones, limite_login
+from .utils import auditar, get_ip
 
 
 @receiver(user_logged_in)
 def log_login(sender, request, user, **kwargs):
-    BitacoraLog.objects.create(
-        usuario     = user,
-        accion      = 'LOGIN',
-        modulo      = 'sistema',
-        descripcion = f'Inicio de sesión exitoso: {user.username}',
-        ip_address  = get_ip(request),
+    auditar(
+        'LOGIN', 'sistema', f'Inicio de sesión exitoso: {user.username}',
+        usuario=user, ip=get_ip(request),
     )
 
 
 @receiver(user_logged_out)
 def log_logout(sender, request, user, **kwargs):
     if user:
-        BitacoraLog.objects.create(
-            usuario     = user,
-            accion      = 'LOGOUT',
-            modulo      = 'sistema',
-            descripcion = f'Cierre de sesión: {user.username}',
-            ip_address  = get_ip(request),
+        auditar(
+            'LOGOUT', 'sistema', f'Cierre de sesión: {user.username}',
+            usuario=user, ip=get_ip(request),
         )
 
 
 @receiver(user_login_failed)
 def log_login_failed(sender, credentials, request, **kwargs):
-    BitacoraLog.objects.create(
-        usuario     = None,
-        accion      = 'ERROR',
-        modulo      = 'sistema',
-        descripcion = f'Intento de login fallido — usuario: {credentials.get("username", "desconocido")}',
-        ip_address  = get_ip(request),
-    )
\ No newline at end of file
+    # Cuenta el fallo para el límite de intentos; a la bitácora va agregado por ventana
+    limite_login.registrar_fallo(
+        limite_login.ip_cliente(request) if request else None,
+        credentials.get('username'),
+    )
+
+
+# ── Caché de exportaciones ────────────────────────────────────────
+# Cualquier cambio en los datos del reporte renueva el sello de versión.
+
+def invalidar_cache_exportaciones(sender, **kwargs):
+    cache_exportaciones.invalidar()
+
+
+for _modelo in (PersonalPolicial, DestinoPolicial, Grado, Unidad):
+    post_save.connect(invalidar_cache_exportaciones, sender=_modelo,
+                      dispatch_uid=f'cache_exportaciones_save_{_modelo.__name__}')
+    post_delete.connect(invalidar_cache_exportaciones, sender=_modelo,
+                        dispatch_uid=f'cache_exportaciones_delete_{_modelo.__name__}')
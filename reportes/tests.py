@@ -1,3 +1,711 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+import openpyxl
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from unittest import mock, skipUnless
+
+from django.db import connection, connections, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from catalogos.models import Grado
+from core.models import Usuario
+from . import archivo_bitacora, busqueda_bitacora, cache_exportaciones, escritor_bitacora, exportaciones, lecturas, pdf_tabla
+from .actividad import recalcular, resumen_actividad
+from .bitacora_en_vivo import _difusion, escuchar, publicar
+from .csv_export import FILAS_POR_BLOQUE, respuesta_delimitada
+from .informes import REPORTE_BITACORA, REPORTE_BITACORA_TEXTO, filtrar_bitacora
+from .middleware import BitacoraMiddleware
+from .models import ActividadDiaria, BitacoraLog, ExportJob, LecturaAgregada
+from .paginacion import paginar
+from .pdf_tabla import COLORES_ACCION
+from .proyeccion import Columna, Reporte
+from .retencion_bitacora import depurar, fecha_corte
+from .utils import auditar, registrar_log
+from .views import CAMPOS_BITACORA
+
+
+class BitacoraMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+
+    def _request(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.5')
+        request.user = self.usuario
+        return request
+
+    def test_un_insert_por_request_y_descarta_rollback(self):
+        def vista(request):
+            registrar_log(request, 'OTRO', 'reportes', 'con request')
+            auditar('EDITAR', 'personal', 'sin request')
+            try:
+                with transaction.atomic():
+                    auditar('CREAR', 'personal', 'revertido')
+                    raise ValueError
+            except ValueError:
+                pass
+            return None
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(3):   # savepoint, rollback al savepoint, INSERT
+                BitacoraMiddleware(vista)(self._request())
+
+        self.assertEqual(
+            list(BitacoraLog.objects.order_by('pk').values_list('descripcion', 'usuario', 'ip_address')),
+            [('con request', self.usuario.pk, '10.0.0.5'), ('sin request', self.usuario.pk, '10.0.0.5')],
+        )
+
+    def test_fuera_de_request_guarda_de_inmediato(self):
+        auditar('OTRO', 'sistema', 'comando')
+        self.assertTrue(BitacoraLog.objects.filter(descripcion='comando', usuario=None).exists())
+
+
+class CambiosBitacoraTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(Usuario.objects.create_user('admin', password='x', rol='admin'))
+        self.grado = Grado.objects.create(nombre='Sargento', abreviatura='Sgto.', orden=5)
+
+    def _post(self, url, datos=None):
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.post(url, datos or {}).status_code, 302)
+        return [q['sql'] for q in consultas if q['sql'].startswith('SELECT') and 'FROM "catalogos_grado"' in q['sql']]
+
+    def test_edicion_guarda_solo_lo_que_cambio_con_una_sola_carga(self):
+        lecturas = self._post(reverse('grado_update', args=[self.grado.pk]),
+                              {'nombre': 'Sargento', 'abreviatura': 'Sgto.', 'orden': 4, 'activo': ''})
+        self.assertEqual(len(lecturas), 1)
+
+        log = BitacoraLog.objects.get(modulo='catalogos')
+        self.assertEqual(log.accion, 'EDITAR')
+        self.assertEqual(log.cambios, {'orden': [5, 4], 'activo': [True, False]})
+
+    def test_eliminacion_guarda_los_valores_que_tenia(self):
+        lecturas = self._post(reverse('grado_delete', args=[self.grado.pk]))
+        self.assertEqual(len(lecturas), 1)
+
+        log = BitacoraLog.objects.get(modulo='catalogos')
+        self.assertEqual((log.accion, log.objeto_id), ('ELIMINAR', str(self.grado.pk)))
+        self.assertEqual(log.cambios['nombre'], ['Sargento', None])
+        self.assertFalse(Grado.objects.exists())
+
+
+class FiltroBitacoraTests(TestCase):
+
+    def test_rango_de_fechas_incluye_el_dia_hasta_en_hora_local(self):
+        for descripcion, hora in (('antes', datetime(2026, 9, 30, 23, 59)),
+                                  ('dentro', datetime(2026, 10, 1, 0, 0)),
+                                  ('ultimo', datetime(2026, 10, 2, 23, 59)),
+                                  ('despues', datetime(2026, 10, 3, 0, 0))):
+            BitacoraLog.objects.create(accion='OTRO', descripcion=descripcion,
+                                       fecha_hora=timezone.make_aware(hora))
+
+        qs = filtrar_bitacora({'fecha_desde': '2026-10-01', 'fecha_hasta': '2026-10-02'})
+        self.assertEqual(sorted(qs.values_list('descripcion', flat=True)), ['dentro', 'ultimo'])
+        self.assertEqual(filtrar_bitacora({'fecha_desde': 'x'}).count(), 4)
+
+
+class BusquedaBitacoraTests(TestCase):
+
+    def setUp(self):
+        self.auditor = Usuario.objects.create_user('sancionador', password='x', rol='admin')
+        hora = timezone.now()
+        for descripcion, objeto, usuario, minutos in (
+            ('Registró sanción leve', '', None, 3),
+            ('Editó datos generales', 'Sanción grave de Pérez', None, 2),
+            ('Cambio de unidad', '', self.auditor, 1),
+            ('Alta de personal', 'Juan Pérez', None, 0),
+        ):
+            BitacoraLog.objects.create(accion='OTRO', descripcion=descripcion, objeto_repr=objeto,
+                                       usuario=usuario, fecha_hora=hora - timedelta(minutes=minutos))
+
+    def _buscar(self, texto, por_relevancia=False):
+        qs = busqueda_bitacora.filtrar_texto(BitacoraLog.objects.order_by('-fecha_hora'), texto, por_relevancia)
+        return list(qs.values_list('descripcion', flat=True))
+
+    @skipUnless(connection.vendor != 'postgresql', 'icontains solo fuera de PostgreSQL')
+    def test_sin_postgresql_busca_descripcion_objeto_y_usuario(self):
+        self.assertEqual(self._buscar('sanci'), [
+            'Cambio de unidad', 'Editó datos generales', 'Registró sanción leve',
+        ])
+        self.assertEqual(self._buscar('Pérez'), ['Alta de personal', 'Editó datos generales'])
+        # Sin columna de búsqueda no hay relevancia: se conserva el orden pedido
+        self.assertEqual(self._buscar('sanción', por_relevancia=True),
+                         ['Editó datos generales', 'Registró sanción leve'])
+        self.assertEqual(filtrar_bitacora({'buscar': ' leve '}).get().descripcion, 'Registró sanción leve')
+
+    @skipUnless(connection.vendor == 'postgresql', 'requiere PostgreSQL')
+    def test_postgresql_sin_tildes_con_operadores_y_por_relevancia(self):
+        # "sancion" sin tilde y en plural encuentra "sanción"; la descripción
+        # (peso A) pesa más que el objeto afectado (peso B)
+        self.assertEqual(self._buscar('sanciones', por_relevancia=True),
+                         ['Registró sanción leve', 'Editó datos generales'])
+        self.assertEqual(self._buscar('sancion -leve'), ['Editó datos generales'])
+        self.assertEqual(self._buscar('"sancion grave" or unidad'),
+                         ['Cambio de unidad', 'Editó datos generales'])
+        self.assertEqual(self._buscar('CIONAD'), ['Cambio de unidad'])      # parte del username
+        self.assertIn('relevancia', busqueda_bitacora.filtrar_texto(
+            BitacoraLog.objects.all(), 'sancion', por_relevancia=True).query.annotations)
+
+
+class PaginacionBitacoraTests(TestCase):
+
+    def test_cursor_recorre_todo_sin_repetir_aunque_haya_empates(self):
+        hora = timezone.make_aware(datetime(2026, 10, 1, 12, 0))
+        for i in range(7):
+            # Tres registros por segundo: el id desempata
+            BitacoraLog.objects.create(accion='OTRO', descripcion=str(i),
+                                       fecha_hora=hora + timedelta(seconds=i // 3))
+        esperado = list(BitacoraLog.objects.order_by('-fecha_hora', '-id').values_list('id', flat=True))
+        qs       = BitacoraLog.objects.all()
+
+        vistos, params, paginas = [], {}, []
+        while True:
+            pagina = paginar(qs, CAMPOS_BITACORA, params, 3)
+            paginas.append(pagina)
+            vistos += [r.id for r in pagina.filas]
+            if not pagina.despues:
+                break
+            params = {'despues': pagina.despues}
+        self.assertEqual(vistos, esperado)
+        self.assertIsNone(paginas[0].antes)
+
+        # Desde la última página, "anteriores" devuelve la del medio
+        anterior = paginar(qs, CAMPOS_BITACORA, {'antes': paginas[-1].antes}, 3)
+        self.assertEqual([r.id for r in anterior.filas], [r.id for r in paginas[1].filas])
+        self.assertEqual(anterior.despues, paginas[1].despues)
+
+        # Un cursor alterado se ignora y se muestra la primera página
+        self.assertEqual(paginar(qs, CAMPOS_BITACORA, {'despues': 'x~y'}, 3).filas, paginas[0].filas)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    LOGIN_VENTANA=300, LOGIN_MAX_FALLOS_IP=10, LOGIN_MAX_FALLOS_USUARIO=3,
+)
+class LimiteLoginTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Usuario.objects.create_user('victima', password='correcta', rol='admin')
+
+    def _intentar(self, password, ip):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/', {'username': 'victima', 'password': password},
+                                    REMOTE_ADDR=ip).status_code
+
+    def test_rafaga_se_corta_antes_del_hash_y_se_registra_agregada(self):
+        estados = [self._intentar(f'mala{i}', '10.0.0.9') for i in range(30)]
+        self.assertEqual(estados[:3], [200] * 3)
+        self.assertEqual(set(estados[3:]), {429})
+
+        # El bloqueo es del par (IP, usuario): el dueño de la cuenta entra desde otra IP
+        self.assertEqual(self._intentar('correcta', '10.0.0.9'), 429)
+        self.assertEqual(self._intentar('correcta', '10.0.0.10'), 302)
+
+        # Una fila de fallos con el total de la ventana y un bloqueo, no una fila por intento
+        self.assertEqual(
+            sorted(BitacoraLog.objects.filter(accion='ERROR').values_list('descripcion', 'ip_address')),
+            [('Intentos de login fallidos: 3 en la ventana de 5 min — último usuario: victima', '10.0.0.9'),
+             ('Login bloqueado por exceso de intentos fallidos — usuario: victima (pausa de hasta 5 min)', '10.0.0.9')],
+        )
+
+    def test_login_del_admin_usa_el_mismo_limite(self):
+        def intentar(password, ip='10.0.0.9'):
+            with self.captureOnCommitCallbacks(execute=True):
+                return self.client.post(reverse('admin:login'), {'username': 'victima', 'password': password},
+                                        REMOTE_ADDR=ip).status_code
+
+        Usuario.objects.filter(username='victima').update(is_staff=True)
+        self.assertEqual([intentar('mala') for _ in range(3)], [200] * 3)
+        self.assertEqual(intentar('correcta'), 429)
+        self.assertEqual(intentar('correcta', ip='10.0.0.10'), 302)
+        self.assertEqual(BitacoraLog.objects.filter(descripcion__startswith='Login bloqueado').count(), 1)
+
+    def test_x_forwarded_for_solo_cuenta_detras_de_un_proxy_confiable(self):
+        def intentar(usuario, reenviada, remota='10.0.0.9'):
+            return self.client.post('/', {'username': usuario, 'password': 'mala'},
+                                    REMOTE_ADDR=remota, HTTP_X_FORWARDED_FOR=reenviada).status_code
+
+        # Cambiar la cabecera en cada intento no esquiva el límite por IP
+        estados = [intentar(f'usuario{i}', f'203.0.113.{i}') for i in range(25)]
+        self.assertEqual(estados[20:], [429] * 5)
+
+        with self.settings(PROXIES_CONFIABLES=('10.0.0.1',)):
+            self.assertEqual(intentar('otro', '203.0.113.7', remota='10.0.0.1'), 200)
+            self.assertEqual(intentar('otro', '198.51.100.4, 10.0.0.9', remota='10.0.0.1'), 429)
+
+
+class RetencionBitacoraTests(TestCase):
+
+    def test_archiva_borra_por_lotes_y_se_puede_buscar(self):
+        corte = fecha_corte(1)
+        viejo = timezone.make_aware(datetime.combine(corte - timedelta(days=40), datetime.min.time()))
+        for i in range(5):
+            BitacoraLog.objects.create(accion='EDITAR', modulo='personal', descripcion=f'viejo {i}',
+                                       fecha_hora=viejo + timedelta(hours=i))
+        BitacoraLog.objects.create(accion='OTRO', descripcion='vigente')
+
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(BITACORA_ARCHIVO_DIR=carpeta):
+            lotes     = []
+            resultado = depurar(meses=1, lote=2, progreso=lotes.append)
+
+            self.assertEqual(resultado['filas'], 5)
+            self.assertEqual(lotes, [2, 4, 5])
+            self.assertEqual(list(BitacoraLog.objects.values_list('descripcion', flat=True)), ['vigente'])
+
+            encontrados = archivo_bitacora.buscar(date(2000, 1, 1), corte, modulo='personal', texto='VIEJO 3')
+            self.assertEqual([r['descripcion'] for r in encontrados], ['viejo 3'])
+
+
+class CacheExportacionesTests(TestCase):
+
+    def test_archivo_desalojado_es_un_fallo_y_el_abierto_se_sigue_leyendo(self):
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(EXPORT_CACHE_DIR=carpeta):
+            cache_exportaciones.guardar('abc', 'xlsx', lambda f: f.write(b'contenido'))
+            archivo = cache_exportaciones.obtener('abc', 'xlsx')
+            self.addCleanup(archivo.close)
+
+            with override_settings(EXPORT_CACHE_MAX_BYTES=0):
+                cache_exportaciones.desalojar()
+            self.assertIsNone(cache_exportaciones.obtener('abc', 'xlsx'))
+            if os.name == 'posix':
+                self.assertEqual(archivo.read(), b'contenido')
+
+    def test_fallo_se_envia_aunque_el_archivo_nuevo_se_desaloje_enseguida(self):
+        usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+        self.client.force_login(usuario)
+        with tempfile.TemporaryDirectory() as carpeta, \
+                override_settings(EXPORT_CACHE_DIR=carpeta, EXPORT_CACHE_MAX_BYTES=0):
+            response  = self.client.get(reverse('reportes:exportar_personal_excel'))
+            contenido = b''.join(response.streaming_content)
+
+            self.assertEqual(os.listdir(carpeta), [])
+        libro = openpyxl.load_workbook(io.BytesIO(contenido), read_only=True)
+        self.assertEqual(libro.sheetnames, ['Personal'])
+
+
+class LecturasAgregadasTests(TestCase):
+
+    def _request(self, usuario):
+        request = RequestFactory().get('/')
+        request.user = usuario
+        return request
+
+    def test_consultas_se_suman_por_usuario_objeto_y_hora(self):
+        uno, otro = (Usuario.objects.create_user(n, password='x', rol='admin') for n in ('uno', 'otro'))
+        grado     = Grado.objects.create(nombre='Cabo', abreviatura='Cb.', orden=9)
+
+        for _ in range(3):
+            lecturas.registrar_lectura(self._request(uno), 'catalogos', grado)
+        lecturas.registrar_lectura(self._request(otro), 'catalogos', grado)
+        lecturas.vaciar()
+        lecturas.registrar_lectura(self._request(uno), 'catalogos', grado)
+        lecturas.vaciar()
+
+        self.assertEqual(
+            sorted(LecturaAgregada.objects.values_list('usuario__username', 'objeto_id', 'total')),
+            [('otro', str(grado.pk), 1), ('uno', str(grado.pk), 4)],
+        )
+        self.assertFalse(BitacoraLog.objects.filter(accion='VER').exists())
+
+        with override_settings(BITACORA_LECTURAS_COMPLETAS=('catalogos',)):
+            lecturas.registrar_lectura(self._request(uno), 'catalogos', grado)
+        self.assertEqual(BitacoraLog.objects.get(accion='VER').descripcion, 'Consultó: Cabo (Cb.)')
+
+
+class LecturasPeriodicasTests(TransactionTestCase):
+
+    @override_settings(BITACORA_LECTURAS_INTERVALO=0.2)
+    def test_el_hilo_vuelca_los_conteos_sin_mas_consultas(self):
+        contador = lecturas._Contador()
+        self.addCleanup(contador.cerrar)
+        hora = timezone.now().replace(minute=0, second=0, microsecond=0)
+        for _ in range(2):
+            contador.sumar((hora, None, 'personal', '7'), 'Persona 7')
+
+        limite = time.monotonic() + 5
+        while not LecturaAgregada.objects.exists() and time.monotonic() < limite:
+            time.sleep(0.02)
+        self.assertEqual(list(LecturaAgregada.objects.values_list('objeto_id', 'total')), [('7', 2)])
+
+        contador.cerrar()
+        self.assertFalse(contador.hilo.is_alive())
+
+
+@override_settings(BITACORA_ASINCRONA=True, BITACORA_LOTE=3, BITACORA_INTERVALO=30, BITACORA_COLA_MAX=100)
+class EscritorDiferidoTests(TransactionTestCase):
+
+    def setUp(self):
+        # Un escritor propio por prueba: cola con el BITACORA_COLA_MAX de la prueba
+        self.escritor = escritor_bitacora._EscritorDiferido()
+        original, escritor_bitacora._escritor = escritor_bitacora._escritor, self.escritor
+        self.addCleanup(setattr, escritor_bitacora, '_escritor', original)
+        self.addCleanup(self.escritor.cerrar)
+
+    def _escribir(self, n):
+        for i in range(n):
+            escritor_bitacora.escribir(accion='OTRO', modulo='sistema', descripcion=f'entrada {i}')
+
+    def _esperar(self, total, segundos=5):
+        limite = time.monotonic() + segundos
+        while BitacoraLog.objects.count() < total and time.monotonic() < limite:
+            time.sleep(0.02)
+        return BitacoraLog.objects.count()
+
+    def test_guarda_al_completar_el_lote(self):
+        self._escribir(2)
+        time.sleep(0.2)
+        self.assertEqual(BitacoraLog.objects.count(), 0)    # faltan registros y el intervalo es de 30 s
+        self._escribir(1)
+        self.assertEqual(self._esperar(3), 3)
+
+    @override_settings(BITACORA_LOTE=100, BITACORA_INTERVALO=0.3)
+    def test_guarda_al_vencer_el_intervalo(self):
+        inicio = time.monotonic()
+        self._escribir(2)
+        self.assertEqual(self._esperar(2), 2)
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.25)
+
+    @override_settings(BITACORA_COLA_MAX=1)
+    def test_cola_llena_guarda_en_el_request(self):
+        # Cola de BITACORA_COLA_MAX y un hilo "ocupado" que no saca nada de ella
+        liberar = threading.Event()
+        self.addCleanup(liberar.set)
+        self.escritor._asegurar_hilo()
+        self.escritor.cerrar()
+        self.escritor.hilo = threading.Thread(target=liberar.wait, daemon=True)
+        self.escritor.hilo.start()
+
+        self._escribir(3)
+        self.assertEqual(self.escritor.cola.qsize(), 1)
+        self.assertEqual(
+            list(BitacoraLog.objects.order_by('pk').values_list('descripcion', flat=True)),
+            ['entrada 1', 'entrada 2'],
+        )
+        self.escritor.vaciar()
+        self.assertEqual(BitacoraLog.objects.count(), 3)
+
+    @override_settings(BITACORA_LOTE=100)
+    def test_cerrar_vacia_la_cola_y_detiene_el_hilo(self):
+        self._escribir(5)
+        hilo = self.escritor.hilo
+        self.escritor.cerrar()
+        self.assertFalse(hilo.is_alive())
+        self.assertTrue(self.escritor.cola.empty())
+        self.assertEqual(BitacoraLog.objects.count(), 5)
+
+
+class BitacoraEnVivoTests(TestCase):
+
+    def test_entradas_publicadas_llegan_filtradas_por_modulo(self):
+        registros = [
+            BitacoraLog(pk=i, accion='EDITAR', modulo=modulo, descripcion=f'entrada {i}', fecha_hora=timezone.now())
+            for i, modulo in enumerate(['sistema', 'personal', 'catalogos', 'personal'], start=1)
+        ]
+
+        async def recibir():
+            flujo     = escuchar(modulo='personal')
+            siguiente = asyncio.ensure_future(flujo.__anext__())
+            await asyncio.sleep(0)          # se suscribe
+            publicar(registros)
+            recibidos = [await siguiente, await flujo.__anext__()]
+            await flujo.aclose()
+            return recibidos
+
+        recibidos = asyncio.run(recibir())
+        self.assertEqual([d['descripcion'] for d in recibidos], ['entrada 2', 'entrada 4'])
+        self.assertEqual(recibidos[0]['accion_texto'], dict(BitacoraLog.ACCION_CHOICES)['EDITAR'])
+
+    def test_con_wsgi_responde_501_y_no_muestra_el_boton(self):
+        self.client.force_login(Usuario.objects.create_user('admin', password='x', rol='admin'))
+        self.assertEqual(self.client.get(reverse('reportes:bitacora_en_vivo')).status_code, 501)
+        self.assertNotContains(self.client.get(reverse('reportes:bitacora')), 'btn-en-vivo')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'LISTEN/NOTIFY solo existe en PostgreSQL')
+class BitacoraEnVivoPostgresTests(TransactionTestCase):
+
+    def test_notify_confirmado_llega_por_el_hilo_listen(self):
+        def guardar():
+            # Otro hilo, otra conexión: el NOTIFY sale al confirmar, como en un request
+            try:
+                with transaction.atomic():
+                    registro = BitacoraLog.objects.create(accion='CREAR', modulo='personal', descripcion='nueva')
+                    publicar([registro])
+            finally:
+                connections.close_all()
+
+        async def recibir():
+            flujo     = escuchar(modulo='personal')
+            siguiente = asyncio.ensure_future(flujo.__anext__())
+            await asyncio.sleep(0)          # se suscribe y arranca el oyente
+            self.assertTrue(await asyncio.to_thread(_difusion.escuchando.wait, 10))
+            await asyncio.to_thread(guardar)
+            datos = await asyncio.wait_for(siguiente, 10)
+            await flujo.aclose()
+            return datos
+
+        datos = asyncio.run(recibir())
+        self.assertEqual((datos['descripcion'], datos['accion']), ('nueva', 'CREAR'))
+
+
+class ActividadDiariaTests(TestCase):
+
+    def test_conteos_incrementales_coinciden_con_recalcular(self):
+        usuario = Usuario.objects.create_user('operador', password='x', rol='admin')
+        for accion, quien in (('CREAR', usuario), ('CREAR', usuario), ('ERROR', None), ('ERROR', None)):
+            auditar(accion, 'personal', 'x', usuario=quien)
+        auditar('VER', 'reportes', 'y', usuario=usuario)
+
+        campos      = ('dia', 'modulo', 'accion', 'usuario_id', 'total')
+        incremental = sorted(ActividadDiaria.objects.values_list(*campos), key=str)
+        self.assertEqual(len(incremental), 3)      # sin usuario también es una sola fila
+
+        hoy = timezone.localdate()
+        recalcular(hoy, hoy)
+        self.assertEqual(sorted(ActividadDiaria.objects.values_list(*campos), key=str), incremental)
+
+        with self.assertNumQueries(4):
+            resumen = resumen_actividad(modulo='personal')
+        self.assertEqual(resumen['total'], 4)
+        self.assertEqual([(a, n) for a, _, n in resumen['por_accion']], [('CREAR', 2), ('ERROR', 2)])
+
+
+class ExportacionesEnColaTests(TestCase):
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+        carpeta      = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=carpeta.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_tomar_siguiente_toma_el_mas_antiguo_una_sola_vez(self):
+        nuevo   = exportaciones.encolar('bitacora_pdf', self.usuario, {'accion': 'CREAR', 'modulo': ''})
+        antiguo = exportaciones.encolar('personal_excel', self.usuario, {})
+        ExportJob.objects.filter(pk=antiguo.pk).update(fecha_creacion=timezone.now() - timedelta(hours=1))
+        self.assertEqual(nuevo.parametros, {'accion': 'CREAR'})
+
+        job = exportaciones.tomar_siguiente()
+        self.assertEqual((job.pk, job.estado), (antiguo.pk, 'procesando'))
+        self.assertIsNotNone(ExportJob.objects.get(pk=antiguo.pk).fecha_inicio)
+        self.assertEqual(exportaciones.tomar_siguiente().pk, nuevo.pk)
+        self.assertIsNone(exportaciones.tomar_siguiente())
+
+    def test_ejecutar_informa_el_progreso_y_guarda_el_archivo(self):
+        vistos = []
+
+        def renderizar(job, destino, progreso):
+            exportaciones._iniciar(job, 4)
+            for filas in (2, 4):
+                progreso(filas)
+                vistos.append(ExportJob.objects.get(pk=job.pk).filas_procesadas)
+            destino.write(b'contenido')
+            return 'prueba.txt'
+
+        job = exportaciones.encolar('personal_excel', self.usuario, {})
+        with mock.patch.dict(exportaciones.RENDERIZADORES, {'personal_excel': renderizar}):
+            exportaciones.ejecutar(exportaciones.tomar_siguiente())
+
+        job.refresh_from_db()
+        self.assertEqual(vistos, [2, 4])
+        self.assertEqual((job.estado, job.filas_total, job.filas_procesadas, job.progreso),
+                         ('completado', 4, 4, 100))
+        self.assertIsNotNone(job.fecha_fin)
+        with job.archivo.open('rb') as archivo:
+            self.assertEqual(archivo.read(), b'contenido')
+
+    def test_bitacora_pdf_completa(self):
+        for i in range(3):
+            BitacoraLog.objects.create(accion='CREAR', modulo='personal', descripcion=f'alta {i}')
+        BitacoraLog.objects.create(accion='ERROR', modulo='personal', descripcion='otra')
+        exportaciones.encolar('bitacora_pdf', self.usuario, {'accion': 'CREAR'})
+
+        job = exportaciones.ejecutar(exportaciones.tomar_siguiente())
+        self.assertEqual((job.estado, job.filas_total, job.filas_procesadas), ('completado', 3, 3))
+        with job.archivo.open('rb') as archivo:
+            self.assertTrue(archivo.read().startswith(b'%PDF'))
+
+    def test_trabajo_fallido_guarda_el_error(self):
+        exportaciones.encolar('personal_excel', self.usuario, {'grado': 'no-es-un-id'})
+
+        job = exportaciones.ejecutar(exportaciones.tomar_siguiente())
+        job.refresh_from_db()
+        self.assertEqual(job.estado, 'error')
+        self.assertIn('no-es-un-id', job.error)
+        self.assertFalse(job.archivo)
+        self.assertIsNotNone(job.fecha_fin)
+
+    def test_estado_y_descarga_solo_para_quien_lo_pidio(self):
+        job = exportaciones.encolar('personal_excel', self.usuario, {})
+        job.archivo.save('reporte.xlsx', ContentFile(b'xlsx'), save=False)
+        job.estado = 'completado'
+        job.save()
+        urls = [reverse('reportes:estado_exportacion', args=[job.pk]),
+                reverse('reportes:descargar_exportacion', args=[job.pk])]
+
+        otro = Usuario.objects.create_user('otro', password='x', rol='admin')
+        self.client.force_login(otro)
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(urls[0]).json()['estado'], 'completado')
+        respuesta = self.client.get(urls[1])
+        self.assertEqual(b''.join(respuesta.streaming_content), b'xlsx')
+
+
+def _paginas_pdf(contenido):
+    """Operadores de cada página del PDF (reportlab los guarda en ASCII85 + Flate)."""
+    flujos = re.findall(rb'/ASCII85Decode /FlateDecode \] /Length \d+\s*>>\s*stream\r?\n(.*?)~>', contenido, re.S)
+    return [zlib.decompress(base64.a85decode(f)).decode('latin-1') for f in flujos]
+
+
+class PdfTablaTests(TestCase):
+
+    reporte = Reporte('PRUEBA', columnas=[
+        Columna('NOMBRE', 'nombre', ancho=20),
+        Columna('ACCIÓN', 'accion', ancho=10, resaltar=lambda valor: COLORES_ACCION.get(valor, COLORES_ACCION['OTRO'])),
+    ])
+
+    def _pdf(self, filas):
+        destino = io.BytesIO()
+        lienzo  = pdf_tabla._Lienzo(destino, self.reporte, 'subtítulo')
+        for n, fila in enumerate(filas, start=1):
+            lienzo.fila(fila, alterna=n % 2 == 1)
+        lienzo.guardar()
+        return destino.getvalue()
+
+    def test_recortar(self):
+        self.assertEqual(pdf_tabla.recortar('corto', 100), 'corto')
+        self.assertEqual(pdf_tabla.recortar('', 10), '')
+
+        largo   = 'Descripción muy larga de un registro de la bitácora ' * 3
+        recorte = pdf_tabla.recortar(largo, 60)
+        self.assertTrue(recorte.endswith('…'))
+        self.assertTrue(largo.startswith(recorte[:-1]))
+        self.assertLessEqual(stringWidth(recorte, pdf_tabla.FUENTE, pdf_tabla.TAMANO), 60)
+
+        justo = largo[:10]
+        self.assertEqual(pdf_tabla.recortar(justo, stringWidth(justo, pdf_tabla.FUENTE, pdf_tabla.TAMANO) + 0.01), justo)
+        negrita = pdf_tabla.recortar(largo, 60, pdf_tabla.FUENTE_NEGRITA)
+        self.assertLessEqual(len(negrita), len(recorte))
+
+    def test_escapa_parentesis_barras_acentos_y_omite_emojis(self):
+        pagina = ''.join(_paginas_pdf(self._pdf([
+            ['(a) b\\c', 'CREAR'], ['Ñandú', 'OTRO'], ['🚀 listo', None],
+        ])))
+        self.assertIn(r'(\(a\) b\\c) Tj', pagina)
+        self.assertIn(r'(\321and\372) Tj', pagina)
+        self.assertIn('( listo) Tj', pagina)
+        self.assertIn('(CREAR) Tj', pagina)
+        self.assertIn('() Tj', pagina)                 # None → celda vacía
+        # La columna resaltada cambia a negrita y al color de la acción
+        self.assertRegex(pagina, r'/F\d 7 Tf 0\.051 0\.431 0\.992 rg')
+
+    def test_salta_de_pagina_y_repite_la_cabecera(self):
+        paginas = _paginas_pdf(self._pdf([[f'persona {i}', 'LOGIN'] for i in range(60)]))
+        self.assertEqual(len(paginas), 3)
+        filas = [[int(n) for n in re.findall(r'\(persona (\d+)\) Tj', pagina)] for pagina in paginas]
+        self.assertEqual(sum(filas, []), list(range(60)))
+        # La primera página lleva el título; las siguientes, solo la cabecera
+        self.assertLess(len(filas[0]), len(filas[1]))
+        for pagina in paginas:
+            self.assertIn('(NOMBRE) Tj', pagina)
+
+    def test_dibujar_pdf_con_resumen(self):
+        usuario = Usuario.objects.create_user('auditor', password='x', rol='admin')
+        for i in range(3):
+            BitacoraLog.objects.create(usuario=usuario, accion='CREAR', modulo='personal',
+                                       descripcion=f'alta {i}')
+        destino, avance = io.BytesIO(), []
+        with self.assertNumQueries(1):
+            pdf_tabla.dibujar_pdf(REPORTE_BITACORA, BitacoraLog.objects.order_by('pk'), destino,
+                                  'subtítulo', progreso=avance.append,
+                                  resumen=[('POR ACCIÓN', [('Crear', 3)])])
+
+        contenido = destino.getvalue()
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        paginas = _paginas_pdf(contenido)
+        self.assertEqual(len(paginas), 2)
+        self.assertIn('POR ACCI', paginas[0])
+        self.assertEqual(re.findall(r'\((alta \d)\) Tj', paginas[1]), ['alta 0', 'alta 1', 'alta 2'])
+        self.assertIn('(auditor) Tj', paginas[1])
+
+
+class ExportacionTextoTests(TestCase):
+
+    def _contenido(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv_con_bom_encabezados_y_comillas(self):
+        response = respuesta_delimitada(
+            ['NOMBRE', 'NOTA'],
+            [('Pérez, Juan', 'dice "sí"'), ('línea\nnueva', None), (1, 2.5)],
+            'reporte',
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="reporte.csv"')
+
+        contenido = self._contenido(response)
+        self.assertTrue(contenido.startswith(b'\xef\xbb\xbf'))
+        texto = contenido.decode('utf-8-sig')
+        self.assertEqual(texto.split('\r\n')[:2], ['NOMBRE,NOTA', '"Pérez, Juan","dice ""sí"""'])
+        self.assertEqual(list(csv.reader(io.StringIO(texto, newline=''))), [
+            ['NOMBRE', 'NOTA'], ['Pérez, Juan', 'dice "sí"'], ['línea\nnueva', ''], ['1', '2.5'],
+        ])
+
+    def test_tsv_separa_con_tabuladores_y_envia_por_bloques(self):
+        filas    = [(f'fila {i}', 'a, b') for i in range(FILAS_POR_BLOQUE * 2 + 1)]
+        response = respuesta_delimitada(['A', 'B'], filas + [('con\ttab', 'x')], 'reporte', formato='tsv')
+        self.assertEqual(response['Content-Type'], 'text/tab-separated-values; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="reporte.tsv"')
+
+        bloques = list(response.streaming_content)
+        self.assertEqual(len(bloques), 1 + 3)         # encabezados + tres bloques de filas
+        lineas = b''.join(bloques).decode('utf-8-sig').split('\r\n')
+        self.assertEqual(lineas[:2], ['A\tB', 'fila 0\ta, b'])
+        self.assertEqual(lineas[-2:], ['"con\ttab"\tx', ''])
+
+    def test_permisos_de_las_vistas(self):
+        BitacoraLog.objects.create(accion='OTRO', descripcion='registro previo')
+        personal  = lambda formato: reverse('reportes:exportar_personal_texto', args=[formato])
+        bitacora  = lambda formato: reverse('reportes:exportar_bitacora_texto', args=[formato])
+
+        self.assertEqual(self.client.get(personal('csv')).status_code, 403)
+
+        self.client.force_login(Usuario.objects.create_user('consulta', password='x', rol='usuario_autorizado'))
+        self.assertEqual(self.client.get(personal('csv')).status_code, 403)
+        self.assertEqual(self.client.get(bitacora('csv')).status_code, 403)
+
+        self.client.force_login(Usuario.objects.create_user('oficial', password='x', rol='oficial_administrativo'))
+        response = self.client.get(personal('tsv'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self._contenido(response).decode('utf-8-sig').startswith('CÓDIGO\tGRADO\t'))
+        self.assertEqual(self.client.get(bitacora('csv')).status_code, 403)
+        self.assertEqual(self.client.get(personal('xls')).status_code, 404)
+
+        self.client.force_login(Usuario.objects.create_user('admin', password='x', rol='admin'))
+        filas = list(csv.reader(io.StringIO(
+            self._contenido(self.client.get(bitacora('csv'), {'buscar': 'previo'})).decode('utf-8-sig'),
+        )))
+        self.assertEqual(filas[0], REPORTE_BITACORA_TEXTO.encabezados)
+        self.assertEqual([fila[4] for fila in filas[1:]], ['registro previo'])
@@ -6,8 +6,25 @@ app_name = 'reportes'
 urlpatterns = [
     path('personal/',          views.ReportePersonalView.as_view(), name='reporte_personal'),
     path('personal/exportar/', views.exportar_personal_excel,       name='exportar_personal_excel'),
+    path('personal/exportar/pdf/', views.exportar_personal_pdf, name='exportar_personal_pdf'),
+    path('personal/exportar/expediente/', views.exportar_expediente_excel, name='exportar_expediente_excel'),
+    path('personal/exportar/hojas-vida/', views.exportar_hojas_vida, name='exportar_hojas_vida'),
+    path('personal/exportar/por-unidad/', views.exportar_personal_por_unidad, name='exportar_personal_por_unidad'),
+    path('personal/exportar/<str:formato>/', views.exportar_personal_texto, name='exportar_personal_texto'),
     path('bitacora/', views.BitacoraView.as_view(), name='bitacora'),
     path('bitacora/exportar/', views.exportar_bitacora_pdf, name='exportar_bitacora_pdf'),
+    path('bitacora/exportar/<str:formato>/', views.exportar_bitacora_texto, name='exportar_bitacora_texto'),
+    path('bitacora/en-vivo/', views.bitacora_en_vivo, name='bitacora_en_vivo'),
+    path('bitacora/archivo/', views.archivo_bitacora_view, name='archivo_bitacora'),
+    path('bitacora/archivo/buscar/', views.buscar_archivo_bitacora, name='buscar_archivo_bitacora'),
+    path('bitacora/archivo/<str:granularidad>/<str:particion>/',
+         views.descargar_archivo_bitacora, name='descargar_archivo_bitacora'),
+
+    # Exportaciones en segundo plano
+    path('exportaciones/',                       views.ExportacionListView.as_view(), name='exportaciones'),
+    path('exportaciones/nueva/<str:tipo>/',      views.encolar_exportacion,           name='encolar_exportacion'),
+    path('exportaciones/<int:pk>/estado/',       views.estado_exportacion,            name='estado_exportacion'),
+    path('exportaciones/<int:pk>/descargar/',    views.descargar_exportacion,         name='descargar_exportacion'),
 ]
  
 
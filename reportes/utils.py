@@ -5,6 +5,17 @@ Uso en cualquier vista o función:
     from reportes.utils import registrar_log
     registrar_log(request, 'CREAR', 'personal', 'Creó personal Juan Pérez', objeto=instancia)
 
+Uso sin request (modelos, señales, servicios):
+    from reportes.utils import auditar
+    auditar('EDITAR', 'personal', 'Cambió el estado', objeto=instancia)
+
+Dentro de un request, BitacoraMiddleware (reportes/middleware.py) deja el
+usuario y la IP en una variable de contexto y junta todas las entradas; al
+terminar el request las guarda con un solo INSERT. Las entradas registradas
+dentro de una transacción se agregan recién con su commit
+(transaction.on_commit): si la transacción hace rollback, se descartan.
+Fuera de un request cada entrada se guarda de inmediato.
+
 Uso en CBVs (agregar el mixin):
     from reportes.utils import BitacoraMixin
     class PersonalCreateView(BitacoraMixin, PuedeCrearMixin, CreateView):
@@ -14,6 +25,13 @@ Uso en CBVs (agregar el mixin):
         bitacora_accion_delete = 'ELIMINAR'
 """
 
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.http import HttpResponseRedirect
+from django.views.generic.edit import DeletionMixin
+
+from .escritor_bitacora import escribir, escribir_lote
 from .models import BitacoraLog
 
 
@@ -25,7 +43,73 @@ def get_ip(request):
     return request.META.get('REMOTE_ADDR')
 
 
-def registrar_log(request, accion, modulo, descripcion, objeto=None):
+# ── Contexto del request ──────────────────────────────────────────
+
+class ContextoBitacora:
+    """Usuario, IP y entradas pendientes del request en curso."""
+
+    def __init__(self, request):
+        self.request    = request
+        self.ip         = get_ip(request)
+        self.pendientes = []
+        self.cerrado    = False
+
+    @property
+    def usuario(self):
+        user = getattr(self.request, 'user', None)
+        return user if user is not None and user.is_authenticated else None
+
+    def agregar(self, registro):
+        if self.cerrado:
+            # Commit posterior al fin del request (p. ej. en una respuesta en streaming)
+            escribir_lote([registro])
+        else:
+            self.pendientes.append(registro)
+
+    def cerrar(self):
+        self.cerrado = True
+        if self.pendientes:
+            escribir_lote(self.pendientes)
+            self.pendientes = []
+
+
+contexto_bitacora = ContextVar('contexto_bitacora', default=None)
+
+
+def _registrar(campos):
+    ctx = contexto_bitacora.get()
+    if ctx is None:
+        escribir(**campos)
+        return
+    registro = BitacoraLog(**campos)    # la hora del evento se fija aquí
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: ctx.agregar(registro))
+    else:
+        ctx.agregar(registro)
+
+
+def auditar(accion, modulo, descripcion, objeto=None, usuario=None, ip=None, cambios=None):
+    """
+    Registra una entrada sin necesitar el request. Dentro de un request, el
+    usuario y la IP salen del contexto de BitacoraMiddleware si no se indican.
+    """
+    ctx = contexto_bitacora.get()
+    if ctx is not None:
+        usuario = usuario or ctx.usuario
+        ip      = ip or ctx.ip
+    _registrar(dict(
+        usuario     = usuario,
+        accion      = accion,
+        modulo      = modulo,
+        descripcion = descripcion,
+        objeto_id   = str(objeto.pk) if objeto else None,
+        objeto_repr = str(objeto)    if objeto else None,
+        ip_address  = ip,
+        cambios     = cambios,
+    ))
+
+
+def registrar_log(request, accion, modulo, descripcion, objeto=None, cambios=None):
     """
     Registra una entrada en la bitácora.
 
@@ -35,38 +119,63 @@ def registrar_log(request, accion, modulo, descripcion, objeto=None):
         modulo      — str: 'personal', 'destinos', 'catalogos', etc.
         descripcion — str: texto libre describiendo la acción
         objeto      — instancia del modelo afectado (opcional)
+        cambios     — dict {campo: [antes, después]} (opcional)
     """
     usuario = request.user if request.user.is_authenticated else None
-    ip      = get_ip(request)
-
-    BitacoraLog.objects.create(
-        usuario     = usuario,
-        accion      = accion,
-        modulo      = modulo,
-        descripcion = descripcion,
-        objeto_id   = str(objeto.pk) if objeto else None,
-        objeto_repr = str(objeto)    if objeto else None,
-        ip_address  = ip,
-    )
+    auditar(accion, modulo, descripcion, objeto=objeto, usuario=usuario, ip=get_ip(request), cambios=cambios)
 
 
 # ── Mixin para Class-Based Views ──────────────────────────────────
 
+def valores_campos(objeto, excluir=()):
+    """
+    Valores de los campos concretos de `objeto` en tipos JSON. Las FK quedan
+    como su id, así no hace falta consultar nada.
+    """
+    valores = {}
+    for campo in objeto._meta.concrete_fields:
+        if campo.name in excluir:
+            continue
+        valor = campo.value_from_object(objeto)
+        if not (valor is None or isinstance(valor, (bool, int, float, str))):
+            valor = campo.value_to_string(objeto)    # fechas, decimales, archivos
+        valores[campo.attname] = valor
+    return valores
+
+
+def diferencias(antes, despues):
+    """{campo: [antes, después]} de los campos con valor distinto."""
+    return {
+        campo: [antes.get(campo), valor]
+        for campo, valor in despues.items()
+        if antes.get(campo) != valor
+    }
+
+
 class BitacoraMixin:
     """
     Mixin para CreateView, UpdateView y DeleteView.
     Registra automáticamente la acción al completarse el form.
 
+    Al cargar el objeto (get_object, una sola vez por request) guarda sus
+    valores. La entrada de EDITAR lleva en `cambios` solo los campos que
+    cambiaron y la de ELIMINAR todos los valores que tenía, sin consultas
+    extra.
+
     Configuración en la vista:
         bitacora_modulo        = 'personal'   ← obligatorio
         bitacora_accion_create = 'CREAR'      ← opcional, por defecto 'CREAR'
         bitacora_accion_update = 'EDITAR'     ← opcional, por defecto 'EDITAR'
         bitacora_accion_delete = 'ELIMINAR'   ← opcional, por defecto 'ELIMINAR'
+        bitacora_excluir       = ('password',)  ← campos que no se guardan
     """
     bitacora_modulo        = 'sistema'
     bitacora_accion_create = 'CREAR'
     bitacora_accion_update = 'EDITAR'
     bitacora_accion_delete = 'ELIMINAR'
+    bitacora_excluir       = ('password',)
+
+    _antes = None    # valores del objeto al cargarlo; None en CreateView
 
     def _descripcion(self, accion, objeto):
         nombre = str(objeto)
@@ -77,36 +186,44 @@ class BitacoraMixin:
         }
         return mapa.get(accion, f'{accion}: {nombre}')
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
-        # Detectar si es create o update según si el objeto tenía pk antes
-        accion = self.bitacora_accion_update if self.object.pk and hasattr(self, '_es_update') else self.bitacora_accion_create
+    def _registrar(self, accion, cambios=None):
         registrar_log(
             self.request,
             accion,
             self.bitacora_modulo,
             self._descripcion(accion, self.object),
             objeto=self.object,
+            cambios=cambios,
         )
-        return response
 
-    def post(self, request, *args, **kwargs):
-        # Marca si es update para distinguirlo en form_valid
-        if hasattr(self, 'get_object'):
-            try:
-                self.object = self.get_object()
-                self._es_update = True
-            except Exception:
-                self._es_update = False
-        return super().post(request, *args, **kwargs)
+    def get_object(self, queryset=None):
+        objeto = super().get_object(queryset)
+        self._antes = valores_campos(objeto, self.bitacora_excluir)
+        return objeto
+
+    def _eliminar(self, eliminar):
+        # Se registra antes de borrar (después el objeto ya no tiene pk) pero
+        # dentro de la transacción: si el borrado falla, la entrada se descarta
+        with transaction.atomic():
+            self._registrar(self.bitacora_accion_delete, {c: [v, None] for c, v in self._antes.items()})
+            return eliminar()
+
+    def form_valid(self, form):
+        if isinstance(self, DeletionMixin):
+            return self._eliminar(lambda: super(BitacoraMixin, self).form_valid(form))
+
+        response = super().form_valid(form)
+        if self._antes is None:
+            self._registrar(self.bitacora_accion_create)
+        else:
+            cambios = diferencias(self._antes, valores_campos(self.object, self.bitacora_excluir))
+            self._registrar(self.bitacora_accion_update, cambios or None)
+        return response
 
     def delete(self, request, *args, **kwargs):
-        objeto = self.get_object()
-        registrar_log(
-            request,
-            self.bitacora_accion_delete,
-            self.bitacora_modulo,
-            self._descripcion(self.bitacora_accion_delete, objeto),
-            objeto=objeto,
-        )
-        return super().delete(request, *args, **kwargs)
\ No newline at end of file
+        # Solo para el método HTTP DELETE (un POST pasa por form_valid). Es
+        # DeletionMixin.delete sin volver a cargar el objeto.
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        self._eliminar(self.object.delete)
+        return HttpResponseRedirect(success_url)
@@ -1,190 +1,92 @@
-import io
-from datetime import date
+import json
+import os
+from itertools import islice
+from datetime import date, datetime
 
 from .utils import registrar_log
-from django.db.models import Q
-from core.mixins import AdminRequiredMixin
-from .models import BitacoraLog
-
+from .excel import libros_por_grupo, respuesta_excel, XLSX_CONTENT_TYPE
+from . import cache_exportaciones
+from .csv_export import respuesta_delimitada, FORMATOS, CURSOR_CHUNK_SIZE
+from .exportaciones import encolar
+from .pdf_tabla import dibujar_pdf, respuesta_pdf, subtitulo
+from .informes import (
+    queryset_personal, hojas_expediente, ORDEN_PERSONAL, REPORTE_PERSONAL, REPORTE_PERSONAL_PANTALLA, REPORTE_PERSONAL_TEXTO,
+    REPORTE_BITACORA, REPORTE_BITACORA_TEXTO, filtrar_bitacora, leer_fecha, resumen_bitacora, resumen_bitacora_pdf,
+)
+from . import archivo_bitacora
+from .bitacora_en_vivo import escuchar
+from .paginacion import contar, paginar
+from .hojas_vida import pdfs_hojas_vida
+from .zip_export import respuesta_zip
+from core.mixins import AdminRequiredMixin, UsuarioAutorizadoRequiredMixin
+from .models import BitacoraLog, ExportJob
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
-from django.http import HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, JsonResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.html import format_html_join
+from django.utils.text import Truncator, slugify
+from django.views.decorators.http import require_POST
 from django.views.generic import ListView
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-
-from personal.models import PersonalPolicial
+from catalogos import cache_catalogos
 from catalogos.models import Grado, Unidad, TipoEstado
+from personal.utils import destinos_vigentes
 # Ajusta según el nombre exacto de tu mixin:
 from core.mixins import OficialAdministrativoRequiredMixin
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-
-
-HEADERS = [
-    "GRADO",
-    "APELLIDO PATERNO",
-    "APELLIDO MATERNO",
-    "1ER. NOMBRE",
-    "2DO. NOMBRE",
-    "C. I.",
-    "EXP.",
-    "SEXO",
-    "DIRECCIÓN DEL DOMICILIO",
-    "CARGO ACTUAL",
-    "UNIDAD DE DESTINO ACTUAL",
-    "FECHA DESTINO ACTUAL",
-    "DESTINO ANTERIOR",
-    "NÚMERO DE CELULAR",
-    "CORREO ELECTRÓNICO",
-    "OTRA PROFESIÓN (LIC./TÉC.)",
-]
-
-COL_WIDTHS = [14, 18, 18, 14, 14, 12, 6, 6, 28, 22, 22, 16, 22, 16, 26, 24]
-
-
-def _aplicar_filtros(qs, params):
-    buscar = params.get('buscar', '').strip()
-    if buscar:
-        qs = qs.filter(
-            Q(nombres__icontains=buscar)          |
-            Q(apellido_paterno__icontains=buscar) |
-            Q(apellido_materno__icontains=buscar) |
-            Q(ci__icontains=buscar)
-        )
-    if params.get('grado'):
-        qs = qs.filter(grado_id=params['grado'])
-    if params.get('unidad'):
-        qs = qs.filter(unidad_id=params['unidad'])
-    if params.get('estado'):
-        qs = qs.filter(estado_actual_id=params['estado'])
-    if params.get('genero'):
-        qs = qs.filter(genero=params['genero'])
-    return qs
-
-
-def _build_workbook(queryset):
-    h_font   = Font(name='Arial', bold=True, color='FFFFFF', size=10)
-    h_fill   = PatternFill('solid', start_color='1F3864')
-    h_align  = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    c_font   = Font(name='Arial', size=9)
-    c_align  = Alignment(vertical='center', wrap_text=True)
-    side     = Side(style='thin', color='AAAAAA')
-    border   = Border(left=side, right=side, top=side, bottom=side)
-    alt_fill = PatternFill('solid', start_color='EAF0FB')
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Personal"
-
-    # Título institucional
-    ws.merge_cells(f'A1:{get_column_letter(len(HEADERS))}1')
-    ws['A1'] = 'UTEPPI — REPORTE DE PERSONAL POLICIAL'
-    ws['A1'].font      = Font(name='Arial', bold=True, size=13, color='1F3864')
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-    ws.row_dimensions[1].height = 28
-
-    # Fila separadora
-    ws.append([''] * len(HEADERS))
-    ws.row_dimensions[2].height = 6
-
-    # Encabezados fila 3
-    for col, header in enumerate(HEADERS, 1):
-        cell           = ws.cell(row=3, column=col, value=header)
-        cell.font      = h_font
-        cell.fill      = h_fill
-        cell.alignment = h_align
-        cell.border    = border
-    ws.row_dimensions[3].height = 36
-
-    # Datos
-    for row_idx, p in enumerate(queryset, start=4):
-        destino_activo   = p.destinos.filter(activo=True).first()
-        destino_anterior = p.destinos.filter(activo=False).order_by('-fecha_inicio').first()
-
-        partes         = (p.nombres or '').split(' ', 1)
-        primer_nombre  = partes[0] if partes else ''
-        segundo_nombre = partes[1] if len(partes) > 1 else ''
-
-        row_data = [
-            p.grado.abreviatura,
-            p.apellido_paterno,
-            p.apellido_materno,
-            primer_nombre,
-            segundo_nombre,
-            p.ci,
-            p.expedido,
-            p.get_genero_display(),
-            p.direccion_domicilio or '',
-            p.cargo_actual or '',
-            (destino_activo.unidad_destino.nombre
-                if destino_activo and destino_activo.unidad_destino
-                else (destino_activo.lugar_destino if destino_activo else '')),
-            str(destino_activo.fecha_inicio) if destino_activo else '',
-            (f"{destino_anterior.lugar_destino} "
-             f"({destino_anterior.fecha_inicio} - "
-             f"{destino_anterior.fecha_fin or 'actualidad'})")
-                if destino_anterior else '',
-            p.telefono_personal or '',
-            p.correo_institucional or '',
-            p.otra_profesion or '',
-        ]
-
-        fill = alt_fill if row_idx % 2 == 0 else None
-        for col, value in enumerate(row_data, 1):
-            cell           = ws.cell(row=row_idx, column=col, value=value)
-            cell.font      = c_font
-            cell.alignment = c_align
-            cell.border    = border
-            if fill:
-                cell.fill = fill
-        ws.row_dimensions[row_idx].height = 18
-
-    for i, width in enumerate(COL_WIDTHS, 1):
-        ws.column_dimensions[get_column_letter(i)].width = width
-
-    ws.freeze_panes = 'A4'
-    ws.auto_filter.ref = f"A3:{get_column_letter(len(HEADERS))}3"
-
-    return wb
+
+EXPORT_CHUNK_SIZE = 2000
 
 
 class ReportePersonalView(OficialAdministrativoRequiredMixin, ListView):
-    model               = PersonalPolicial
+    """
+    Vista previa paginada: cada página es una consulta values_list() del
+    mismo reporte que usa la exportación a PDF. La columna de destino muestra
+    todos los destinos activos de cada fila, resueltos con una sola consulta
+    más por página (personal.utils.destinos_vigentes).
+    """
     template_name       = 'reportes/reporte_personal.html'
     context_object_name = 'personal'
     paginate_by         = 50
-
-    def _base_qs(self):
-        return PersonalPolicial.objects.select_related(
-            'grado', 'unidad', 'estado_actual'
-        ).prefetch_related(
-            'destinos__unidad_destino'
-        ).order_by('grado__orden', 'apellido_paterno', 'nombres')
+    reporte             = REPORTE_PERSONAL_PANTALLA
 
     def get_queryset(self):
-        return _aplicar_filtros(self._base_qs(), self.request.GET)
+        return self.reporte.consulta(queryset_personal(self.request.GET), 'pk')
+
+    def _filas(self, tuplas):
+        vigentes = destinos_vigentes([t[-1] for t in tuplas])
+        columna  = self.reporte.encabezados.index('UNIDAD DESTINO')
+        filas    = []
+        for tupla in tuplas:
+            fila          = self.reporte.convertir(tupla)
+            activos, _    = vigentes.get(tupla[-1], ([], None))
+            fila[columna] = format_html_join(
+                '', '<span class="badge bg-success">{}</span> ',
+                ((Truncator(d.lugar_destino).chars(20),) for d in activos),
+            )
+            filas.append(fila)
+        return filas
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({
-            'grados'        : Grado.objects.filter(activo=True).order_by('orden'),
-            'unidades'      : Unidad.objects.filter(activa=True).order_by('nombre'),
-            'estados'       : TipoEstado.objects.all(),
+            'grados'        : cache_catalogos.lista(Grado, activo=True),
+            'unidades'      : cache_catalogos.lista(Unidad, orden='nombre', activa=True),
+            'estados'       : cache_catalogos.lista(TipoEstado),
             'buscar'        : self.request.GET.get('buscar', ''),
             'grado_sel'     : self.request.GET.get('grado', ''),
             'unidad_sel'    : self.request.GET.get('unidad', ''),
             'estado_sel'    : self.request.GET.get('estado', ''),
             'genero_sel'    : self.request.GET.get('genero', ''),
-            'total_filtrado': self.get_queryset().count(),
+            'total_filtrado': context['paginator'].count,
             'query_string'  : self.request.GET.urlencode(),
+            'encabezados'   : self.reporte.encabezados,
+            'filas'         : self._filas(context['personal']),
         })
         return context
 
@@ -195,74 +97,184 @@ def exportar_personal_excel(request):
     ):
         raise PermissionDenied
 
-    qs = PersonalPolicial.objects.select_related(
-        'grado', 'unidad', 'estado_actual'
-    ).prefetch_related(
-        'destinos__unidad_destino'
-    ).order_by('grado__orden', 'apellido_paterno', 'nombres')
+    filename = f"reporte_personal_{date.today().strftime('%Y%m%d')}.xlsx"
+    clave    = cache_exportaciones.clave('personal_excel', request.GET)
+    archivo  = cache_exportaciones.obtener(clave, 'xlsx')
+    if archivo is not None:
+        registrar_log(request, 'OTRO', 'reportes',
+                      'Descargó reporte Excel de personal (caché: acierto)')
+        return FileResponse(archivo, as_attachment=True, filename=filename,
+                            content_type=XLSX_CONTENT_TYPE)
+
+    qs = queryset_personal(request.GET)
+    registrar_log(request, 'OTRO', 'reportes',
+                  'Descargó reporte Excel de personal (caché: fallo)')
+    return respuesta_excel(
+        lambda: [('Personal', REPORTE_PERSONAL, qs)],
+        filename,
+        guardar=lambda partes: cache_exportaciones.guardar_partes(clave, 'xlsx', partes),
+        chunk_size=EXPORT_CHUNK_SIZE,
+    )
 
-    qs = _aplicar_filtros(qs, request.GET)
 
-    wb     = _build_workbook(qs)
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
+def exportar_expediente_excel(request):
+    """
+    Expediente consolidado: personal, kardex, permisos, sanciones,
+    felicitaciones y destinos del personal filtrado, una hoja por tabla.
+    Acceso: Administrador u Oficial Administrativo.
+    """
+    if not request.user.is_authenticated or not (
+        request.user.es_administrador() or request.user.es_oficial_administrativo()
+    ):
+        raise PermissionDenied
 
-    filename = f"reporte_personal_{date.today().strftime('%Y%m%d')}.xlsx"
-    response = HttpResponse(
-        output,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    registrar_log(request, 'OTRO', 'reportes', 'Descargó expediente consolidado de personal')
+    params = request.GET.copy()
+    return respuesta_excel(
+        lambda: hojas_expediente(params),
+        f"expediente_personal_{date.today().strftime('%Y%m%d')}.xlsx",
+        chunk_size=EXPORT_CHUNK_SIZE,
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+
+
+def exportar_personal_por_unidad(request):
+    """
+    ZIP con un Excel del reporte de personal por cada unidad. Todo sale de
+    una sola consulta ordenada por unidad: cada libro se cierra cuando cambia
+    la unidad y se envía mientras se arma el siguiente.
+    Acceso: Administrador u Oficial Administrativo.
+    """
+    if not request.user.is_authenticated or not (
+        request.user.es_administrador() or request.user.es_oficial_administrativo()
+    ):
+        raise PermissionDenied
+
+    qs       = queryset_personal(request.GET).order_by('unidad_id', *ORDEN_PERSONAL)
+    unidades = {pk: (u.codigo, u.nombre) for pk, u in cache_catalogos.por_id(Unidad).items()}
+    registrar_log(request, 'OTRO', 'reportes', 'Descargó reporte Excel de personal por unidad (ZIP)')
+
+    def entradas():
+        libros = libros_por_grupo(
+            REPORTE_PERSONAL, qs, 'unidad_id', 'Personal',
+            titulo=lambda pk: f'{REPORTE_PERSONAL.titulo} — {unidades[pk][1]}',
+            chunk_size=EXPORT_CHUNK_SIZE,
+        )
+        for pk, wb in libros:
+            yield f'personal_{slugify(unidades[pk][0])}.xlsx', wb.save
+
+    return respuesta_zip(entradas(), f"personal_por_unidad_{date.today().strftime('%Y%m%d')}.zip")
+
+
+def exportar_hojas_vida(request):
+    """
+    ZIP con la hoja de vida en PDF de cada efectivo filtrado. Los PDF se
+    dibujan en un pool de HOJAS_VIDA_PROCESOS procesos y el ZIP se envía a
+    medida que se generan.
+    Acceso: Administrador u Oficial Administrativo.
+    """
+    if not request.user.is_authenticated or not (
+        request.user.es_administrador() or request.user.es_oficial_administrativo()
+    ):
+        raise PermissionDenied
+
+    qs    = queryset_personal(request.GET)
+    total = qs.count()
+    registrar_log(
+        request, 'OTRO', 'reportes',
+        f'Descargó hojas de vida en lote ({total} efectivos)',
+    )
+    return respuesta_zip(pdfs_hojas_vida(qs), f"hojas_vida_{date.today().strftime('%Y%m%d')}.zip")
+
+
+def exportar_personal_pdf(request):
+    """
+    Exporta a PDF las columnas de la vista previa con los filtros aplicados.
+    Acceso: Administrador u Oficial Administrativo.
+    """
+    if not request.user.is_authenticated or not (
+        request.user.es_administrador() or request.user.es_oficial_administrativo()
+    ):
+        raise PermissionDenied
+
+    qs    = queryset_personal(request.GET)
+    total = qs.count()
+    registrar_log(
+        request, 'OTRO', 'reportes',
+        f'Descargó reporte PDF de personal ({total} registros)',
+    )
+    return respuesta_pdf(
+        lambda destino: dibujar_pdf(REPORTE_PERSONAL_PANTALLA, qs, destino,
+                                    subtitulo(request.user.username, total)),
+        f"reporte_personal_{date.today().strftime('%Y%m%d')}.pdf",
+    )
+
+
+# ── Exportación CSV / TSV ─────────────────────────────────────────
+
+def exportar_personal_texto(request, formato):
+    if not request.user.is_authenticated or not (
+        request.user.es_administrador() or request.user.es_oficial_administrativo()
+    ):
+        raise PermissionDenied
+    if formato not in FORMATOS:
+        raise Http404
+
+    registrar_log(
+        request, 'OTRO', 'reportes',
+        f'Descargó reporte {formato.upper()} de personal',
+    )
+    return respuesta_delimitada(
+        REPORTE_PERSONAL_TEXTO.encabezados,
+        REPORTE_PERSONAL_TEXTO.filas(queryset_personal(request.GET), CURSOR_CHUNK_SIZE),
+        f"reporte_personal_{date.today().strftime('%Y%m%d')}", formato,
+    )
+
 
 # ================================================================
-# Agregar al final de reportes/views.py
-# ================================================================
-# Agregar también este import al inicio de reportes/views.py:
-#   from .models import BitacoraLog
+# BITÁCORA
 # ================================================================
 
+# Clave del orden de la bitácora para la paginación por cursor (descendente)
+CAMPOS_BITACORA   = [('fecha_hora', datetime.fromisoformat), ('id', int)]
+CAMPOS_RELEVANCIA = [('relevancia', float)] + CAMPOS_BITACORA
+PARAMETROS_PAGINA = ('despues', 'antes', 'contar', 'page')
 
 
 class BitacoraView(AdminRequiredMixin, ListView):
+    """
+    Bitácora con paginación por cursor (reportes/paginacion.py): cada página
+    cuesta lo mismo sin importar qué tan atrás esté. El total es una
+    estimación del planificador salvo que sea chico o se pida ?contar=1.
+    """
     model               = BitacoraLog
     template_name       = 'reportes/bitacora.html'
     context_object_name = 'logs'
     paginate_by         = 50
 
     def get_queryset(self):
-        qs = BitacoraLog.objects.select_related('usuario')
-
-        buscar = self.request.GET.get('buscar', '').strip()
-        if buscar:
-            qs = qs.filter(
-                Q(usuario__username__icontains=buscar) |
-                Q(descripcion__icontains=buscar)       |
-                Q(objeto_repr__icontains=buscar)
-            )
-
-        if self.request.GET.get('accion'):
-            qs = qs.filter(accion=self.request.GET['accion'])
-
-        if self.request.GET.get('modulo'):
-            qs = qs.filter(modulo=self.request.GET['modulo'])
+        return filtrar_bitacora(self.request.GET, por_relevancia=True)
 
-        if self.request.GET.get('usuario'):
-            qs = qs.filter(usuario_id=self.request.GET['usuario'])
-
-        if self.request.GET.get('fecha_desde'):
-            qs = qs.filter(fecha_hora__date__gte=self.request.GET['fecha_desde'])
-
-        if self.request.GET.get('fecha_hasta'):
-            qs = qs.filter(fecha_hora__date__lte=self.request.GET['fecha_hasta'])
-
-        return qs
+    def paginate_queryset(self, queryset, page_size):
+        campos = CAMPOS_RELEVANCIA if 'relevancia' in queryset.query.annotations else CAMPOS_BITACORA
+        pagina = paginar(queryset, campos, self.request.GET, page_size)
+        return None, pagina, pagina.filas, bool(pagina.despues or pagina.antes)
 
     def get_context_data(self, **kwargs):
         from django.contrib.auth import get_user_model
         Usuario = get_user_model()
         context = super().get_context_data(**kwargs)
+
+        filtros = self.request.GET.copy()
+        for parametro in PARAMETROS_PAGINA:
+            filtros.pop(parametro, None)
+        pagina = context['page_obj']
+        total, exacto = contar(self.object_list, exacto=self.request.GET.get('contar') == '1')
+
+        def enlace(**extra):
+            params = filtros.copy()
+            params.update(extra)
+            return f'?{params.urlencode()}'
+
         context.update({
             'accion_choices' : BitacoraLog.ACCION_CHOICES,
             'modulo_choices' : BitacoraLog.MODULO_CHOICES,
@@ -273,8 +285,15 @@ class BitacoraView(AdminRequiredMixin, ListView):
             'usuario_sel'    : self.request.GET.get('usuario', ''),
             'fecha_desde'    : self.request.GET.get('fecha_desde', ''),
             'fecha_hasta'    : self.request.GET.get('fecha_hasta', ''),
-            'query_string'   : self.request.GET.urlencode(),
-            'total_logs'     : self.get_queryset().count(),
+            'query_string'   : filtros.urlencode(),
+            'total_logs'     : total,
+            'total_exacto'   : exacto,
+            'url_contar'     : enlace(contar='1'),
+            'url_siguiente'  : enlace(despues=pagina.despues) if pagina.despues else '',
+            'url_anterior'   : enlace(antes=pagina.antes) if pagina.antes else '',
+            'url_primera'    : enlace() if pagina.antes else '',
+            'resumen'        : resumen_bitacora(self.request.GET),
+            'en_vivo'        : isinstance(self.request, ASGIRequest),
         })
         return context
 
@@ -285,156 +304,287 @@ def exportar_bitacora_pdf(request):
     """
     if not request.user.is_authenticated or not request.user.es_administrador():
         raise PermissionDenied
- 
+
     # Aplicar los mismos filtros que la vista de bitácora
-    qs = BitacoraLog.objects.select_related('usuario')
- 
-    buscar = request.GET.get('buscar', '').strip()
-    if buscar:
-        qs = qs.filter(
-            Q(usuario__username__icontains=buscar) |
-            Q(descripcion__icontains=buscar)       |
-            Q(objeto_repr__icontains=buscar)
-        )
-    if request.GET.get('accion'):
-        qs = qs.filter(accion=request.GET['accion'])
-    if request.GET.get('modulo'):
-        qs = qs.filter(modulo=request.GET['modulo'])
-    if request.GET.get('usuario'):
-        qs = qs.filter(usuario_id=request.GET['usuario'])
-    if request.GET.get('fecha_desde'):
-        qs = qs.filter(fecha_hora__date__gte=request.GET['fecha_desde'])
-    if request.GET.get('fecha_hasta'):
-        qs = qs.filter(fecha_hora__date__lte=request.GET['fecha_hasta'])
- 
+    qs    = filtrar_bitacora(request.GET)
+    total = qs.count()
+
     # Registrar la exportación en la propia bitácora
     registrar_log(
         request, 'OTRO', 'reportes',
-        f'Exportó bitácora en PDF ({qs.count()} registros)',
+        f'Exportó bitácora en PDF ({total} registros)',
     )
- 
-    # ── Construir PDF ──────────────────────────────────────────────
-    response = HttpResponse(content_type='application/pdf')
+
+    resumen  = resumen_bitacora_pdf(resumen_bitacora(request.GET))
     filename = f"bitacora_{date.today().strftime('%Y%m%d')}.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
- 
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=landscape(A4),
-        leftMargin=1.5*cm,
-        rightMargin=1.5*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm,
+    return respuesta_pdf(
+        lambda destino: dibujar_pdf(REPORTE_BITACORA, qs, destino,
+                                    subtitulo(request.user.username, total), resumen=resumen),
+        filename,
     )
- 
-    styles = getSampleStyleSheet()
- 
-    # Estilos personalizados
-    estilo_titulo = ParagraphStyle(
-        'titulo',
-        parent=styles['Title'],
-        fontSize=14,
-        textColor=colors.HexColor('#1F3864'),
-        alignment=TA_CENTER,
-        spaceAfter=4,
-    )
-    estilo_subtitulo = ParagraphStyle(
-        'subtitulo',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-        spaceAfter=12,
+
+
+def exportar_bitacora_texto(request, formato):
+    """
+    Exporta la bitácora filtrada a CSV/TSV con un cursor del servidor.
+    Acceso: Solo Administrador.
+    """
+    if not request.user.is_authenticated or not request.user.es_administrador():
+        raise PermissionDenied
+    if formato not in FORMATOS:
+        raise Http404
+
+    qs = filtrar_bitacora(request.GET)
+
+    registrar_log(
+        request, 'OTRO', 'reportes',
+        f'Exportó bitácora en {formato.upper()}',
     )
-    estilo_celda = ParagraphStyle(
-        'celda',
-        parent=styles['Normal'],
-        fontSize=7,
-        leading=9,
+
+    return respuesta_delimitada(
+        REPORTE_BITACORA_TEXTO.encabezados,
+        REPORTE_BITACORA_TEXTO.filas(qs, CURSOR_CHUNK_SIZE),
+        f"bitacora_{date.today().strftime('%Y%m%d')}", formato,
     )
- 
-    elementos = []
- 
-    # Título
-    elementos.append(Paragraph('UTEPPI — BITÁCORA DEL SISTEMA', estilo_titulo))
-    elementos.append(Paragraph(
-        f'Generado el {date.today().strftime("%d/%m/%Y")} '
-        f'por {request.user.username} · {qs.count()} registros',
-        estilo_subtitulo,
-    ))
- 
-    # Encabezados de tabla
-    encabezados = [
-        Paragraph('<b>FECHA Y HORA</b>', estilo_celda),
-        Paragraph('<b>USUARIO</b>', estilo_celda),
-        Paragraph('<b>ACCIÓN</b>', estilo_celda),
-        Paragraph('<b>MÓDULO</b>', estilo_celda),
-        Paragraph('<b>DESCRIPCIÓN</b>', estilo_celda),
-        Paragraph('<b>OBJETO AFECTADO</b>', estilo_celda),
-        Paragraph('<b>IP</b>', estilo_celda),
-    ]
- 
-    # Colores por acción
-    COLORES_ACCION = {
-        'LOGIN'   : colors.HexColor('#198754'),
-        'LOGOUT'  : colors.HexColor('#6c757d'),
-        'CREAR'   : colors.HexColor('#0d6efd'),
-        'EDITAR'  : colors.HexColor('#ffc107'),
-        'ELIMINAR': colors.HexColor('#dc3545'),
-        'ERROR'   : colors.HexColor('#212529'),
-        'OTRO'    : colors.HexColor('#6c757d'),
-    }
- 
-    # Filas de datos
-    filas = [encabezados]
-    colores_filas = [None]  # fila de encabezado no tiene color de acción
- 
-    for log in qs:
-        filas.append([
-            Paragraph(log.fecha_hora.strftime('%d/%m/%Y %H:%M:%S'), estilo_celda),
-            Paragraph(log.usuario.username if log.usuario else '—', estilo_celda),
-            Paragraph(log.get_accion_display(), estilo_celda),
-            Paragraph(log.modulo.capitalize(), estilo_celda),
-            Paragraph(log.descripcion[:120], estilo_celda),
-            Paragraph((log.objeto_repr or '—')[:50], estilo_celda),
-            Paragraph(log.ip_address or '—', estilo_celda),
-        ])
-        colores_filas.append(COLORES_ACCION.get(log.accion, colors.grey))
- 
-    # Anchos de columna (landscape A4 ≈ 25.7cm útil)
-    anchos = [3.5*cm, 2.5*cm, 2*cm, 2*cm, 8*cm, 4*cm, 2.5*cm]
- 
-    tabla = Table(filas, colWidths=anchos, repeatRows=1)
- 
-    # Estilo base de la tabla
-    estilo_tabla = TableStyle([
-        # Encabezado
-        ('BACKGROUND',   (0, 0), (-1, 0),  colors.HexColor('#1F3864')),
-        ('TEXTCOLOR',    (0, 0), (-1, 0),  colors.white),
-        ('FONTNAME',     (0, 0), (-1, 0),  'Helvetica-Bold'),
-        ('FONTSIZE',     (0, 0), (-1, 0),  8),
-        ('ALIGN',        (0, 0), (-1, 0),  'CENTER'),
-        ('VALIGN',       (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUND',(0, 1), (-1, -1), [colors.HexColor('#EAF0FB'), colors.white]),
-        # Bordes
-        ('GRID',         (0, 0), (-1, -1), 0.4, colors.HexColor('#AAAAAA')),
-        ('LINEBELOW',    (0, 0), (-1, 0),  1,   colors.HexColor('#1F3864')),
-        # Padding
-        ('TOPPADDING',   (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING',(0, 0), (-1, -1), 4),
-        ('LEFTPADDING',  (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-    ])
- 
-    # Colorear la columna ACCIÓN por tipo
-    for i, color_accion in enumerate(colores_filas[1:], start=1):
-        if color_accion:
-            estilo_tabla.add('TEXTCOLOR', (2, i), (2, i), color_accion)
-            estilo_tabla.add('FONTNAME',  (2, i), (2, i), 'Helvetica-Bold')
- 
-    tabla.setStyle(estilo_tabla)
-    elementos.append(tabla)
- 
-    doc.build(elementos)
+
+
+async def bitacora_en_vivo(request):
+    """
+    Entradas nuevas de la bitácora como server-sent events (text/event-stream),
+    filtradas en el servidor por ?modulo= y ?accion= (ver
+    reportes/bitacora_en_vivo.py). Solo con el servidor ASGI (ver
+    gestion_policial/asgi.py): bajo WSGI Django junta todo el contenido async
+    antes de enviarlo y este flujo no termina nunca, así que responde 501.
+    Acceso: Solo Administrador.
+    """
+    usuario = await request.auser()
+    if not usuario.is_authenticated or not usuario.es_administrador():
+        raise PermissionDenied
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(
+            'La bitácora en vivo necesita el servidor ASGI (uvicorn gestion_policial.asgi:application).',
+            status=501, content_type='text/plain; charset=utf-8',
+        )
+
+    modulo = request.GET.get('modulo') or None
+    accion = request.GET.get('accion') or None
+
+    async def eventos():
+        yield 'retry: 5000\n\n'
+        async for datos in escuchar(modulo, accion):
+            if datos is None:
+                yield ': latido\n\n'     # mantiene abierta la conexión en proxies
+            else:
+                yield f'id: {datos["id"]}\nevent: bitacora\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n'
+
+    response = StreamingHttpResponse(eventos(), content_type='text/event-stream')
+    response['Cache-Control']     = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'      # nginx: no acumular la respuesta
     return response
- 
\ No newline at end of file
+
+
+# ================================================================
+# ARCHIVO HISTÓRICO DE LA BITÁCORA
+# ================================================================
+
+def archivo_bitacora_view(request):
+    """
+    Lista las particiones archivadas (JSONL.gz) y permite archivar las pendientes.
+    Acceso: Solo Administrador.
+    """
+    if not request.user.is_authenticated or not request.user.es_administrador():
+        raise PermissionDenied
+
+    if request.method == 'POST':
+        granularidad = request.POST.get('granularidad', 'dia')
+        if granularidad not in archivo_bitacora.GRANULARIDADES:
+            raise Http404
+        escritas = archivo_bitacora.archivar(granularidad)
+        registrar_log(
+            request, 'OTRO', 'reportes',
+            f'Archivó la bitácora por {granularidad}: {len(escritas)} partición(es)',
+        )
+        if escritas:
+            messages.success(request, f'✅ {len(escritas)} partición(es) archivada(s).')
+        else:
+            messages.info(request, 'ℹ️ No hay particiones cerradas pendientes de archivar.')
+        return redirect(f"{reverse('reportes:archivo_bitacora')}?granularidad={granularidad}")
+
+    granularidad = request.GET.get('granularidad', 'dia')
+    if granularidad not in archivo_bitacora.GRANULARIDADES:
+        granularidad = 'dia'
+    manifiesto  = archivo_bitacora.leer_manifiesto(granularidad)
+    particiones = [
+        {**entrada, 'nombre': nombre, 'generado': datetime.fromisoformat(entrada['generado'])}
+        for nombre, entrada in sorted(manifiesto['particiones'].items(), reverse=True)
+    ]
+    return render(request, 'reportes/archivo_bitacora.html', {
+        'granularidad'  : granularidad,
+        'particiones'   : particiones,
+        'total_filas'   : sum(p['filas'] for p in particiones),
+        'total_bytes'   : sum(p['bytes'] for p in particiones),
+    })
+
+
+def descargar_archivo_bitacora(request, granularidad, particion):
+    """
+    Descarga el archivo de una partición o el manifiesto ('manifest').
+    Acceso: Solo Administrador.
+    """
+    if not request.user.is_authenticated or not request.user.es_administrador():
+        raise PermissionDenied
+    if granularidad not in archivo_bitacora.GRANULARIDADES:
+        raise Http404
+
+    if particion == 'manifest':
+        ruta     = archivo_bitacora.ruta_manifiesto(granularidad)
+        filename = f'bitacora_{granularidad}_manifest.json'
+        if not os.path.exists(ruta):
+            raise Http404
+    else:
+        ruta = archivo_bitacora.ruta_archivo(granularidad, particion)
+        if ruta is None:
+            raise Http404
+        filename = os.path.basename(ruta)
+
+    registrar_log(
+        request, 'OTRO', 'reportes',
+        f'Descargó archivo de bitácora: {filename}',
+    )
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=filename)
+
+
+MAX_RESULTADOS_ARCHIVO = 500
+
+
+def buscar_archivo_bitacora(request):
+    """
+    Busca registros en el archivo histórico (solo lectura), incluidos los que
+    ya se eliminaron de la base de datos por retención.
+    Con ?formato=csv|tsv descarga todos los resultados.
+    Acceso: Solo Administrador.
+    """
+    if not request.user.is_authenticated or not request.user.es_administrador():
+        raise PermissionDenied
+
+    params   = request.GET
+    desde    = leer_fecha(params.get('fecha_desde'))
+    hasta    = leer_fecha(params.get('fecha_hasta'))
+    acciones = dict(BitacoraLog.ACCION_CHOICES)
+    registros, hay_mas = [], False
+
+    if desde and hasta and desde <= hasta:
+        resultados = archivo_bitacora.buscar(
+            desde, hasta,
+            usuario=params.get('usuario', '').strip() or None,
+            modulo=params.get('modulo') or None,
+            accion=params.get('accion') or None,
+            texto=params.get('buscar', '').strip() or None,
+        )
+        formato = params.get('formato')
+        if formato in FORMATOS:
+            registrar_log(
+                request, 'OTRO', 'reportes',
+                f'Exportó búsqueda del archivo de bitácora ({desde:%d/%m/%Y}–{hasta:%d/%m/%Y}) en {formato.upper()}',
+            )
+            # Mismas columnas que la exportación de la bitácora; en el archivo
+            # el username está en 'usuario'
+            claves = [c.replace('usuario__username', 'usuario') for c in REPORTE_BITACORA_TEXTO.campos]
+            filas  = (REPORTE_BITACORA_TEXTO.convertir([r[c] for c in claves]) for r in resultados)
+            return respuesta_delimitada(
+                REPORTE_BITACORA_TEXTO.encabezados, filas,
+                f'bitacora_archivo_{desde:%Y%m%d}_{hasta:%Y%m%d}', formato,
+            )
+
+        registros = list(islice(resultados, MAX_RESULTADOS_ARCHIVO + 1))
+        hay_mas   = len(registros) > MAX_RESULTADOS_ARCHIVO
+        registros = registros[:MAX_RESULTADOS_ARCHIVO]
+        for r in registros:
+            r['accion_display'] = acciones.get(r['accion'], r['accion'])
+
+    return render(request, 'reportes/buscar_archivo_bitacora.html', {
+        'registros'      : registros,
+        'hay_mas'        : hay_mas,
+        'maximo'         : MAX_RESULTADOS_ARCHIVO,
+        'buscado'        : bool(desde and hasta),
+        'accion_choices' : BitacoraLog.ACCION_CHOICES,
+        'modulo_choices' : BitacoraLog.MODULO_CHOICES,
+        'params'         : params,
+        'query_string'   : params.urlencode(),
+    })
+
+
+# ================================================================
+# EXPORTACIONES EN SEGUNDO PLANO
+# ================================================================
+
+# Quién puede encolar cada tipo (mismo criterio que la exportación directa)
+PERMISOS_EXPORTACION = {
+    'personal_excel': lambda u: u.es_administrador() or u.es_oficial_administrativo(),
+    'expediente_excel': lambda u: u.es_administrador() or u.es_oficial_administrativo(),
+    'bitacora_pdf'  : lambda u: u.es_administrador(),
+}
+
+
+@login_required
+@require_POST
+def encolar_exportacion(request, tipo):
+    """
+    Encola una exportación en segundo plano. Los formularios de reporte_personal.html
+    y bitacora.html hacen el POST a esta URL con la query string de la pantalla:
+    los filtros llegan en request.GET y el cuerpo del POST solo lleva el token CSRF.
+    """
+    puede = PERMISOS_EXPORTACION.get(tipo)
+    if puede is None:
+        raise Http404
+    if not puede(request.user):
+        raise PermissionDenied
+
+    job = encolar(tipo, request.user, request.GET)
+    registrar_log(
+        request, 'OTRO', 'reportes',
+        f'Solicitó exportación en segundo plano: {job.get_tipo_display()}',
+        objeto=job,
+    )
+    messages.success(
+        request,
+        '✅ Exportación en cola. Puedes seguir trabajando; el archivo aparecerá aquí cuando esté listo.'
+    )
+    return redirect('reportes:exportaciones')
+
+
+class ExportacionListView(UsuarioAutorizadoRequiredMixin, ListView):
+    model               = ExportJob
+    template_name       = 'reportes/exportaciones.html'
+    context_object_name = 'exportaciones'
+    paginate_by         = 20
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(usuario=self.request.user)
+
+
+@login_required
+def estado_exportacion(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, usuario=request.user)
+    return JsonResponse({
+        'estado'          : job.estado,
+        'estado_display'  : job.get_estado_display(),
+        'filas_total'     : job.filas_total,
+        'filas_procesadas': job.filas_procesadas,
+        'progreso'        : job.progreso,
+        'error'           : job.error,
+        'descarga'        : (reverse('reportes:descargar_exportacion', args=[job.pk])
+                             if job.estado == 'completado' else None),
+    })
+
+
+@login_required
+def descargar_exportacion(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, usuario=request.user)
+    if job.estado != 'completado' or not job.archivo:
+        raise Http404
+    return FileResponse(
+        job.archivo.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(job.archivo.name),
+    )
@@ -0,0 +1,76 @@
+"""
+ZIP en streaming.
+
+ZipFile escribe sobre SalidaZip, que no admite seek: cada entrada lleva su
+descriptor de datos al final y el archivo se arma en una sola pasada. Lo
+escrito se entrega en cuanto termina cada entrada, así la descarga avanza
+mientras se generan las siguientes.
+
+Las entradas se guardan sin volver a comprimir (ZIP_STORED): los PDF y los
+.xlsx que se empaquetan aquí ya van comprimidos.
+
+Uso:
+    from reportes.zip_export import respuesta_zip
+
+    entradas = (('a.pdf', bytes_pdf), ('b.xlsx', lambda f: wb.save(f)))
+    return respuesta_zip(entradas, 'archivos.zip')
+"""
+
+import time
+import zipfile
+
+from django.http import StreamingHttpResponse
+
+
+class SalidaZip:
+    """Destino de solo escritura que acumula lo escrito hasta que se vacía."""
+
+    def __init__(self):
+        self.partes   = []
+        self.posicion = 0
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        self.posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos, self.partes = b''.join(self.partes), []
+        return datos
+
+
+def zip_streaming(entradas, progreso=None):
+    """
+    Genera los bytes del ZIP entrada por entrada.
+
+    entradas — iterable de (nombre, contenido); contenido son bytes o un
+               callable que recibe el archivo de la entrada y escribe en él.
+    progreso — callable opcional que recibe el número de entradas escritas.
+    """
+    salida = SalidaZip()
+    fecha  = time.localtime()[:6]
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for n, (nombre, contenido) in enumerate(entradas, start=1):
+            info = zipfile.ZipInfo(nombre, date_time=fecha)
+            if callable(contenido):
+                with zf.open(info, 'w') as destino:
+                    contenido(destino)
+            else:
+                zf.writestr(info, contenido)
+            if progreso:
+                progreso(n)
+            yield salida.vaciar()
+    yield salida.vaciar()
+
+
+def respuesta_zip(entradas, filename):
+    """StreamingHttpResponse con el ZIP de `entradas` (ver zip_streaming)."""
+    response = StreamingHttpResponse(zip_streaming(entradas), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response